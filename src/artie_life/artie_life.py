@@ -2,13 +2,20 @@
 
 if __name__ == '__main__':
     from multiprocessing import freeze_support
+    from importlib import import_module
     from argparse import ArgumentParser
     from typing import TYPE_CHECKING
-    from world_engine import WorldEngine, GuiWorldEngine
-    from utils.logs import reset_logs_folder, log_game_settings
+    from world_engine import WorldEngine, GuiWorldEngine, HeadlessWorldEngine, \
+        LockstepWorldEngine, EngineSettings
+    from supervisor import WorldSupervisor
+    from model.checkpoint import reset_checkpoints_folder
+    from utils.logs import reset_logs_folder, log_game_settings, LOGS_FOLDER
+    from utils.living.learning.commons import REPLAY_BUFFER_SIZE
+    from utils.results import ResultsStore, RESULTS_DATABASE, start_run, update_run, \
+        get_last_run
 
     if TYPE_CHECKING:
-        from typing import List
+        from typing import Dict, List, Optional, Union
     
     freeze_support()
 
@@ -62,20 +69,221 @@ if __name__ == '__main__':
             + " If omitted, it defaults to 'none'."
     )
 
+    parser.add_argument(
+        "--timestep",
+        default=None,
+        type=float,
+        help="fixed amount of simulated time per update step, in seconds. If provided along"
+            + " with --gui false, worlds are stepped as fast as the CPU allows instead of in"
+            + " real time, and their throughput is reported. If omitted, worlds run in real"
+            + " time."
+    )
+
+    parser.add_argument(
+        "--duration",
+        default=None,
+        type=float,
+        help="amount of simulated time after which each world stops, in seconds. Ignored"
+            + " when the GUI is enabled. If omitted, worlds run until stopped."
+    )
+
+    parser.add_argument(
+        "--inference",
+        default="numpy",
+        choices=["numpy", "keras"],
+        help="indicates how the learning agents' decisions are evaluated. Accepted values are"
+            + " 'numpy' to run a batched NumPy forward pass over mirrored weights, and 'keras'"
+            + " to call each agent's Keras model. If omitted, it defaults to 'numpy'."
+    )
+
+    parser.add_argument(
+        "--workers",
+        default=None,
+        type=int,
+        help="indicates how many world processes may run at the same time. Further worlds"
+            + " are started as soon as running ones are over. If omitted, all worlds run at"
+            + " the same time."
+    )
+
+    parser.add_argument(
+        "--max-restarts",
+        default=0,
+        type=int,
+        help="indicates how many times a crashed world process is restarted before its"
+            + " worlds are reported as failed. If omitted, it defaults to 0."
+    )
+
+    parser.add_argument(
+        "--worlds-per-process",
+        default=1,
+        type=int,
+        help="indicates how many game worlds are hosted by each process, stepped in lockstep"
+            + " so that perception and needs decay are batched across them. Values greater"
+            + " than 1 require --timestep and --gui false. If omitted, it defaults to 1."
+    )
+
+    parser.add_argument(
+        "--checkpoint-period",
+        default=None,
+        type=float,
+        help="amount of simulated time between two checkpoints of each world, in seconds."
+            + " Checkpoints are written in the background to the checkpoints folder, and"
+            + " crashed world processes restarted via --max-restarts resume from them. If"
+            + " omitted, no checkpoint is written."
+    )
+
+    parser.add_argument(
+        "--resume",
+        choices=["true", "false"],
+        default="false",
+        help="true/false argument indicating if each world should resume from its last"
+            + " checkpoint, extending the previous run's logs, instead of starting anew."
+            + " Worlds without a checkpoint start anew. If omitted, it defaults to false."
+    )
+
+    parser.add_argument(
+        "--performance-log",
+        default="frames",
+        choices=["frames", "histograms"],
+        help="indicates how each world's frame durations are logged. Accepted values are"
+            + " 'frames' to log the duration of every frame, and 'histograms' to log the"
+            + " 50th, 95th and 99th percentiles of each window of frames. If omitted, it"
+            + " defaults to 'frames'."
+    )
+
+    parser.add_argument(
+        "--results",
+        choices=["true", "false"],
+        default="false",
+        help="true/false argument indicating if the living beings' stats should also be"
+            + f" recorded in the {RESULTS_DATABASE} SQLite database, which gathers the"
+            + " results of all runs along with their settings, instead of being overwritten"
+            + " at each run. If omitted, it defaults to false."
+    )
+
+    parser.add_argument(
+        "--phase-timing",
+        choices=["true", "false"],
+        default="false",
+        help="true/false argument indicating if the duration of each phase of the world"
+            + " updates, such as perception, inference, training or rendering, should be"
+            + " measured, and its rolling percentiles logged next to each world's performance"
+            + " log. If omitted, it defaults to false."
+    )
+
+    parser.add_argument(
+        "--replay-folder",
+        default=None,
+        help="folder where the learning lobes' replay memories are stored as memory-mapped"
+            + " files, one per lobe, deleted when its living being dies, so that larger"
+            + " capacities don't need to fit in memory. If omitted, replay memories are kept"
+            + " in memory."
+    )
+
+    parser.add_argument(
+        "--replay-capacity",
+        default=REPLAY_BUFFER_SIZE,
+        type=int,
+        help="indicates how many states are kept in each learning lobe's replay memory."
+            + " Resumed worlds require the capacity they were checkpointed with. If omitted,"
+            + f" it defaults to {REPLAY_BUFFER_SIZE}."
+    )
+
     arguments = parser.parse_args()
 
-    reset_logs_folder()
-    log_game_settings(arguments.learning, arguments.genetic_algo)
-
-    engines: "List[WorldEngine]" = [
-        WorldEngine(i+1, arguments.population, arguments.learning, arguments.genetic_algo)
-            if arguments.gui == "false"
-            else GuiWorldEngine(
-                i+1,
-                arguments.population,
-                arguments.learning,
-                arguments.genetic_algo
-            ) for i in range(arguments.number)
+    if arguments.worlds_per_process < 1:
+        parser.error("--worlds-per-process must be at least 1")
+    if arguments.replay_capacity < 1:
+        parser.error("--replay-capacity must be at least 1")
+    if arguments.worlds_per_process > 1 \
+            and (arguments.gui == "true" or arguments.timestep is None):
+        parser.error("--worlds-per-process greater than 1 requires --timestep and --gui false")
+
+    if arguments.resume == "true":
+        LOGS_FOLDER.mkdir(parents=True, exist_ok=True)
+    else:
+        reset_logs_folder()
+        reset_checkpoints_folder()
+        log_game_settings(arguments.learning, arguments.genetic_algo)
+    # Restarted engines resume from their last checkpoint: stale checkpoints of a previous
+    # run were cleared above, unless resuming it.
+    resume = arguments.resume == "true" or arguments.checkpoint_period is not None
+
+    results: "Optional[ResultsStore]" = None
+    if arguments.results == "true":
+        run_settings: "Dict[str, Union[int, float, str, None]]" = {
+            "learning_enable": arguments.learning,
+            "genetic_algorithm": arguments.genetic_algo,
+            "inference": arguments.inference,
+            "population": arguments.population,
+            "timestep": arguments.timestep,
+            "duration": arguments.duration,
+            "worlds": arguments.number
+        }
+        run_id = get_last_run(RESULTS_DATABASE) if arguments.resume == "true" else None
+        if run_id is None:
+            run_id = start_run(RESULTS_DATABASE, run_settings)
+        else:
+            # A resumed run keeps its ID, but is described by its latest settings, such as
+            # an extended duration.
+            update_run(RESULTS_DATABASE, run_id, run_settings)
+        results = ResultsStore(RESULTS_DATABASE, run_id)
+
+    if arguments.learning == "true" and arguments.inference == "keras":
+        # The learning stack is loaded lazily by the lobes: preloading it here lets all
+        # forked engines share it instead of importing it on their own. The numpy backend
+        # never loads it.
+        import_module("utils.living.learning.training")
+
+    settings = EngineSettings(
+        arguments.population,
+        arguments.learning,
+        arguments.genetic_algo,
+        timestep=arguments.timestep,
+        duration=arguments.duration,
+        inference_backend=arguments.inference,
+        checkpoint_period=arguments.checkpoint_period,
+        resume=resume,
+        performance_log=arguments.performance_log,
+        results_store=results,
+        phase_timing=arguments.phase_timing == "true",
+        replay_folder=arguments.replay_folder,
+        replay_capacity=arguments.replay_capacity
+    )
+
+    def create_engine(world_ids: "List[int]") -> "WorldEngine":
+        """Creates the engine hosting a given group of worlds, as requested via the
+        command line options.
+        
+        Positional arguments:  
+         - `world_ids`: the in-game IDs of the hosted worlds.
+        
+        Return:  
+        The requested `WorldEngine`."""
+        if len(world_ids) > 1:
+            return LockstepWorldEngine(world_ids, settings)
+        if arguments.gui == "true":
+            return GuiWorldEngine(world_ids, settings)
+        if arguments.timestep is None:
+            return WorldEngine(world_ids, settings)
+        return HeadlessWorldEngine(world_ids, settings)
+
+    world_groups: "List[List[int]]" = [
+        list(range(i+1, min(i + arguments.worlds_per_process, arguments.number) + 1))
+        for i in range(0, arguments.number, arguments.worlds_per_process)
     ]
-    for engine in engines:
-        engine.start()
+    supervisor = WorldSupervisor(
+        create_engine,
+        world_groups,
+        arguments.workers if arguments.workers is not None else len(world_groups),
+        arguments.max_restarts
+    )
+    for summary in supervisor.run():
+        print(
+            f"World {summary['world_id']}: {summary['status']}"
+            + (f", {summary['population']} alive, {summary['deaths']} deaths"
+               if "population" in summary else "")
+            + (f", started in {summary['startup_time']:.2f}s"
+               if "startup_time" in summary else "")
+            + (f", {summary['restarts']} restarts" if summary["restarts"] != 0 else "")
+        )
@@ -0,0 +1,104 @@
+"""Benchmark comparing per-frame collision checking cost against population size.
+
+To be run from the `artie_life` source folder as `python -m benchmarks.collisions`."""
+from typing import TYPE_CHECKING
+from argparse import ArgumentParser
+from time import perf_counter
+from numpy.random import seed as set_seed, permutation
+from pygame.rect import Rect
+from controller.game_controller import GameController
+from controller.genetics import create_random_genome
+from utils.living.actions import Action, InteractionType
+from utils.map.constants import MAP_WIDTH, MAP_HEIGHT, LIVING_WIDTH, LIVING_HEIGHT
+
+if TYPE_CHECKING:
+    from typing import List
+
+BENCHMARK_WORLD_ID: "int" = 0
+POPULATIONS: "List[int]" = [10, 25, 50, 100, 200]
+
+def naive_can_move(controller: "GameController", hitbox: "Rect", entity_id: "int") -> "bool":
+    """Reference implementation of `ActionsController.can_move` scanning every entity."""
+    if Rect(0, 0, MAP_WIDTH, MAP_HEIGHT).contains(hitbox):
+        for entity_type, entity in controller.get_all_entities():
+            if id(entity) != entity_id \
+                    and not entity_type.walkable() \
+                    and entity.is_colliding(hitbox):
+                return False
+        return True
+    return False
+
+def naive_interact(controller: "GameController", hitbox: "Rect",
+                   entity_id: "int") -> "InteractionType":
+    """Reference implementation of `ActionsController.interact` scanning every entity."""
+    for entity_type, entity in controller.get_all_entities():
+        if id(entity) != entity_id \
+                and entity.is_colliding(hitbox):
+            return entity_type.get_interaction()
+    return InteractionType.NONE
+
+def build_world(population: "int", learning_enable: "bool" = False) -> "GameController":
+    """Builds a world whose living beings are scattered on non-overlapping map slots.
+
+    Positional arguments:  
+     - `population`: the number of living beings to be placed.
+
+    Keyword arguments:  
+     - `learning_enable`: a `bool` representing if the living beings should learn or \
+    act randomly."""
+    controller = GameController("none", learning_enable)
+    controller.create_world(0, BENCHMARK_WORLD_ID)
+    columns = int(MAP_WIDTH // LIVING_WIDTH)
+    rows = int(MAP_HEIGHT // LIVING_HEIGHT)
+    for slot in permutation(columns * rows)[:population]:
+        controller.world.place_living(
+            controller,
+            Rect(
+                (slot % columns) * LIVING_WIDTH,
+                (slot // columns) * LIVING_HEIGHT,
+                LIVING_WIDTH,
+                LIVING_HEIGHT
+            ),
+            create_random_genome(),
+            learning_enable
+        )
+    return controller
+
+def time_frame(controller: "GameController", naive: "bool", frames: "int") -> "float":
+    """Measures the average time spent in collision checks during a single frame, with
+    every living being attempting a move and an interaction.
+
+    Positional arguments:  
+     - `controller`: the benchmarked world's controller.
+     - `naive`: `True` to benchmark the full-scan reference implementation.
+     - `frames`: the number of frames to be averaged.
+
+    Return:  
+    The average per-frame duration, in seconds."""
+    start = perf_counter()
+    for _ in range(frames):
+        for living in controller.world.living:
+            move_x, move_y = Action.RIGHT.get_direction()
+            moved_hitbox = living.hitbox.move(move_x, move_y)
+            if naive:
+                naive_can_move(controller, moved_hitbox, id(living))
+                naive_interact(controller, living.hitbox, id(living))
+            else:
+                living.controller.can_move(moved_hitbox, id(living))
+                living.controller.interact(living.hitbox, id(living))
+    return (perf_counter() - start) / frames
+
+if __name__ == "__main__":
+    parser = ArgumentParser(description="Per-frame collision checking benchmark")
+    parser.add_argument("--frames", default=20, type=int, help="frames averaged per size")
+    parser.add_argument("--seed", default=0, type=int, help="random seed for placement")
+    arguments = parser.parse_args()
+
+    set_seed(arguments.seed)
+    print("population,full_scan_ms,spatial_index_ms,speedup")
+    for size in POPULATIONS:
+        world_controller = build_world(size)
+        naive_time = time_frame(world_controller, True, arguments.frames)
+        index_time = time_frame(world_controller, False, arguments.frames)
+        print(f"{size},{naive_time * 1000:.3f},{index_time * 1000:.3f}," +
+              f"{naive_time / index_time:.1f}")
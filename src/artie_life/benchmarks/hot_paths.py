@@ -0,0 +1,242 @@
+"""Benchmark suite timing the simulation's hot paths on synthetic worlds, reporting its
+results as JSON so that they can be compared before and after a change.
+
+To be run from the `artie_life` source folder as `python -m benchmarks.hot_paths`."""
+from os import environ
+# Pygame greets on import, which would corrupt the JSON report written to stdout.
+environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+# pylint: disable=wrong-import-position
+from typing import TYPE_CHECKING
+from argparse import ArgumentParser
+from json import dump
+from platform import python_version
+from random import seed as set_python_seed
+from sys import stdout
+from time import perf_counter
+from numpy import array, zeros, percentile, float32, float64
+from numpy.random import seed as set_seed
+from benchmarks.collisions import build_world
+from controller.genetics import compute_evolutionary_genome
+from model.entities.living.brain.attention import LearningAttention
+from model.entities.living.brain.reason import LearningReason
+from utils.living.actions import Action
+from utils.living.learning.attention import assemble_state as assemble_attention_state, \
+    compute_reward as compute_attention_reward, INPUT_LAYER_DIM as ATTENTION_INPUT_DIM
+from utils.living.learning.reason import assemble_state as assemble_reason_state, \
+    compute_reward as compute_reason_reward, INPUT_LAYER_DIM as REASON_INPUT_DIM
+
+if TYPE_CHECKING:
+    from typing import Callable, Dict, List, Optional, Tuple, Union
+    from numpy import floating
+    from numpy.typing import NDArray
+    from controller.game_controller import GameController
+    from model.entities.living.living import LivingBeing
+
+POPULATIONS: "List[int]" = [10, 50, 100]
+BENCHMARK_TIMESTEP: "float" = 1 / 30
+WARMUP_FRAMES: "int" = 20
+
+def time_frames(frame: "Callable[[], object]", frames: "int",
+                between: "Optional[Callable[[], object]]" = None) -> "NDArray[float64]":
+    """Measures the duration of a frame's worth of calls, after a first untimed frame.
+
+    Positional arguments:  
+     - `frame`: the calls making up a frame.
+     - `frames`: the number of frames to be timed.
+
+    Keyword arguments:  
+     - `between`: untimed work to be run after each frame, as the batched steps \
+    completing the timed calls. If omitted, frames run back to back.
+
+    Return:  
+    An array containing each frame's duration, in seconds."""
+    frame()
+    if between is not None:
+        between()
+    durations: "List[float]" = []
+    for _ in range(frames):
+        start = perf_counter()
+        frame()
+        durations.append(perf_counter() - start)
+        if between is not None:
+            between()
+    return array(durations, dtype=float64)
+
+def summarize(name: "str", population: "int", calls: "int",
+              durations: "NDArray[float64]") -> "Dict[str, Union[str, int, float]]":
+    """Summarizes a benchmark's frame durations as per-call latencies.
+
+    Positional arguments:  
+     - `name`: the benchmark's name.
+     - `population`: the benchmarked world's population.
+     - `calls`: the number of calls in each frame.
+     - `durations`: each frame's duration, in seconds.
+
+    Return:  
+    A `Dict` containing the benchmark's identification and the mean, minimum, 50th and \
+    95th percentile of its per-call latency, in microseconds."""
+    latencies = durations / calls * 1e6
+    return {
+        "benchmark": name,
+        "population": population,
+        "calls_per_frame": calls,
+        "frames": len(durations),
+        "mean_us": float(latencies.mean()),
+        "min_us": float(latencies.min()),
+        "p50_us": float(percentile(latencies, 50)),
+        "p95_us": float(percentile(latencies, 95))
+    }
+
+def get_perceptions(living: "List[LivingBeing]") -> "List[NDArray[floating]]":
+    """Copies the current perception of each living being.
+
+    Positional arguments:  
+     - `living`: the living beings.
+
+    Return:  
+    A `List` containing each living being's perception, with one bidimensional distance \
+    per `EntityType` in `PERCEIVED_TYPES` order."""
+    return [
+        living_being.brain.perception_tracker.perception.as_array().copy()
+        for living_being in living
+    ]
+
+def benchmark_world(controller: "GameController",
+                    frames: "int") -> "List[Dict[str, Union[str, int, float]]]":
+    """Times every hot path on a world's population.
+
+    The world is first stepped for `WARMUP_FRAMES` frames, so that the living beings'
+    perception, needs, lifetime and replay memories are those of a running world.
+
+    Positional arguments:  
+     - `controller`: the benchmarked world's controller.
+     - `frames`: the number of frames to be timed for each hot path.
+
+    Return:  
+    A `List` containing the summary of each hot path, as returned by `summarize`."""
+    world = controller.world
+    for _ in range(WARMUP_FRAMES):
+        controller.update_world(BENCHMARK_TIMESTEP)
+    previous = dict(zip(map(id, world.living), get_perceptions(list(world.living))))
+    controller.update_world(BENCHMARK_TIMESTEP)
+    living: "List[LivingBeing]" = [
+        living_being for living_being in world.living if id(living_being) in previous
+    ]
+    last_perceptions = [previous[id(living_being)] for living_being in living]
+    perceptions = get_perceptions(living)
+    needs = [living_being.brain.needs_tracker.needs.as_array().copy() for living_being in living]
+    attention_out: "NDArray[float32]" = zeros(ATTENTION_INPUT_DIM, dtype=float32)
+    reason_out: "NDArray[float32]" = zeros(REASON_INPUT_DIM, dtype=float32)
+    move_x, move_y = Action.RIGHT.get_direction()
+
+    attention_lobes = [
+        living_being.brain.attention for living_being in living
+        if isinstance(living_being.brain.attention, LearningAttention)
+    ]
+    reason_lobes = [
+        living_being.brain.reason for living_being in living
+        if isinstance(living_being.brain.reason, LearningReason)
+    ]
+    attention_states = [
+        assemble_attention_state(
+            attention_out.copy(), living_being.brain.encoded_input, perception, cur_needs
+        ) for living_being, perception, cur_needs in zip(living, perceptions, needs)
+    ]
+    attention_rewards = [
+        compute_attention_reward(0.0, 0.0, last_perception, perception)
+        for last_perception, perception in zip(last_perceptions, perceptions)
+    ]
+    reason_states = [
+        assemble_reason_state(reason_out.copy(), lobe.focus, perception)
+        for lobe, perception in zip(attention_lobes, perceptions)
+    ]
+    reason_rewards = [
+        compute_reason_reward(0.0, 0.0, last_perception, lobe.focus)
+        for lobe, last_perception in zip(attention_lobes, last_perceptions)
+    ]
+    # Lobes schedule their training steps on the world's batched trainers, which must run
+    # them before the next update.
+    train = world.inference.train if world.inference is not None else None
+    # No living being is spawned while timing, and the pools' background threads would
+    # compete with the timed calls.
+    if world.pool is not None:
+        world.pool.attention.close()
+        world.pool.reason.close()
+
+    benchmarks: "List[Tuple[str, int, Callable[[], object], Optional[Callable[[], object]]]]" = [
+        ("ActionsController.can_move", len(living), lambda: [
+            living_being.controller.can_move(
+                living_being.hitbox.move(move_x, move_y), id(living_being)
+            ) for living_being in living
+        ], None),
+        ("ActionsController.interact", len(living), lambda: [
+            living_being.controller.interact(living_being.hitbox, id(living_being))
+            for living_being in living
+        ], None),
+        ("DistanceController.get_distance_by_type", len(living), lambda: [
+            world.distance_controller.get_distance_by_type(living_being.hitbox)
+            for living_being in living
+        ], None),
+        ("NeedsTracker.decay", len(living), lambda: [
+            living_being.brain.needs_tracker.decay(BENCHMARK_TIMESTEP)
+            for living_being in living
+        ], None),
+        ("attention.assemble_state", len(living), lambda: [
+            assemble_attention_state(
+                attention_out, living_being.brain.encoded_input, perception, cur_needs
+            ) for living_being, perception, cur_needs in zip(living, perceptions, needs)
+        ], None),
+        ("attention.compute_reward", len(living), lambda: [
+            compute_attention_reward(0.0, 0.0, last_perception, perception)
+            for last_perception, perception in zip(last_perceptions, perceptions)
+        ], None),
+        ("reason.assemble_state", len(attention_lobes), lambda: [
+            assemble_reason_state(reason_out, lobe.focus, perception)
+            for lobe, perception in zip(attention_lobes, perceptions)
+        ], None),
+        ("reason.compute_reward", len(attention_lobes), lambda: [
+            compute_reason_reward(0.0, 0.0, last_perception, lobe.focus)
+            for lobe, last_perception in zip(attention_lobes, last_perceptions)
+        ], None),
+        ("LearningAttention.update_and_learn", len(attention_lobes), lambda: [
+            lobe.update_and_learn(state, reward, BENCHMARK_TIMESTEP)
+            for lobe, state, reward in zip(attention_lobes, attention_states, attention_rewards)
+        ], train),
+        ("LearningReason.update_and_learn", len(reason_lobes), lambda: [
+            lobe.update_and_learn(state, reward, BENCHMARK_TIMESTEP)
+            for lobe, state, reward in zip(reason_lobes, reason_states, reason_rewards)
+        ], train),
+        ("compute_evolutionary_genome", 1, lambda: compute_evolutionary_genome(living), None)
+    ]
+    return [
+        summarize(name, len(living), calls, time_frames(frame, frames, between))
+        for name, calls, frame, between in benchmarks if calls > 0
+    ]
+
+if __name__ == "__main__":
+    parser = ArgumentParser(description="Simulation hot path benchmark suite")
+    parser.add_argument("--populations", default=POPULATIONS, type=int, nargs="+",
+                        help="population sizes of the synthetic worlds")
+    parser.add_argument("--frames", default=50, type=int, help="frames timed per hot path")
+    parser.add_argument("--seed", default=0, type=int, help="random seed for each world")
+    parser.add_argument("--output", default=None, help="JSON output file, instead of stdout")
+    arguments = parser.parse_args()
+
+    results: "List[Dict[str, Union[str, int, float]]]" = []
+    for size in arguments.populations:
+        set_seed(arguments.seed)
+        set_python_seed(arguments.seed)
+        results.extend(benchmark_world(build_world(size, True), arguments.frames))
+    report = {
+        "python": python_version(),
+        "seed": arguments.seed,
+        "frames": arguments.frames,
+        "timestep": BENCHMARK_TIMESTEP,
+        "results": results
+    }
+    if arguments.output is not None:
+        with open(arguments.output, "w", encoding="utf-8") as output:
+            dump(report, output, indent=2)
+    else:
+        dump(report, stdout, indent=2)
+        print()
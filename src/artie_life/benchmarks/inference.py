@@ -0,0 +1,109 @@
+"""Benchmark comparing per-decision latency of the learning lobes' inference backends.
+
+To be run from the `artie_life` source folder as `python -m benchmarks.inference`."""
+from typing import TYPE_CHECKING
+from argparse import ArgumentParser
+from time import perf_counter
+from numpy import arange, int64
+from numpy.random import seed as set_seed, uniform
+from controller.genetics import create_random_genome
+from model.entities.living.brain.attention import LearningAttention
+from model.entities.living.brain.reason import LearningReason
+from model.entities.living.brain.inference import PopulationInference
+from utils.living.learning.attention import INPUT_LAYER_DIM as ATTENTION_INPUT_DIM
+from utils.living.learning.reason import INPUT_LAYER_DIM as REASON_INPUT_DIM
+
+if TYPE_CHECKING:
+    from typing import Callable, List, Tuple, Union
+    from numpy import floating
+    from numpy.typing import NDArray
+    from model.entities.living.brain.inference import StackedNetwork
+
+POPULATIONS: "List[int]" = [1, 10, 50, 200]
+
+def time_calls(call: "Callable[[], object]", repeats: "int") -> "float":
+    """Measures the average duration of a call.
+
+    Positional arguments:  
+     - `call`: the call to be timed.
+     - `repeats`: the number of calls to be averaged.
+
+    Return:  
+    The average call duration, in seconds."""
+    call()
+    start = perf_counter()
+    for _ in range(repeats):
+        call()
+    return (perf_counter() - start) / repeats
+
+def build_lobes(population: "int", inference: "PopulationInference") \
+        -> "Tuple[List[LearningAttention], List[LearningReason]]":
+    """Builds the learning lobes of a population, mirroring their weights into the
+    inference engine's stacks.
+
+    Positional arguments:  
+     - `population`: the number of living beings.
+     - `inference`: the inference engine holding the stacked weights."""
+    attention: "List[LearningAttention]" = []
+    reason: "List[LearningReason]" = []
+    for slot in range(population):
+        genome = create_random_genome()
+        attention.append(LearningAttention(genome, inference.attention, slot))
+        reason.append(LearningReason(genome, inference.reason, slot))
+    return (attention, reason)
+
+def benchmark_lobe(lobes: "Union[List[LearningAttention], List[LearningReason]]",
+                   network: "StackedNetwork", states: "NDArray[floating]",
+                   repeats: "int") -> "Tuple[float, float, float, float]":
+    """Measures the per-decision latency of a lobe kind on all backends.
+
+    Positional arguments:  
+     - `lobes`: the population's lobes of the benchmarked kind.
+     - `network`: the stacked networks mirroring the lobes' weights.
+     - `states`: one input state for each lobe.
+     - `repeats`: the number of passes to be averaged.
+
+    Return:  
+    A `Tuple` containing the per-decision latency of the Keras model call, of the \
+    single-row NumPy pass and of the population-wide NumPy pass, in seconds, and the \
+    largest absolute difference between Keras and NumPy Q-values."""
+    slots = arange(len(lobes), dtype=int64)
+    keras_time = time_calls(
+        lambda: [lobe.model(states[i:i + 1], training=False) for i, lobe in enumerate(lobes)],
+        repeats
+    ) / len(lobes)
+    single_time = time_calls(
+        lambda: [network.forward(slots[i:i + 1], states[i:i + 1]) for i in range(len(lobes))],
+        repeats
+    ) / len(lobes)
+    batched_time = time_calls(lambda: network.forward(slots, states), repeats) / len(lobes)
+    difference = max(
+        float(abs(lobe.model(states[i:i + 1], training=False).numpy()
+                  - network.forward(slots[i:i + 1], states[i:i + 1])).max())
+        for i, lobe in enumerate(lobes)
+    )
+    return (keras_time, single_time, batched_time, difference)
+
+if __name__ == "__main__":
+    parser = ArgumentParser(description="Per-decision lobe inference latency benchmark")
+    parser.add_argument("--repeats", default=20, type=int, help="passes averaged per size")
+    parser.add_argument("--seed", default=0, type=int, help="random seed for inputs")
+    arguments = parser.parse_args()
+
+    set_seed(arguments.seed)
+    print("lobe,population,keras_us,numpy_single_us,numpy_batched_us,max_abs_diff")
+    for size in POPULATIONS:
+        engine = PopulationInference()
+        attention_lobes, reason_lobes = build_lobes(size, engine)
+        for name, lobe_list, stack, input_dim in [
+            ("attention", attention_lobes, engine.attention, ATTENTION_INPUT_DIM),
+            ("reason", reason_lobes, engine.reason, REASON_INPUT_DIM)
+        ]:
+            keras_us, single_us, batched_us, max_diff = benchmark_lobe(
+                lobe_list,
+                stack,
+                uniform(-50, 50, (size, input_dim)).astype("float32"),
+                arguments.repeats
+            )
+            print(f"{name},{size},{keras_us * 1e6:.1f},{single_us * 1e6:.1f}," +
+                  f"{batched_us * 1e6:.2f},{max_diff:.2e}")
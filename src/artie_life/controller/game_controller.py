@@ -1,77 +1,212 @@
 """Module containing the main game controller implementation."""
 from typing import TYPE_CHECKING
 from model.world import World
+from model.checkpoint import capture_world, restore_world, restore_pool, restore_inference, \
+    restore_random_state
 from controller.genetics import create_random_genome, compute_evolutionary_genome
 from utils.living.actions import EntityType
 
 if TYPE_CHECKING:
-    from typing import List, Tuple, Dict
+    from typing import List, Tuple, Dict, Optional, Sequence, Union
+    from numpy import int32, bool_
+    from numpy.typing import NDArray
     from pygame.rect import Rect
     from model.entities.non_living import Entity
+    from controller.world.distance_field import StaticDistanceField
+    from model.services import PopulationServices
 
 class GameController:
     """Implementation of the game controller."""
-    def __init__(self, genetic_algorithm: "str", learning_enable: "bool") -> "None":
+    def __init__(self, genetic_algorithm: "str", learning_enable: "bool",
+                 inference_backend: "str" = "numpy",
+                 performance_log: "str" = "frames",
+                 phase_timing: "bool" = False) -> "None":
         """Instantiates a game controller.  
         
         Positional arguments:  
          - `genetic_algorithm`: a `str` indicating what genetic algorithm should be \
         applied to the world's population.  
          - `learning_enable`: a `bool` representing if the living beings should learn \
-        or act randomly."""
+        or act randomly.
+        
+        Keyword arguments:  
+         - `inference_backend`: `numpy` to evaluate the learning lobes' decisions with \
+        batched NumPy products over mirrored weights, or `keras` to query each lobe's \
+        Keras model.
+         - `performance_log`: `frames` to log the duration of every frame, or \
+        `histograms` to log frame duration percentiles over windows of frames.
+         - `phase_timing`: if `True`, the duration of each update phase is measured, \
+        and its rolling percentiles logged along with the performance log."""
         self.world: "World"
         self.genetic_algorithm = genetic_algorithm
         self.learning_enable = learning_enable
+        self.inference_backend = inference_backend
+        self.performance_log = performance_log
+        self.phase_timing = phase_timing
 
-    def create_world(self, population: "int", world_id: "int") -> "None":
+    def create_world(self, population: "int", world_id: "int",
+                     services: "Optional[PopulationServices]" = None,
+                     distance_field: "Optional[StaticDistanceField]" = None) -> "None":
         """Creates a new game world.
         
         Positional arguments:  
-         - `population`: the starting population size.  
-         - `world_id`: the world's in-game ID."""
-        self.world = World(self, world_id)
+         - `population`: the starting population size. If the playground fills up, \
+        fewer living beings are spawned.  
+         - `world_id`: the world's in-game ID.
+        
+        Keyword arguments:  
+         - `services`: the state store, inference engine and model pool, if shared with \
+        other worlds. If omitted, the world creates its own.
+         - `distance_field`: the static distance field, if shared with other worlds. If \
+        omitted, the world precomputes its own."""
+        self.world = World(
+            self,
+            world_id,
+            services=services,
+            distance_field=distance_field
+        )
         for _ in range(population):
-            self.spawn_random_living()
+            if not self.spawn_random_living():
+                break
+
+    def restore_world(self, checkpoint: "Dict[str, NDArray]",
+                      services: "Optional[PopulationServices]" = None,
+                      distance_field: "Optional[StaticDistanceField]" = None) -> "float":
+        """Creates a game world from a checkpoint.
+        
+        Positional arguments:  
+         - `checkpoint`: the world's checkpoint, as loaded by `load_checkpoint`.
+        
+        Keyword arguments:  
+         - `services`: the state store, inference engine and model pool, if shared with \
+        other worlds. If omitted, the world creates its own, and restores them along with \
+        the random generators. Otherwise, restoring them is up to the caller.
+         - `distance_field`: the static distance field, if shared with other worlds. If \
+        omitted, the world precomputes its own.
+        
+        Return:  
+        The amount of simulated time since the recorded world started, in seconds."""
+        self.world = World(
+            self,
+            int(checkpoint["world_id"]),
+            services=services,
+            distance_field=distance_field,
+            resume=True
+        )
+        if services is None and self.world.pool is not None:
+            restore_pool(self.world.pool, [checkpoint])
+        if services is None and self.world.inference is not None:
+            restore_inference(self.world.inference, [checkpoint])
+        simulated_time = restore_world(self.world, checkpoint)
+        if services is None:
+            restore_random_state(checkpoint)
+        return simulated_time
 
-    def spawn_random_living(self) -> "None":
-        """Spawns a new living being in the current game world, giving it a random genome."""
-        self.world.spawn_living(
+    def capture_checkpoints(self, simulated_time: "float") -> "Dict[int, Dict[str, NDArray]]":
+        """Records the controlled world's checkpoint, if the world was created.
+        
+        Positional arguments:  
+         - `simulated_time`: the amount of simulated time since the world started, in \
+        seconds.
+        
+        Return:  
+        A `Dict` associating the world's in-game ID to its checkpoint's arrays."""
+        return {self.world.world_id: capture_world(self.world, simulated_time)} \
+            if hasattr(self, "world") else { }
+
+    def spawn_random_living(self) -> "bool":
+        """Spawns a new living being in the current game world, giving it a random genome.
+        
+        Return:  
+        `True` if the living being was spawned, `False` if the playground is full."""
+        return self.world.spawn_living(
             self,
             create_random_genome(),
             self.learning_enable
         )
 
-    def spawn_evolutionary_living(self) -> "None":
+    def spawn_evolutionary_living(self) -> "bool":
         """Spawns a new living being in the current game world, applying the genetic
-        algorithm to determine its genome."""
-        self.world.spawn_living(
+        algorithm to determine its genome.
+        
+        Return:  
+        `True` if the living being was spawned, `False` if the playground is full."""
+        return self.world.spawn_living(
             self,
             compute_evolutionary_genome(self.world.living),
             self.learning_enable
         )
 
-    def spawn_living(self) -> "None":
+    def spawn_living(self) -> "bool":
         """Spawns a living being in the current game world, checking wether the genetic algorithm
-        should - or could - be applied."""
+        should - or could - be applied.
+        
+        Return:  
+        `True` if the living being was spawned, `False` otherwise."""
         if len(self.world.living) < 2 or self.genetic_algorithm == "none":
-            self.spawn_random_living()
-        elif self.genetic_algorithm == "params":
-            self.spawn_evolutionary_living()
+            return self.spawn_random_living()
+        if self.genetic_algorithm == "params":
+            return self.spawn_evolutionary_living()
+        return False
 
-    def get_all_entities(self) -> "List[Tuple[EntityType, Entity]]":
+    def get_all_entities(self) -> "Sequence[Tuple[EntityType, Entity]]":
         """Returns all map entities with their type.
         
+        Return:  
+        A read-only `Sequence` of `Tuple` containing the `EntityType` and the `Entity`  
+        object representing each entity, kept up to date by the world's registry."""
+        return self.world.registry.get_all()
+
+    def get_entities_by_type(self, entity_type: "EntityType") -> "Sequence[Entity]":
+        """Returns all map entities of a given type.
+        
+        Positional arguments:  
+         - `entity_type`: the desired `EntityType`.
+        
+        Return:  
+        A read-only `Sequence` of the `Entity` objects of the desired type."""
+        return self.world.registry.get_by_type(entity_type)
+
+    def get_nearby_entities(self, hitbox: "Rect") -> "List[Tuple[EntityType, Entity]]":
+        """Returns all map entities that could be colliding with a given hitbox.
+        
+        Positional arguments:  
+         - `hitbox`: the hitbox to be checked.
+        
         Return:  
         A `List` of `Tuple` containing the `EntityType` and the `Entity` object  
-        representing each entity."""
-        elems: "List[Tuple[EntityType, Entity]]" = []
-        elems.append((EntityType.PLAYGROUND, self.world.playground))
-        for ent_type, ents in self.world.interactive_spots.items():
-            for entity in ents:
-                elems.append((ent_type, entity))
-        for living in self.world.living:
-            elems.append((EntityType.LIVING, living))
-        return elems
+        representing each entity sharing a spatial index cell with the hitbox, in the  
+        same order as `get_all_entities`."""
+        return self.world.spatial_index.query(hitbox)
+
+    def get_static_distances(self, hitbox: "Rect") \
+            -> "Optional[Dict[EntityType, Tuple[float, float]]]":
+        """Returns the precomputed distances of a given hitbox from the closest instance of
+        each static entity type.
+        
+        Positional arguments:  
+         - `hitbox`: the living being's current hitbox.
+        
+        Return:  
+        A `Dict` associating to each static `EntityType` the two dimensions' distance from  
+        its closest instance, or `None` if the hitbox is not covered by the distance field."""
+        return self.world.distance_field.lookup(hitbox)
+
+    def get_all_static_distances(self, boxes: "NDArray[int32]") \
+            -> "Tuple[List[EntityType], NDArray[int32], NDArray[bool_]]":
+        """Returns the precomputed distances of a batch of hitboxes from the closest instance
+        of each static entity type.
+        
+        Positional arguments:  
+         - `boxes`: an array of shape `(N, 4)` containing each hitbox's left, top, width \
+        and height.
+        
+        Return:  
+        A `Tuple` containing the `List` of static `EntityType`, an array of shape  
+        `(len(types), N, 2)` with the corresponding distances, and a boolean mask telling  
+        which hitboxes are covered by the distance field."""
+        offsets, covered = self.world.distance_field.lookup_all(boxes)
+        return (self.world.distance_field.types, offsets, covered)
 
     def get_map_elems(self) -> "List[Tuple[EntityType, Rect]]":
         """Returns all map entities' hitboxes with their type.
@@ -119,6 +254,15 @@ class GameController:
          - `elapsed_time`: the amount of time elapsed since the last update step, in seconds."""
         self.world.update(elapsed_time)
 
+    def get_summaries(self) -> "List[Dict[str, Union[int, float]]]":
+        """Summarizes the current state of the controlled world.
+        
+        Return:  
+        A `List` containing the world's summary, or an empty `List` if the world was \
+        never created."""
+        return [self.world.get_summary()] if hasattr(self, "world") else []
+
     def dump_current_state(self) -> "None":
-        """Logs the world's current state."""
-        self.world.dump_current_state()
+        """Logs the world's current state, if the world was created."""
+        if hasattr(self, "world"):
+            self.world.dump_current_state()
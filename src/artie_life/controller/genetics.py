@@ -1,11 +1,14 @@
 """Module containing all necessary functions for the genetic algorithm."""
 from typing import TYPE_CHECKING
+from numpy import zeros
 from numpy.random import uniform, randint, normal
-from utils.living.needs import Need
+from utils.living.needs import Need, NEED_COLUMNS
 from utils.living.genome import Gene, MUTATION_RATE
 
 if TYPE_CHECKING:
-    from typing import Dict, List, Tuple
+    from typing import Dict, List, Sequence, Tuple
+    from numpy import floating
+    from numpy.typing import NDArray
     from model.entities.living.living import LivingBeing
     from model.entities.living.brain.central import Brain
 
@@ -36,6 +39,23 @@ def compute_fitness(needs_avg: "Dict[Need, float]") -> "float":
     no_life_avg: "float" = needs_avg_sum / (len(Need) - 2)
     return (no_life_avg + 100 - needs_avg[Need.LIFE]) / 2
 
+def compute_population_fitness(needs_avg: "NDArray[floating]") -> "NDArray[floating]":
+    """Computes the fitness function of a whole population at once, with the same
+    operations of `compute_fitness`.
+
+    Positional arguments:  
+     - `needs_avg`: an array containing, for each living being, the average value of each \
+    tracked `Need`, in the columns given by `NEED_COLUMNS`.
+    
+    Return:  
+    An array containing the fitness value of each living being."""
+    needs_avg_sum: "NDArray[floating]" = zeros(len(needs_avg), dtype=needs_avg.dtype)
+    for need in Need:
+        if need not in [Need.LIFE, Need.NONE]:
+            needs_avg_sum = needs_avg_sum + (100 - needs_avg[:, NEED_COLUMNS[need]])
+    no_life_avg = needs_avg_sum / (len(Need) - 2)
+    return (no_life_avg + 100 - needs_avg[:, NEED_COLUMNS[Need.LIFE]]) / 2
+
 def compute_whole_fitness(brain: "Brain") -> "float":
     """Computes the whole fitness of a living being, wheighted by its lifetime.
     
@@ -46,7 +66,7 @@ def compute_whole_fitness(brain: "Brain") -> "float":
     The fitness value of the living being weighted by its lifetime."""
     return brain.needs_tracker.lifetime * compute_fitness(brain.needs_tracker.needs_avg)
 
-def select_parents(population: "List[LivingBeing]") -> "Tuple[LivingBeing, LivingBeing]":
+def select_parents(population: "Sequence[LivingBeing]") -> "Tuple[LivingBeing, LivingBeing]":
     """Picks two parents from a given population, according to their fitness value.
     
     Positional arguments:  
@@ -80,7 +100,7 @@ def mutation(range: "float") -> "float":
     The magnitude of the gene mutation."""
     return normal(loc=0.0, scale=range) if uniform() <= MUTATION_RATE else 0.0
 
-def compute_evolutionary_genome(population: "List[LivingBeing]") -> "Dict[Gene, float]":
+def compute_evolutionary_genome(population: "Sequence[LivingBeing]") -> "Dict[Gene, float]":
     """Computes the new offspring genome, applying the genetic algorithm to the desired
     parent population.
     
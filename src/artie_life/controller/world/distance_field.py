@@ -0,0 +1,93 @@
+"""Module containing the precomputed distance field to static interactive spots."""
+from typing import TYPE_CHECKING
+from numpy import arange, full, zeros, where, int32
+from utils.map.constants import MAP_WIDTH, MAP_HEIGHT, LIVING_WIDTH, LIVING_HEIGHT
+
+if TYPE_CHECKING:
+    from typing import Dict, List, Optional, Tuple
+    from numpy import bool_
+    from numpy.typing import NDArray
+    from pygame.rect import Rect
+    from model.entities.non_living import InteractiveSpot
+    from utils.living.actions import EntityType
+
+class StaticDistanceField:
+    """Implementation of a lookup table storing, for every admissible living being
+    position, the offset to the closest instance of each static entity type.
+
+    Since hitboxes have integer coordinates, the table is exact for every living being
+    contained in the map, matching the results of a live query on the same spots."""
+    def __init__(self, spots: "Dict[EntityType, List[InteractiveSpot]]") -> "None":
+        """Precomputes the distance field.
+
+        Positional arguments:  
+         - `spots`: the static interactive spots of the world, grouped by type."""
+        self.width: "int" = int(LIVING_WIDTH)
+        self.height: "int" = int(LIVING_HEIGHT)
+        self.columns: "int" = int(MAP_WIDTH) - self.width + 1
+        self.rows: "int" = int(MAP_HEIGHT) - self.height + 1
+        self.types: "List[EntityType]" = list(spots.keys())
+        self.offsets: "NDArray[int32]" = zeros(
+            (len(self.types), self.rows, self.columns, 2),
+            dtype=int32
+        )
+        lefts = arange(self.columns).reshape(1, self.columns)
+        tops = arange(self.rows).reshape(self.rows, 1)
+        centers_x = lefts + self.width // 2
+        centers_y = tops + self.height // 2
+        for type_idx, entity_type in enumerate(self.types):
+            min_dist = full((self.rows, self.columns), MAP_WIDTH**2 + MAP_HEIGHT**2)
+            min_x = full((self.rows, self.columns), int(MAP_WIDTH))
+            min_y = full((self.rows, self.columns), int(MAP_HEIGHT))
+            colliding = zeros((self.rows, self.columns), dtype=bool)
+            for spot in spots[entity_type]:
+                dist_x = spot.hitbox.centerx - centers_x
+                dist_y = spot.hitbox.centery - centers_y
+                dist = dist_x**2 + dist_y**2
+                closer = dist < min_dist
+                min_dist = where(closer, dist, min_dist)
+                min_x = where(closer, dist_x, min_x)
+                min_y = where(closer, dist_y, min_y)
+                colliding |= (lefts < spot.hitbox.right) \
+                    & (lefts + self.width > spot.hitbox.left) \
+                    & (tops < spot.hitbox.bottom) \
+                    & (tops + self.height > spot.hitbox.top)
+            self.offsets[type_idx, :, :, 0] = where(colliding, 0, min_x)
+            self.offsets[type_idx, :, :, 1] = where(colliding, 0, min_y)
+
+    def lookup(self, hitbox: "Rect") -> "Optional[Dict[EntityType, Tuple[float, float]]]":
+        """Retrieves the precomputed offsets for a given hitbox.
+
+        Positional arguments:  
+         - `hitbox`: the living being's current hitbox.
+
+        Return:  
+        A `Dict` associating to each static `EntityType` the `Tuple` representing the
+        two dimensions' distance from its closest instance, or `None` if the hitbox is
+        not covered by the field."""
+        if hitbox.width != self.width or hitbox.height != self.height \
+                or not 0 <= hitbox.left < self.columns or not 0 <= hitbox.top < self.rows:
+            return None
+        return dict(zip(
+            self.types,
+            map(tuple, self.offsets[:, hitbox.top, hitbox.left].tolist())
+        ))
+
+    def lookup_all(self, boxes: "NDArray[int32]") -> "Tuple[NDArray[int32], NDArray[bool_]]":
+        """Retrieves the precomputed offsets for a whole batch of hitboxes at once.
+
+        Positional arguments:  
+         - `boxes`: an array of shape `(N, 4)` containing each hitbox's left, top, width \
+        and height.
+
+        Return:  
+        A `Tuple` containing an array of shape `(len(types), N, 2)` with the offsets from
+        the closest instance of each static `EntityType`, and a boolean mask of shape `(N,)`
+        telling which hitboxes are covered by the field. Rows not covered by the field
+        contain meaningless values."""
+        covered = (boxes[:, 2] == self.width) & (boxes[:, 3] == self.height) \
+            & (boxes[:, 0] >= 0) & (boxes[:, 0] < self.columns) \
+            & (boxes[:, 1] >= 0) & (boxes[:, 1] < self.rows)
+        lefts = where(covered, boxes[:, 0], 0)
+        tops = where(covered, boxes[:, 1], 0)
+        return (self.offsets[:, tops, lefts], covered)
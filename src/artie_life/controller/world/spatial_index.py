@@ -0,0 +1,113 @@
+"""Module containing the uniform-grid spatial index for game entities."""
+from typing import TYPE_CHECKING
+from itertools import count
+from utils.map.constants import MAP_WIDTH, MAP_HEIGHT, GRID_CELL_WIDTH, GRID_CELL_HEIGHT
+
+if TYPE_CHECKING:
+    from typing import Dict, Iterator, List, Tuple
+    from pygame.rect import Rect
+    from model.entities.non_living import Entity
+    from utils.living.actions import EntityType
+
+GRID_COLUMNS: "int" = int(-(-MAP_WIDTH // GRID_CELL_WIDTH))
+GRID_ROWS: "int" = int(-(-MAP_HEIGHT // GRID_CELL_HEIGHT))
+
+class SpatialIndex:
+    """Implementation of a uniform-grid spatial index over the game map.
+
+    Each entity is registered in every cell its hitbox overlaps, so that collision
+    queries only need to test entities sharing at least one cell with the queried
+    hitbox. Query results preserve the entities' insertion order."""
+    def __init__(self) -> "None":
+        """Instantiates an empty spatial index."""
+        self.cells: "List[Dict[int, Tuple[int, EntityType, Entity]]]" = [
+            { } for _ in range(GRID_COLUMNS * GRID_ROWS)
+        ]
+        self.entries: \
+            "Dict[int, Tuple[int, EntityType, Entity, Tuple[int, int, int, int]]]" = { }
+        self.sequence: "Iterator[int]" = count()
+
+    def get_cell_range(self, hitbox: "Rect") -> "Tuple[int, int, int, int]":
+        """Computes the range of grid cells overlapped by a given hitbox.
+
+        Positional arguments:  
+         - `hitbox`: the hitbox whose cells are requested.
+
+        Return:  
+        A `Tuple` containing the first and last column and the first and last row
+        overlapped by the hitbox, clamped to the grid's boundaries."""
+        return (
+            min(max(int(hitbox.left // GRID_CELL_WIDTH), 0), GRID_COLUMNS - 1),
+            min(max(int(max(hitbox.left, hitbox.right - 1) // GRID_CELL_WIDTH), 0),
+                GRID_COLUMNS - 1),
+            min(max(int(hitbox.top // GRID_CELL_HEIGHT), 0), GRID_ROWS - 1),
+            min(max(int(max(hitbox.top, hitbox.bottom - 1) // GRID_CELL_HEIGHT), 0),
+                GRID_ROWS - 1)
+        )
+
+    def get_cells(self, cell_range: "Tuple[int, int, int, int]") \
+            -> "Iterator[Dict[int, Tuple[int, EntityType, Entity]]]":
+        """Iterates over all cells within a given range.
+
+        Positional arguments:  
+         - `cell_range`: the range of cells, as computed by `get_cell_range`."""
+        min_col, max_col, min_row, max_row = cell_range
+        for row in range(min_row, max_row + 1):
+            for col in range(min_col, max_col + 1):
+                yield self.cells[row * GRID_COLUMNS + col]
+
+    def insert(self, entity_type: "EntityType", entity: "Entity") -> "None":
+        """Registers an entity in the spatial index.
+
+        Positional arguments:  
+         - `entity_type`: the type of the entity.
+         - `entity`: the entity to be registered."""
+        cell_range = self.get_cell_range(entity.hitbox)
+        entry = (next(self.sequence), entity_type, entity)
+        self.entries[id(entity)] = (*entry, cell_range)
+        for cell in self.get_cells(cell_range):
+            cell[id(entity)] = entry
+
+    def remove(self, entity: "Entity") -> "None":
+        """Removes an entity from the spatial index.
+
+        Positional arguments:  
+         - `entity`: the entity to be removed."""
+        entry = self.entries.pop(id(entity), None)
+        if entry is not None:
+            for cell in self.get_cells(entry[3]):
+                cell.pop(id(entity), None)
+
+    def update(self, entity: "Entity") -> "None":
+        """Updates the cells an entity is registered in, after its hitbox has moved.
+
+        Positional arguments:  
+         - `entity`: the moved entity."""
+        entry = self.entries.get(id(entity))
+        if entry is None:
+            return
+        cell_range = self.get_cell_range(entity.hitbox)
+        if cell_range != entry[3]:
+            for cell in self.get_cells(entry[3]):
+                cell.pop(id(entity), None)
+            for cell in self.get_cells(cell_range):
+                cell[id(entity)] = entry[:3]
+            self.entries[id(entity)] = (*entry[:3], cell_range)
+
+    def query(self, hitbox: "Rect") -> "List[Tuple[EntityType, Entity]]":
+        """Retrieves all entities sharing at least one grid cell with a given hitbox.
+
+        Positional arguments:  
+         - `hitbox`: the hitbox to be queried.
+
+        Return:  
+        A `List` of `Tuple` containing the `EntityType` and the `Entity` object of each
+        candidate, in insertion order. Candidates are not guaranteed to collide with
+        the queried hitbox."""
+        candidates: "Dict[int, Tuple[int, EntityType, Entity]]" = { }
+        for cell in self.get_cells(self.get_cell_range(hitbox)):
+            candidates.update(cell)
+        return [
+            (entity_type, entity)
+            for _, entity_type, entity in sorted(candidates.values(), key=lambda x: x[0])
+        ]
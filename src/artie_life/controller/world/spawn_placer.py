@@ -0,0 +1,75 @@
+"""Module containing the occupancy-aware spawn placement service."""
+from typing import TYPE_CHECKING
+from numpy import ones, flatnonzero
+from numpy.random import randint
+from pygame.rect import Rect
+from utils.map.constants import LIVING_WIDTH, LIVING_HEIGHT
+
+if TYPE_CHECKING:
+    from typing import Iterable, Optional
+    from numpy import bool_
+    from numpy.typing import NDArray
+    from model.entities.non_living import Entity, Playground
+
+class SpawnPlacer:
+    """Implementation of the spawn placement service.
+
+    It keeps an occupancy map of all living-sized positions inside the playground,
+    marking as occupied every position whose hitbox would collide with a blocking
+    entity, and samples new spawn positions directly among the free ones."""
+    def __init__(self, playground: "Playground") -> "None":
+        """Instantiates the spawn placer.
+
+        Positional arguments:  
+         - `playground`: the world's playground."""
+        self.left: "int" = playground.hitbox.left
+        self.top: "int" = playground.hitbox.top
+        self.width: "int" = int(LIVING_WIDTH)
+        self.height: "int" = int(LIVING_HEIGHT)
+        self.columns: "int" = playground.hitbox.width - self.width + 1
+        self.rows: "int" = playground.hitbox.height - self.height + 1
+        self.free: "Optional[NDArray[bool_]]" = None
+
+    def invalidate(self) -> "None":
+        """Discards the occupancy map. To be invoked whenever blocking entities move."""
+        self.free = None
+
+    def occupy(self, hitbox: "Rect") -> "None":
+        """Marks as occupied all positions whose hitbox would collide with a given one.
+
+        Positional arguments:  
+         - `hitbox`: the hitbox of the blocking entity."""
+        if self.free is not None:
+            self.free[
+                max(hitbox.top - self.height + 1 - self.top, 0):
+                    max(hitbox.bottom - self.top, 0),
+                max(hitbox.left - self.width + 1 - self.left, 0):
+                    max(hitbox.right - self.left, 0)
+            ] = False
+
+    def place(self, blocking: "Iterable[Entity]") -> "Optional[Rect]":
+        """Picks a random free spawn position, uniformly among all free ones, and marks
+        it as occupied.
+
+        Positional arguments:  
+         - `blocking`: all entities living beings cannot walk on. Only used to rebuild \
+        the occupancy map, if it was invalidated.
+
+        Return:  
+        The hitbox of the spawned living being, or `None` if the playground is full."""
+        if self.free is None:
+            self.free = ones((self.rows, self.columns), dtype=bool)
+            for entity in blocking:
+                self.occupy(entity.hitbox)
+        candidates = flatnonzero(self.free)
+        if len(candidates) == 0:
+            return None
+        position = candidates[randint(len(candidates))]
+        hitbox = Rect(
+            self.left + position % self.columns,
+            self.top + position // self.columns,
+            self.width,
+            self.height
+        )
+        self.occupy(hitbox)
+        return hitbox
@@ -1,15 +1,71 @@
 """Module containing all world controllers implementation."""
 from typing import TYPE_CHECKING
-from numpy import sqrt
+from numpy import sqrt, array, zeros, where, argmin, arange, inf, int32
 from pygame import Vector2
 from pygame.rect import Rect
 from utils.map.constants import MAP_WIDTH, MAP_HEIGHT
 from utils.living.actions import EntityType, InteractionType
 
 if TYPE_CHECKING:
-    from typing import Dict, Tuple
+    from typing import Dict, List, Optional, Tuple
+    from numpy import bool_
+    from numpy.typing import NDArray
     from controller.game_controller import GameController
 
+def compute_closest_offsets(sources: "NDArray[int32]", targets: "NDArray[int32]",
+                            excluded: "NDArray[bool_]") -> "List[Tuple[float, float]]":
+    """Computes, for a batch of hitboxes, the distance from the closest hitbox among a
+    set of targets, with the same semantics of `DistanceController.get_closest_distance`.
+    
+    Positional arguments:  
+     - `sources`: an array of shape `(N, 4)` containing each queried hitbox's left, top, \
+    width and height.
+     - `targets`: an array of shape `(M, 4)` containing each target hitbox, in the same \
+    format as `sources`.
+     - `excluded`: a boolean array of shape `(N, M)` marking target hitboxes that must \
+    be ignored for each source, such as the source itself.
+    
+    Return:  
+    A `List` containing, for each source, a `Tuple` indicating the two dimensions' \
+    distance from its closest target."""
+    if len(targets) == 0:
+        return [(MAP_WIDTH, MAP_HEIGHT) for _ in range(len(sources))]
+    dist_x = (targets[:, 0] + targets[:, 2] // 2)[None, :] \
+        - (sources[:, 0] + sources[:, 2] // 2)[:, None]
+    dist_y = (targets[:, 1] + targets[:, 3] // 2)[None, :] \
+        - (sources[:, 1] + sources[:, 3] // 2)[:, None]
+    dist = dist_x**2 + dist_y**2
+    candidates = ~excluded & (dist < MAP_WIDTH**2 + MAP_HEIGHT**2)
+    colliding = ~excluded \
+        & (sources[:, 0, None] < (targets[:, 0] + targets[:, 2])[None, :]) \
+        & ((sources[:, 0] + sources[:, 2])[:, None] > targets[None, :, 0]) \
+        & (sources[:, 1, None] < (targets[:, 1] + targets[:, 3])[None, :]) \
+        & ((sources[:, 1] + sources[:, 3])[:, None] > targets[None, :, 1])
+    closest = argmin(where(candidates, dist, inf), axis=1)
+    rows = arange(len(sources))
+    offsets: "List[Tuple[float, float]]" = []
+    for collided, found, min_x, min_y in zip(
+        colliding.any(axis=1).tolist(),
+        candidates.any(axis=1).tolist(),
+        dist_x[rows, closest].tolist(),
+        dist_y[rows, closest].tolist()
+    ):
+        offsets.append(
+            (0, 0) if collided else ((min_x, min_y) if found else (MAP_WIDTH, MAP_HEIGHT))
+        )
+    return offsets
+
+def to_boxes(hitboxes: "List[Rect]") -> "NDArray[int32]":
+    """Converts a `List` of hitboxes into an array of shape `(N, 4)` containing each
+    hitbox's left, top, width and height.
+    
+    Positional arguments:  
+     - `hitboxes`: the hitboxes to be converted."""
+    return array(
+        [(hitbox.left, hitbox.top, hitbox.width, hitbox.height) for hitbox in hitboxes],
+        dtype=int32
+    ).reshape(len(hitboxes), 4)
+
 class ActionsController:
     """Implementation for the game's movement controller."""
     def __init__(self, controller: "GameController") -> "None":
@@ -30,7 +86,7 @@ class ActionsController:
         Return:  
         `True` if the indicated hitbox's position is valid, `False` otherwise."""
         if self.map.contains(hitbox):
-            for entity_type, entity in self.controller.get_all_entities():
+            for entity_type, entity in self.controller.get_nearby_entities(hitbox):
                 if id(entity) != entity_id \
                         and not entity_type.walkable() \
                         and entity.is_colliding(hitbox):
@@ -48,7 +104,7 @@ class ActionsController:
         Return:  
         If the living being can interact, the corresponding `InteractionType`.  
         Otherwise, `InteractionType.NONE` is returned."""
-        for entity_type, entity in self.controller.get_all_entities():
+        for entity_type, entity in self.controller.get_nearby_entities(hitbox):
             if id(entity) != entity_id \
                     and entity.is_colliding(hitbox):
                 return entity_type.get_interaction()
@@ -74,24 +130,90 @@ class DistanceController:
         Returns:  
         Given a living being's hitbox, it computes the distance to the closest instance
         of each `EntityType`. Those distances are then expressed as `Tuple` indicating
-        the two dimensions' distance."""
+        the two dimensions' distance.  
+        Distances from static entity types are read from the world's precomputed
+        distance field, while the other types are computed live."""
         distances: "Dict[EntityType, Tuple[float, float]]" = { }
+        static_distances = self.controller.get_static_distances(hitbox)
         for cur_entity_type in EntityType:
             if cur_entity_type != EntityType.PLAYGROUND:
-                min_dist = sqrt(MAP_WIDTH**2 + MAP_HEIGHT**2)
-                min_x: "float" = MAP_WIDTH
-                min_y: "float" = MAP_HEIGHT
-                for entity_type, entity in self.controller.get_all_entities():
-                    if entity_type == cur_entity_type and entity.hitbox is not hitbox:
-                        if entity.hitbox.colliderect(hitbox):
-                            min_x = 0
-                            min_y = 0
-                            min_dist = 0
-                        else:
-                            dist = Vector2(entity.hitbox.center).distance_to(hitbox.center)
-                            if dist < min_dist:
-                                min_x = entity.hitbox.centerx - hitbox.centerx
-                                min_y = entity.hitbox.centery - hitbox.centery
-                                min_dist = dist
-                distances[cur_entity_type] = (min_x, min_y)
+                if static_distances is not None and cur_entity_type in static_distances:
+                    distances[cur_entity_type] = static_distances[cur_entity_type]
+                else:
+                    distances[cur_entity_type] = \
+                        self.get_closest_distance(hitbox, cur_entity_type)
         return distances
+
+    def get_closest_distance(self, hitbox: "Rect",
+                             cur_entity_type: "EntityType") -> "Tuple[float, float]":
+        """Computes the distance of a given hitbox from the closest instance of a
+        single game entity type, scanning all entities of that type.
+        
+        Positional arguments:  
+         - `hitbox`: the living being's current hitbox.
+         - `cur_entity_type`: the type of the entities to be scanned.
+        
+        Return:  
+        A `Tuple` indicating the two dimensions' distance from the closest instance."""
+        min_dist = sqrt(MAP_WIDTH**2 + MAP_HEIGHT**2)
+        min_x: "float" = MAP_WIDTH
+        min_y: "float" = MAP_HEIGHT
+        for entity in self.controller.get_entities_by_type(cur_entity_type):
+            if entity.hitbox is not hitbox:
+                if entity.hitbox.colliderect(hitbox):
+                    min_x = 0
+                    min_y = 0
+                    min_dist = 0
+                else:
+                    dist = Vector2(entity.hitbox.center).distance_to(hitbox.center)
+                    if dist < min_dist:
+                        min_x = entity.hitbox.centerx - hitbox.centerx
+                        min_y = entity.hitbox.centery - hitbox.centery
+                        min_dist = dist
+        return (min_x, min_y)
+
+    def get_population_distances(self, hitboxes: "List[Rect]",
+                                 boxes: "Optional[NDArray[int32]]" = None) \
+            -> "List[Dict[EntityType, Tuple[float, float]]]":
+        """Computes the distance of a whole batch of hitboxes from the closest instances
+        of all game entity types, in a single vectorized pass.
+        
+        Positional arguments:  
+         - `hitboxes`: the current hitboxes of the perceiving living beings.
+         - `boxes`: the same hitboxes as an array of shape `(N, 4)`, if already available \
+        from the world's state store.
+        
+        Return:  
+        A `List` containing, for each hitbox, the same `Dict` that `get_distance_by_type`
+        would return for it."""
+        if len(hitboxes) == 0:
+            return []
+        if boxes is None:
+            boxes = to_boxes(hitboxes)
+        static_types, static_offsets, covered = self.controller.get_all_static_distances(boxes)
+        static_values = static_offsets.tolist()
+        per_type: "Dict[EntityType, List[Tuple[float, float]]]" = { }
+        for cur_entity_type in EntityType:
+            if cur_entity_type in static_types:
+                type_values = static_values[static_types.index(cur_entity_type)]
+                per_type[cur_entity_type] = [
+                    tuple(type_values[i]) if is_covered
+                    else self.get_closest_distance(hitbox, cur_entity_type)
+                    for i, (hitbox, is_covered) in enumerate(zip(hitboxes, covered.tolist()))
+                ]
+            elif cur_entity_type != EntityType.PLAYGROUND:
+                targets = [
+                    entity.hitbox
+                    for entity in self.controller.get_entities_by_type(cur_entity_type)
+                ]
+                target_ids = {id(target): idx for idx, target in enumerate(targets)}
+                excluded = zeros((len(hitboxes), len(targets)), dtype=bool)
+                for idx, hitbox in enumerate(hitboxes):
+                    if id(hitbox) in target_ids:
+                        excluded[idx, target_ids[id(hitbox)]] = True
+                per_type[cur_entity_type] = \
+                    compute_closest_offsets(boxes, to_boxes(targets), excluded)
+        return [
+            {entity_type: values[idx] for entity_type, values in per_type.items()}
+            for idx in range(len(hitboxes))
+        ]
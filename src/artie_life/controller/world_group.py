@@ -0,0 +1,241 @@
+"""Module containing the controller stepping several game worlds in lockstep."""
+from typing import TYPE_CHECKING
+from time import perf_counter
+from numpy import array, concatenate, int64
+from controller.game_controller import GameController
+from controller.world.distance_field import StaticDistanceField
+from controller.world.world_controllers import compute_closest_offsets
+from model.state import LivingState
+from model.entities.living.needs import decay_population
+from model.entities.living.brain.inference import PopulationInference
+from model.entities.living.brain.pool import BrainPool
+from model.services import PopulationServices
+from model.checkpoint import capture_world, restore_pool, restore_inference, \
+    restore_random_state
+from utils.timing import Phase, lap_all
+from utils.living.actions import EntityType, PERCEIVED_TYPES
+from utils.map.generation import init_interactive_spots
+
+if TYPE_CHECKING:
+    from typing import Dict, List, Optional, Tuple, Union
+    from numpy.typing import NDArray
+    from model.world import World
+
+class WorldGroupController:
+    """Implementation of the controller hosting several game worlds in a single process.
+
+    All worlds share the same state store, distance field, and inference engine or model
+    pool, and are stepped in lockstep so that perception, needs decay, network inference
+    and training run as single batched passes over the whole group's population, rather
+    than once per world."""
+    def __init__(self, genetic_algorithm: "str", learning_enable: "bool",
+                 inference_backend: "str" = "numpy",
+                 performance_log: "str" = "frames",
+                 phase_timing: "bool" = False) -> "None":
+        """Instantiates a world group controller.
+
+        Positional arguments:  
+         - `genetic_algorithm`: a `str` indicating what genetic algorithm should be \
+        applied to each world's population.
+         - `learning_enable`: a `bool` representing if the living beings should learn \
+        or act randomly.
+
+        Keyword arguments:  
+         - `inference_backend`: `numpy` to evaluate the learning lobes' decisions with \
+        batched NumPy products over the whole group, or `keras` to query each lobe's \
+        Keras model.
+         - `performance_log`: `frames` to log the duration of every frame, or \
+        `histograms` to log frame duration percentiles over windows of frames.
+         - `phase_timing`: if `True`, the duration of each update phase is measured for \
+        each world, and its rolling percentiles logged along with the performance log."""
+        self.genetic_algorithm = genetic_algorithm
+        self.learning_enable = learning_enable
+        self.inference_backend = inference_backend
+        self.performance_log = performance_log
+        self.phase_timing = phase_timing
+        self.controllers: "List[GameController]" = []
+        self.distance_field: "StaticDistanceField" = \
+                StaticDistanceField(init_interactive_spots())
+        inference = PopulationInference() if inference_backend == "numpy" else None
+        self.services: "PopulationServices" = PopulationServices(
+            LivingState(),
+            inference,
+            BrainPool() if learning_enable and inference is None else None
+        )
+
+    def create_worlds(self, population: "int", world_ids: "List[int]") -> "None":
+        """Creates the group's game worlds.
+
+        Positional arguments:  
+         - `population`: the starting population size of each world.
+         - `world_ids`: the in-game IDs of the worlds to be created."""
+        for world_id in world_ids:
+            controller = GameController(
+                self.genetic_algorithm,
+                self.learning_enable,
+                self.inference_backend,
+                self.performance_log,
+                self.phase_timing
+            )
+            controller.create_world(
+                population,
+                world_id,
+                self.services,
+                self.distance_field
+            )
+            self.controllers.append(controller)
+
+    def restore_worlds(self, checkpoints: "List[Dict[str, NDArray]]") -> "float":
+        """Creates the group's game worlds from checkpoints recorded together.
+
+        Positional arguments:  
+         - `checkpoints`: the checkpoint of each world, as loaded by `load_checkpoint`.
+
+        Return:  
+        The amount of simulated time since the recorded worlds started, in seconds."""
+        if self.services.pool is not None:
+            restore_pool(self.services.pool, checkpoints)
+        if self.services.inference is not None:
+            restore_inference(self.services.inference, checkpoints)
+        simulated_time: "float" = 0.0
+        for checkpoint in checkpoints:
+            controller = GameController(
+                self.genetic_algorithm,
+                self.learning_enable,
+                self.inference_backend,
+                self.performance_log,
+                self.phase_timing
+            )
+            simulated_time = controller.restore_world(
+                checkpoint,
+                self.services,
+                self.distance_field
+            )
+            self.controllers.append(controller)
+        if len(checkpoints) > 0:
+            restore_random_state(checkpoints[0])
+        return simulated_time
+
+    def capture_checkpoints(self, simulated_time: "float") -> "Dict[int, Dict[str, NDArray]]":
+        """Records the checkpoint of every world in the group.
+
+        Positional arguments:  
+         - `simulated_time`: the amount of simulated time since the worlds started, in \
+        seconds.
+
+        Return:  
+        A `Dict` associating each world's in-game ID to its checkpoint's arrays."""
+        return {
+            world.world_id: capture_world(world, simulated_time) for world in self.get_worlds()
+        }
+
+    def get_worlds(self) -> "List[World]":
+        """Returns all worlds in the group.
+
+        Return:  
+        A `List` containing the group's worlds, in creation order."""
+        return [controller.world for controller in self.controllers]
+
+    def update_worlds(self, elapsed_time: "float") -> "None":
+        """Performs a single update step of all worlds in the group.
+
+        Positional arguments:  
+         - `elapsed_time`: the amount of time elapsed since the last update step, in seconds."""
+        worlds = self.get_worlds()
+        for world in worlds:
+            world.advance(elapsed_time)
+        # Batched phases are shared by all worlds, each of which is charged with them.
+        timers = [world.timer for world in worlds if world.timer is not None]
+        start = perf_counter() if len(timers) > 0 else 0.0
+        self.perceive(worlds)
+        if len(timers) > 0:
+            start = lap_all(timers, Phase.PERCEPTION, start)
+        self.decay(worlds, elapsed_time)
+        if len(timers) > 0:
+            start = lap_all(timers, Phase.DECAY, start)
+        if self.services.inference is not None:
+            self.services.inference.infer(
+                self.services.state,
+                [living_being for world in worlds for living_being in world.living],
+                elapsed_time
+            )
+        if len(timers) > 0:
+            lap_all(timers, Phase.INFERENCE, start)
+        for world in worlds:
+            world.settle(elapsed_time)
+        start = perf_counter() if len(timers) > 0 else 0.0
+        if self.services.inference is not None:
+            self.services.inference.train()
+        if len(timers) > 0:
+            lap_all(timers, Phase.TRAINING, start)
+
+    def perceive(self, worlds: "List[World]") -> "None":
+        """Computes the perception of all living beings in the group in a single batched
+        pass, with the same results of each world's own perception pass.
+
+        Positional arguments:  
+         - `worlds`: the group's worlds."""
+        sources = [living_being for world in worlds for living_being in world.living]
+        if len(sources) == 0:
+            return
+        boxes = self.services.state.boxes[[living_being.slot for living_being in sources]]
+        static_offsets, covered = self.distance_field.lookup_all(boxes)
+        if not covered.all():
+            for world in worlds:
+                world.perceive()
+            return
+        targets = [
+            living_being for world in worlds for living_being in world.registry.get_living()
+        ]
+        source_worlds = array([idx for idx, world in enumerate(worlds) for _ in world.living])
+        target_worlds = array([
+            idx for idx, world in enumerate(worlds) for _ in world.registry.get_living()
+        ])
+        excluded = source_worlds[:, None] != target_worlds[None, :]
+        target_ids = {id(target): idx for idx, target in enumerate(targets)}
+        for idx, living_being in enumerate(sources):
+            excluded[idx, target_ids[id(living_being)]] = True
+        living_offsets = compute_closest_offsets(
+            boxes,
+            self.services.state.boxes[[living_being.slot for living_being in targets]],
+            excluded
+        )
+        static_values = static_offsets.tolist()
+        static_types = self.distance_field.types
+        for idx, living_being in enumerate(sources):
+            perception: "Dict[EntityType, Tuple[float, float]]" = {
+                entity_type: tuple(static_values[static_types.index(entity_type)][idx])
+                    if entity_type in static_types else living_offsets[idx]
+                for entity_type in PERCEIVED_TYPES
+            }
+            living_being.brain.perceive(perception)
+
+    def decay(self, worlds: "List[World]", elapsed_time: "float") -> "None":
+        """Decays the needs of all living beings in the group in a single batched pass,
+        handing each world its share of the outcome.
+
+        Positional arguments:  
+         - `worlds`: the group's worlds.
+         - `elapsed_time`: the amount of time elapsed since the last update step, in seconds."""
+        world_slots = [world.get_slots() for world in worlds]
+        slots = concatenate(world_slots) if len(world_slots) > 0 else array([], dtype=int64)
+        if len(slots) == 0:
+            return
+        alive = decay_population(self.services.state, slots, elapsed_time)
+        start = 0
+        for world, cur_slots in zip(worlds, world_slots):
+            world.decayed(alive[start:start + len(cur_slots)])
+            start += len(cur_slots)
+
+    def get_summaries(self) -> "List[Dict[str, Union[int, float]]]":
+        """Summarizes the current state of all worlds in the group.
+
+        Return:  
+        A `List` containing each world's summary, in creation order."""
+        return [summary for controller in self.controllers
+                for summary in controller.get_summaries()]
+
+    def dump_current_state(self) -> "None":
+        """Logs the current state of all worlds in the group."""
+        for controller in self.controllers:
+            controller.dump_current_state()
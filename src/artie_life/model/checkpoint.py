@@ -0,0 +1,415 @@
+"""Module containing the binary checkpoints of game worlds."""
+from typing import TYPE_CHECKING
+from os import replace
+from os.path import join as join_path
+from pathlib import Path
+from shutil import rmtree
+from threading import Thread
+from random import getstate as get_python_random_state, setstate as set_python_random_state
+from numpy import array, load, savez_compressed, float64, int64, uint32, uint64, nan, isnan
+from numpy.random import get_state as get_numpy_random_state, \
+    set_state as set_numpy_random_state
+from pygame.rect import Rect
+from model.entities.living.needs import PerceptionView
+from model.entities.living.brain.attention import LearningAttention
+from model.entities.living.brain.reason import LearningReason
+from utils.living.actions import Action, EntityType
+from utils.living.genome import Gene
+from utils.logs import get_world_log_size, rewind_world_log
+
+if TYPE_CHECKING:
+    from typing import Dict, List, Optional, Tuple
+    from numpy.typing import NDArray
+    from model.world import World
+    from model.entities.living.living import LivingBeing
+    from model.entities.living.brain.learning import LearningLobe
+    from model.entities.living.brain.pool import BrainPool
+    from model.entities.living.brain.inference import PopulationInference
+    LobeParameters = Tuple[List[NDArray], List[NDArray], List[NDArray], List[NDArray], int]
+
+CHECKPOINTS_FOLDER: "Path" = Path("checkpoints")
+CHECKPOINT_VERSION: "int" = 1
+STATE_FIELDS: "List[str]" = [
+    "boxes", "needs", "needs_avg", "observations", "lifetime", "fitness",
+    "perception_buffer", "perception_avg", "perception_observations"
+]
+LOBE_FIELDS: "List[str]" = ["first_frame", "epsilon", "elapsed_time", "elapsed_time_target"]
+
+def WORLD_CHECKPOINT(world_id: "int") -> "Path":
+    """Returns the desired single-world checkpoint path, given an in-game world ID.
+
+    Positional arguments:  
+     - `world_id`: the world's in-game ID.
+
+    Return:  
+    A `Path` object pointing to the desired file."""
+    return Path(join_path(CHECKPOINTS_FOLDER, f"{world_id}.npz"))
+
+def reset_checkpoints_folder() -> "None":
+    """Cleans up previous checkpoints. Necessary at startup, unless resuming, to avoid
+    restarted worlds resuming from another run."""
+    rmtree(CHECKPOINTS_FOLDER, ignore_errors=True)
+
+def get_lobe_parameters(lobe: "LearningLobe") \
+        -> "LobeParameters":
+    """Returns a copy of a learning lobe's trainable state, from the population's batched
+    trainer if the lobe uses one, or from its own models otherwise.
+
+    Positional arguments:  
+     - `lobe`: the learning lobe.
+
+    Return:  
+    A `Tuple` containing the lobe's weights, target weights, Adam first and second \
+    moment estimates, each alternating kernels and biases, and the number of steps \
+    performed."""
+    if lobe.trainer is not None and lobe.slot is not None:
+        return (
+            lobe.trainer.network.get(lobe.slot),
+            lobe.trainer.target.get(lobe.slot),
+            lobe.trainer.momentums.get(lobe.slot),
+            lobe.trainer.velocities.get(lobe.slot),
+            int(lobe.trainer.iterations[lobe.slot])
+        )
+    momentums, velocities, iterations = lobe.optimizer_state
+    return (
+        lobe.model.get_weights(),
+        lobe.target_model.get_weights(),
+        [momentum.numpy() for momentum in momentums],
+        [velocity.numpy() for velocity in velocities],
+        int(iterations.numpy())
+    )
+
+def set_lobe_parameters(lobe: "LearningLobe",
+                        parameters: "LobeParameters") -> "None":
+    """Overwrites a learning lobe's trainable state.
+
+    Positional arguments:  
+     - `lobe`: the learning lobe.
+     - `parameters`: the lobe's trainable state, as returned by `get_lobe_parameters`."""
+    weights, target_weights, momentums, velocities, iterations = parameters
+    if lobe.trainer is not None and lobe.slot is not None:
+        lobe.trainer.register(lobe.slot, weights, target_weights)
+        lobe.trainer.momentums.load(lobe.slot, momentums)
+        lobe.trainer.velocities.load(lobe.slot, velocities)
+        lobe.trainer.iterations[lobe.slot] = iterations
+        return
+    lobe.model.set_weights(weights)
+    lobe.target_model.set_weights(target_weights)
+    momentum_variables, velocity_variables, iterations_variable = lobe.optimizer_state
+    for variable, value in zip(momentum_variables + velocity_variables,
+                               momentums + velocities):
+        variable.assign(value)
+    iterations_variable.assign(iterations)
+    lobe.publish_weights()
+
+def capture_lobes(name: "str", lobes: "List[LearningLobe]",
+                  arrays: "Dict[str, NDArray]") -> "None":
+    """Records the state of a population's learning lobes of the same kind, stacking each
+    field along the first dimension.
+
+    Positional arguments:  
+     - `name`: the lobes' kind, prefixing all recorded fields.
+     - `lobes`: the lobes, in the population's iteration order.
+     - `arrays`: the checkpoint's arrays, extended in place."""
+    for field in LOBE_FIELDS:
+        arrays[f"{name}_{field}"] = array([getattr(lobe, field) for lobe in lobes])
+    arrays[f"{name}_memory_rows"] = array([lobe.memory.rows for lobe in lobes])
+    arrays[f"{name}_memory_cursor"] = array([lobe.memory.cursor for lobe in lobes])
+    arrays[f"{name}_memory_size"] = array([lobe.memory.size for lobe in lobes])
+    parameters = [get_lobe_parameters(lobe) for lobe in lobes]
+    arrays[f"{name}_iterations"] = array([
+        lobe_parameters[4] for lobe_parameters in parameters
+    ], dtype=int64)
+    for position, kind in enumerate(["weights", "target_weights", "momentums", "velocities"]):
+        for layer in range(len(parameters[0][position]) if len(parameters) > 0 else 0):
+            arrays[f"{name}_{kind}_{layer}"] = array([
+                lobe_parameters[position][layer] for lobe_parameters in parameters
+            ])
+
+def restore_lobe(name: "str", lobe: "LearningLobe",
+                 checkpoint: "Dict[str, NDArray]", index: "int") -> "None":
+    """Restores a learning lobe's state, as recorded by `capture_lobes`.
+
+    Positional arguments:  
+     - `name`: the lobe's kind.
+     - `lobe`: the freshly created lobe.
+     - `checkpoint`: the checkpoint's arrays.
+     - `index`: the lobe's position in the recorded population."""
+    lobe.first_frame = bool(checkpoint[f"{name}_first_frame"][index])
+    lobe.epsilon = float(checkpoint[f"{name}_epsilon"][index])
+    lobe.elapsed_time = float(checkpoint[f"{name}_elapsed_time"][index])
+    lobe.elapsed_time_target = float(checkpoint[f"{name}_elapsed_time_target"][index])
+    rows = checkpoint[f"{name}_memory_rows"][index]
+    if rows.shape != lobe.memory.rows.shape:
+        raise ValueError(
+            f"{name} replay memories were checkpointed with a capacity of {len(rows)}"
+        )
+    lobe.memory.rows[:] = rows
+    lobe.memory.cursor = int(checkpoint[f"{name}_memory_cursor"][index])
+    lobe.memory.size = int(checkpoint[f"{name}_memory_size"][index])
+    layers = sum(1 for field in checkpoint if field.startswith(f"{name}_weights_"))
+    set_lobe_parameters(lobe, (
+        *[
+            [checkpoint[f"{name}_{kind}_{layer}"][index] for layer in range(layers)]
+            for kind in ["weights", "target_weights", "momentums", "velocities"]
+        ],
+        int(checkpoint[f"{name}_iterations"][index])
+    ))
+
+def capture_world(world: "World", simulated_time: "float") -> "Dict[str, NDArray]":
+    """Records a world's full state, along with the process-wide random generators, the
+    state of its model pool or batched trainers, if any, and the size of its log. To be
+    invoked between two world updates. All arrays are copies, so that the world can keep
+    running while they are written.
+
+    Positional arguments:  
+     - `world`: the recorded world.
+     - `simulated_time`: the amount of simulated time since the world started, in seconds.
+
+    Return:  
+    A `Dict` associating each recorded field to its value, with one row per living \
+    being for per-being fields."""
+    living: "List[LivingBeing]" = list(world.living)
+    python_random = get_python_random_state()
+    numpy_random = get_numpy_random_state()
+    arrays: "Dict[str, NDArray]" = {
+        "version": array(CHECKPOINT_VERSION),
+        "world_id": array(world.world_id),
+        "simulated_time": array(simulated_time),
+        "learning": array(world.controller.learning_enable),
+        "next_id": array(world.next_id),
+        "deaths": array(world.deaths),
+        "population_size": array(world.population_size),
+        "world_log_size": array(get_world_log_size(world.world_id), dtype=int64),
+        "python_random": array(python_random[1], dtype=int64),
+        "python_random_gauss": array(
+            python_random[2] if python_random[2] is not None else nan
+        ),
+        "numpy_random": array(numpy_random[1], dtype=uint32),
+        "numpy_random_position": array(numpy_random[2]),
+        "numpy_random_gauss": array([numpy_random[3], numpy_random[4]], dtype=float64),
+        "gene_names": array([gene.name for gene in Gene]),
+        "ids": array([living_being.game_id for living_being in living], dtype=int64),
+        "genomes": array([
+            [living_being.genome[gene] for gene in Gene] for living_being in living
+        ]),
+        "perception": array([
+            living_being.state.perception[:, living_being.slot] for living_being in living
+        ]),
+        "focus": array([living_being.brain.attention.focus.value for living_being in living]),
+        "action": array([living_being.brain.reason.action.value for living_being in living]),
+        "first_frame": array([living_being.brain.first_frame for living_being in living]),
+        "user_reward": array([living_being.brain.user_reward for living_being in living]),
+        "user_input": array([living_being.brain.user_input for living_being in living]),
+        "user_interaction_length": array([
+            living_being.brain.user_interaction_length for living_being in living
+        ])
+    }
+    for field in STATE_FIELDS:
+        arrays[field] = array([
+            getattr(living_being.state, field)[living_being.slot] for living_being in living
+        ])
+    if world.pool is not None:
+        for name, pool in [("attention", world.pool.attention), ("reason", world.pool.reason)]:
+            arrays[f"{name}_pool_seed"] = array(pool.seed, dtype=uint64)
+            arrays[f"{name}_pool_acquired"] = array(pool.acquired, dtype=int64)
+    if world.inference is not None:
+        for name, trainer in [("attention", world.inference.attention_trainer),
+                              ("reason", world.inference.reason_trainer)]:
+            arrays[f"{name}_trainer_seed"] = array(trainer.seed, dtype=uint64)
+            arrays[f"{name}_trainer_initialized"] = array(trainer.initialized, dtype=int64)
+    if world.controller.learning_enable:
+        capture_lobes("attention", [
+            living_being.brain.attention for living_being in living
+            if isinstance(living_being.brain.attention, LearningAttention)
+        ], arrays)
+        capture_lobes("reason", [
+            living_being.brain.reason for living_being in living
+            if isinstance(living_being.brain.reason, LearningReason)
+        ], arrays)
+    return arrays
+
+def restore_world(world: "World", checkpoint: "Dict[str, NDArray]") -> "float":
+    """Populates an empty world with the living beings recorded by `capture_world`, and
+    drops the ones logged after the checkpoint was recorded.
+
+    Positional arguments:  
+     - `world`: the world, freshly created with the recorded ID.
+     - `checkpoint`: the checkpoint's arrays.
+
+    Return:  
+    The amount of simulated time since the recorded world started, in seconds."""
+    if bool(checkpoint["learning"]) != world.controller.learning_enable:
+        raise ValueError(
+            f"world {world.world_id} was checkpointed with learning "
+            + ("enabled" if bool(checkpoint["learning"]) else "disabled")
+        )
+    columns = {str(name): column for column, name in enumerate(checkpoint["gene_names"])}
+    for index, game_id in enumerate(checkpoint["ids"].tolist()):
+        world.next_id = game_id - 1
+        world.place_living(
+            world.controller,
+            Rect(*checkpoint["boxes"][index].tolist()),
+            {gene: float(checkpoint["genomes"][index, columns[gene.name]]) for gene in Gene},
+            world.controller.learning_enable
+        )
+        living_being = world.living.get(game_id)
+        for field in STATE_FIELDS:
+            getattr(living_being.state, field)[living_being.slot] = checkpoint[field][index]
+        living_being.state.perception[:, living_being.slot] = checkpoint["perception"][index]
+        brain = living_being.brain
+        brain.perception_tracker.perception = PerceptionView(
+            living_being.state,
+            "perception",
+            (int(living_being.state.perception_buffer[living_being.slot]), living_being.slot)
+        )
+        brain.first_frame = bool(checkpoint["first_frame"][index])
+        brain.record_input(str(checkpoint["user_input"][index]))
+        brain.user_reward = float(checkpoint["user_reward"][index])
+        brain.user_interaction_length = float(checkpoint["user_interaction_length"][index])
+        brain.attention.focus = EntityType(int(checkpoint["focus"][index]))
+        brain.reason.action = Action(int(checkpoint["action"][index]))
+        if isinstance(brain.attention, LearningAttention):
+            restore_lobe("attention", brain.attention, checkpoint, index)
+        if isinstance(brain.reason, LearningReason):
+            restore_lobe("reason", brain.reason, checkpoint, index)
+    world.next_id = int(checkpoint["next_id"])
+    world.deaths = int(checkpoint["deaths"])
+    world.population_size = int(checkpoint["population_size"])
+    if "world_log_size" in checkpoint:
+        rewind_world_log(world.world_id, int(checkpoint["world_log_size"]), world.next_id)
+    return float(checkpoint["simulated_time"])
+
+def restore_pool(pool: "BrainPool", checkpoints: "List[Dict[str, NDArray]]") -> "None":
+    """Resumes a model pool's sequence of model sets, as recorded along with the worlds
+    sharing it. To be invoked before the worlds are restored, since each restored living
+    being takes a set from the pool.
+
+    Positional arguments:  
+     - `pool`: the freshly created pool.
+     - `checkpoints`: the checkpoints of all worlds sharing the pool, recorded together."""
+    restored = sum(len(checkpoint["ids"]) for checkpoint in checkpoints)
+    if len(checkpoints) > 0 and "attention_pool_seed" in checkpoints[0]:
+        for name, model_pool in [("attention", pool.attention), ("reason", pool.reason)]:
+            model_pool.restore(
+                int(checkpoints[0][f"{name}_pool_seed"]),
+                int(checkpoints[0][f"{name}_pool_acquired"]) - restored
+            )
+
+def restore_inference(inference: "PopulationInference",
+                      checkpoints: "List[Dict[str, NDArray]]") -> "None":
+    """Resumes the batched trainers' sequence of initial weights, as recorded along with
+    the worlds sharing them. To be invoked before the worlds are restored, since each
+    restored learning lobe draws its initial weights before they are overwritten.
+
+    Positional arguments:  
+     - `inference`: the freshly created inference engine.
+     - `checkpoints`: the checkpoints of all worlds sharing the engine, recorded together."""
+    restored = sum(len(checkpoint["ids"]) for checkpoint in checkpoints)
+    if len(checkpoints) > 0 and bool(checkpoints[0]["learning"]) \
+            and "attention_trainer_seed" in checkpoints[0]:
+        for name, trainer in [("attention", inference.attention_trainer),
+                              ("reason", inference.reason_trainer)]:
+            trainer.restore(
+                int(checkpoints[0][f"{name}_trainer_seed"]),
+                int(checkpoints[0][f"{name}_trainer_initialized"]) - restored
+            )
+
+def restore_random_state(checkpoint: "Dict[str, NDArray]") -> "None":
+    """Restores the process-wide random generators, as recorded by `capture_world`. To be
+    invoked once all worlds are restored.
+
+    Positional arguments:  
+     - `checkpoint`: the checkpoint's arrays."""
+    gauss = float(checkpoint["python_random_gauss"])
+    set_python_random_state((
+        3,
+        tuple(checkpoint["python_random"].tolist()),
+        None if isnan(gauss) else gauss
+    ))
+    set_numpy_random_state((
+        "MT19937",
+        checkpoint["numpy_random"],
+        int(checkpoint["numpy_random_position"]),
+        int(checkpoint["numpy_random_gauss"][0]),
+        float(checkpoint["numpy_random_gauss"][1])
+    ))
+
+def load_checkpoint(world_id: "int") -> "Optional[Dict[str, NDArray]]":
+    """Loads a world's last checkpoint, if any.
+
+    Positional arguments:  
+     - `world_id`: the world's in-game ID.
+
+    Return:  
+    A `Dict` containing the checkpoint's arrays, or `None` if the world has no \
+    checkpoint."""
+    path = WORLD_CHECKPOINT(world_id)
+    if not path.exists():
+        return None
+    with load(path) as file:
+        checkpoint = {name: file[name] for name in file.files}
+    if int(checkpoint["version"]) != CHECKPOINT_VERSION:
+        raise ValueError(f"unsupported checkpoint version in {path}")
+    return checkpoint
+
+def write_checkpoints(checkpoints: "Dict[int, Dict[str, NDArray]]") -> "None":
+    """Writes world checkpoints to disk. Each file is replaced atomically, so that a
+    process dying mid-write leaves the previous checkpoint intact.
+
+    Positional arguments:  
+     - `checkpoints`: the arrays of each world's checkpoint, by in-game world ID."""
+    CHECKPOINTS_FOLDER.mkdir(parents=True, exist_ok=True)
+    for world_id, arrays in checkpoints.items():
+        path = WORLD_CHECKPOINT(world_id)
+        partial = path.with_suffix(".partial")
+        with open(partial, "wb") as file:
+            savez_compressed(file, **arrays)
+        replace(partial, path)
+
+
+class CheckpointWriter:
+    """Implementation of the periodic checkpoint writer.
+
+    Checkpoints are recorded on the frame loop, which only copies the worlds' arrays,
+    and compressed and written to disk by a background thread, so that the frame loop
+    never waits for the disk unless the previous checkpoint is still being written."""
+    def __init__(self, period: "float", simulated_time: "float" = 0.0) -> "None":
+        """Instantiates the writer.
+
+        Positional arguments:  
+         - `period`: the amount of simulated time between two checkpoints, in seconds.
+         - `simulated_time`: the amount of simulated time already elapsed, in seconds."""
+        self.period = period
+        self.last_time: "float" = simulated_time
+        self.thread: "Optional[Thread]" = None
+
+    def is_due(self, simulated_time: "float") -> "bool":
+        """Checks if a new checkpoint should be written.
+
+        Positional arguments:  
+         - `simulated_time`: the amount of simulated time since the worlds started, in \
+        seconds.
+
+        Return:  
+        `True` if at least a period elapsed since the last checkpoint, `False` otherwise."""
+        return simulated_time - self.last_time >= self.period
+
+    def write(self, checkpoints: "Dict[int, Dict[str, NDArray]]",
+              simulated_time: "float") -> "None":
+        """Starts writing a set of recorded checkpoints in the background.
+
+        Positional arguments:  
+         - `checkpoints`: the arrays of each world's checkpoint, by in-game world ID.
+         - `simulated_time`: the amount of simulated time at which they were recorded, \
+        in seconds."""
+        self.wait()
+        self.last_time = simulated_time
+        self.thread = Thread(target=write_checkpoints, args=(checkpoints,))
+        self.thread.start()
+
+    def wait(self) -> "None":
+        """Waits until the last checkpoint is completely written."""
+        if self.thread is not None:
+            self.thread.join()
+            self.thread = None
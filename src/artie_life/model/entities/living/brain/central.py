@@ -1,22 +1,30 @@
 """Module containing the brain implementation."""
 from typing import TYPE_CHECKING
+from numpy import zeros, float32
 from utils.living.learning.commons import USER_INTERACTION_PERIOD, \
     POSITIVE_NEEDS_REWARD, NEGATIVE_NEEDS_REWARD
 from utils.living.learning.attention import compute_reward as compute_attention_reward, \
-    assemble_state as assemble_attention_state
+    assemble_state as assemble_attention_state, encode_input, \
+    INPUT_LAYER_DIM as ATTENTION_INPUT_DIM
 from utils.living.learning.reason import compute_reward as compute_reason_reward, \
-    assemble_state as assemble_reason_state
+    assemble_state as assemble_reason_state, INPUT_LAYER_DIM as REASON_INPUT_DIM
 from model.entities.living.needs import NeedsTracker, PerceptionTracker
 from model.entities.living.brain.attention import Attention, LearningAttention
 from model.entities.living.brain.reason import Reason, LearningReason
+from model.services import PopulationServices
 from utils.living.actions import Need
 
 if TYPE_CHECKING:
-    from typing import Dict
+    from typing import Dict, Optional, Tuple
+    from numpy import floating
+    from numpy.typing import NDArray
+    from model.entities.living.brain.pool import BrainPool, PooledModels
     from pygame.rect import Rect
     from controller.world.world_controllers import DistanceController
     from utils.living.genome import Gene
-    from utils.living.actions import InteractionType
+    from utils.living.actions import InteractionType, EntityType
+
+EMPTY_INPUT: "NDArray[float32]" = encode_input("")
 
 def compute_needs_reward(last_needs: "Dict[Need, float]",
                          cur_needs: "Dict[Need, float]") -> "float":
@@ -45,7 +53,9 @@ class Brain:
     # larger issues in the single learning lobes.
 
     def __init__(self, distance_controller: "DistanceController",
-                 genome: "Dict[Gene, float]", learning_enable: "bool") -> "None":
+                 genome: "Dict[Gene, float]", learning_enable: "bool",
+                 services: "Optional[PopulationServices]" = None,
+                 slot: "Optional[int]" = None) -> "None":
         """Instantiates the living being's central lobe.
         
         Positional arguments:  
@@ -53,17 +63,112 @@ class Brain:
         perception of the world's space.
          - `genome`: the living being's genome.
          - `learning_enable`: a `bool` representing if the living being should learn \
-        or act randomly."""
-        self.perception_tracker = PerceptionTracker(distance_controller)
-        self.needs_tracker = NeedsTracker(genome)
-        self.attention: "Attention" = \
-            LearningAttention(genome) if learning_enable else Attention(genome)
-        self.reason: "Reason" = \
-            LearningReason(genome) if learning_enable else Reason(genome)
+        or act randomly.
+         - `services`: the services shared by the living being's population. The \
+        models taken from their pool are returned on `release`. If omitted, the brain \
+        uses a private state store and its learning lobes their own models.
+         - `slot`: the living being's slot in the services' state store."""
+        # pylint: disable=too-many-arguments,too-many-positional-arguments
+        # Warnings disabled since the last two arguments are only passed by worlds
+        # backing their population with shared services.
+        if services is None:
+            services = PopulationServices()
+        inference = services.inference
+        self.needs_tracker = NeedsTracker(genome, services.state, slot)
+        self.perception_tracker = PerceptionTracker(
+            distance_controller,
+            self.needs_tracker.state,
+            self.needs_tracker.slot
+        )
+        self.pool: "Optional[BrainPool]" = services.pool \
+            if learning_enable and inference is None else None
+        self.attention_models: "Optional[PooledModels]" = self.pool.attention.acquire() \
+            if self.pool is not None else None
+        self.reason_models: "Optional[PooledModels]" = self.pool.reason.acquire() \
+            if self.pool is not None else None
+        self.attention: "Attention" = LearningAttention(
+            genome,
+            inference.attention if inference is not None else None,
+            self.needs_tracker.slot,
+            inference.attention_trainer if inference is not None else None,
+            self.attention_models,
+            services.timer
+        ) if learning_enable else Attention(genome)
+        self.reason: "Reason" = LearningReason(
+            genome,
+            inference.reason if inference is not None else None,
+            self.needs_tracker.slot,
+            inference.reason_trainer if inference is not None else None,
+            self.reason_models,
+            services.timer
+        ) if learning_enable else Reason(genome)
+        self.batched = isinstance(self.attention, LearningAttention) \
+            and isinstance(self.reason, LearningReason) \
+            and self.attention.network is not None and self.reason.network is not None
         self.user_reward: "float" = 0.0
         self.user_input: "str" = ""
+        self.encoded_input: "NDArray[float32]" = EMPTY_INPUT
+        self.attention_state: "NDArray[float32]" = zeros(ATTENTION_INPUT_DIM, dtype=float32)
+        self.reason_state: "NDArray[float32]" = zeros(REASON_INPUT_DIM, dtype=float32)
         self.user_interaction_length: "float" = 0.0
         self.first_frame = True
+        self.next_reason_q_values: "Optional[NDArray[floating]]" = None
+
+    def release(self) -> "None":
+        """Returns the learning lobes' models to the pool they were taken from, if any,
+        and deletes the files backing their replay memories. The lobes must not be updated
+        afterwards."""
+        if self.pool is not None:
+            if self.attention_models is not None:
+                self.pool.attention.release(self.attention_models)
+            if self.reason_models is not None:
+                self.pool.reason.release(self.reason_models)
+        self.attention_models = None
+        self.reason_models = None
+        if isinstance(self.attention, LearningAttention):
+            self.attention.memory.release()
+        if isinstance(self.reason, LearningReason):
+            self.reason.memory.release()
+
+    def expires_user_interaction(self, elapsed_time: "float") -> "bool":
+        """Checks if the current user interaction expires at the next update.
+        
+        Positional arguments:  
+         - `elapsed_time`: the amount of time since last brain update, in seconds.
+        
+        Return:  
+        `True` if the user input and reward are to be cleared, `False` otherwise."""
+        return self.user_interaction_length + elapsed_time > USER_INTERACTION_PERIOD
+
+    def get_inference_input(self, elapsed_time: "float") -> "Optional[NDArray[float32]]":
+        """Returns the encoded user input the learning lobes will be queried on at the next
+        update, once the world-level perception and decay passes have been provided.
+        
+        Positional arguments:  
+         - `elapsed_time`: the amount of time until the next brain update, in seconds.
+        
+        Return:  
+        The encoded user input, or `None` if the next update will not query the learning \
+        lobes or its states are not yet known."""
+        if not self.batched or self.first_frame \
+                or self.perception_tracker.next_perception is None \
+                or self.needs_tracker.next_alive is not True:
+            return None
+        return EMPTY_INPUT if self.expires_user_interaction(elapsed_time) \
+            else self.encoded_input
+
+    def provide_q_values(self, attention_q_values: "NDArray[floating]",
+                         reason_q_values: "NDArray[floating]") -> "None":
+        """Hands the learning lobes the Q-values computed by the population-level
+        inference pass, to be used at the next update.
+        
+        Positional arguments:  
+         - `attention_q_values`: the Attention Q-values of each possible focus choice.
+         - `reason_q_values`: the Reason Q-values of each possible action, for each \
+        possible focus choice."""
+        if isinstance(self.attention, LearningAttention):
+            self.attention.provide(attention_q_values)
+        self.next_reason_q_values = reason_q_values
 
     def update(self, elapsed_time: "float", hitbox: "Rect") -> "bool":
         """Updates the brain, decaying vital parameters.
@@ -81,11 +186,13 @@ class Brain:
             self.perception_tracker.record(hitbox)
             return self.needs_tracker.decay(elapsed_time)
 
-        self.user_interaction_length += elapsed_time
-        if self.user_interaction_length > USER_INTERACTION_PERIOD:
+        if self.expires_user_interaction(elapsed_time):
             self.user_input = ""
+            self.encoded_input = EMPTY_INPUT
             self.user_reward = 0.0
             self.user_interaction_length = 0.0
+        else:
+            self.user_interaction_length += elapsed_time
 
         last_perception = self.perception_tracker.perception
         last_needs = self.needs_tracker.needs
@@ -106,27 +213,32 @@ class Brain:
             last_focus = self.attention.focus
             self.attention.update_and_learn(
                 assemble_attention_state(
-                    self.user_input,
-                    self.perception_tracker.perception,
-                    self.needs_tracker.needs
+                    self.attention_state,
+                    self.encoded_input,
+                    self.perception_tracker.perception.as_array(),
+                    self.needs_tracker.needs.as_array()
                 ),
                 compute_attention_reward(
                     self.user_reward,
                     needs_reward,
-                    last_perception,
-                    self.perception_tracker.perception
+                    last_perception.as_array(),
+                    self.perception_tracker.perception.as_array()
                 ),
                 elapsed_time
             )
+            if self.next_reason_q_values is not None:
+                self.reason.provide(self.next_reason_q_values[self.attention.focus.value])
+                self.next_reason_q_values = None
             self.reason.update_and_learn(
                 assemble_reason_state(
+                    self.reason_state,
                     self.attention.focus,
-                    self.perception_tracker.perception
+                    self.perception_tracker.perception.as_array()
                 ),
                 compute_reason_reward(
                     self.user_reward,
                     needs_reward,
-                    last_perception,
+                    last_perception.as_array(),
                     last_focus
                 ),
                 elapsed_time
@@ -137,6 +249,22 @@ class Brain:
 
         return is_alive
 
+    def perceive(self, perception: "Dict[EntityType, Tuple[float, float]]") -> "None":
+        """Hands the living being's slice of the world-level perception pass to the
+        perception tracker, to be recorded at the next update.
+        
+        Positional arguments:  
+         - `perception`: the distance from the closest instance of each type of entity."""
+        self.perception_tracker.provide(perception)
+
+    def decayed(self, alive: "bool") -> "None":
+        """Hands the outcome of the world-level needs decay pass to the needs tracker, to
+        be used by the next update instead of a per-agent decay step.
+        
+        Positional arguments:  
+         - `alive`: `True` if the living being survived the decay step."""
+        self.needs_tracker.provide(alive)
+
     def actuate(self, interaction: "InteractionType") -> "None":
         """Actuates the effect of a given interaction on the living being's needs.
         
@@ -158,3 +286,4 @@ class Brain:
         Positional arguments:  
          - `input_text`: the user-defined input string."""
         self.user_input = input_text
+        self.encoded_input = encode_input(input_text)
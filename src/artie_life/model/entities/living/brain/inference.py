@@ -0,0 +1,203 @@
+"""Module containing the population-wide inference engine for the learning lobes."""
+from typing import TYPE_CHECKING
+from numpy import array, zeros, concatenate, matmul, maximum, float32, int64
+from utils.living.learning.attention import INPUT_LAYER_DIM as ATTENTION_INPUT_DIM, \
+    OUTPUT_LAYER_DIM as ATTENTION_OUTPUT_DIM, HIDDEN_LAYER_DIMS as ATTENTION_HIDDEN_DIMS, \
+    FOCUS_TYPES, assemble_states as assemble_attention_states
+from utils.living.learning.reason import INPUT_LAYER_DIM as REASON_INPUT_DIM, \
+    OUTPUT_LAYER_DIM as REASON_OUTPUT_DIM, HIDDEN_LAYER_DIMS as REASON_HIDDEN_DIMS, \
+    assemble_states as assemble_reason_states
+from model.state import INITIAL_CAPACITY, zeros_like_rows
+from model.entities.living.brain.training import StackedTrainer
+
+if TYPE_CHECKING:
+    from typing import Iterable, List
+    from numpy import floating
+    from numpy.typing import NDArray
+    from model.entities.living.living import LivingBeing
+    from model.entities.living.brain.central import Brain
+    from model.state import LivingState
+
+class StackedNetwork:
+    """Implementation of a stack of dense networks sharing the same shape, one per slot.
+
+    The weights of each layer are stored in a single 3-D array indexed by slot, so that
+    a whole batch of networks can be evaluated at once through batched matrix products.
+    Hidden layers use ReLU activation, while the output layer is linear, as in the
+    lobes' models."""
+    def __init__(self, layer_dims: "List[int]", capacity: "int" = INITIAL_CAPACITY) -> "None":
+        """Instantiates an empty stack.
+
+        Positional arguments:  
+         - `layer_dims`: the size of each layer, input and output included.
+         - `capacity`: the number of slots initially allocated. The stack grows \
+        automatically when needed."""
+        self.capacity: "int" = capacity
+        self.kernels: "List[NDArray[float32]]" = [
+            zeros((capacity, inputs, outputs), dtype=float32)
+            for inputs, outputs in zip(layer_dims[:-1], layer_dims[1:])
+        ]
+        self.biases: "List[NDArray[float32]]" = [
+            zeros((capacity, outputs), dtype=float32) for outputs in layer_dims[1:]
+        ]
+
+    def create_empty(self) -> "StackedNetwork":
+        """Instantiates an empty stack with the same layer sizes and capacity.
+
+        Return:  
+        The new stack, with all weights set to zero."""
+        return StackedNetwork(
+            [kernel.shape[1] for kernel in self.kernels] + [self.kernels[-1].shape[2]],
+            self.capacity
+        )
+
+    def reserve(self, slot: "int") -> "None":
+        """Grows the stack until a given slot is available.
+
+        Positional arguments:  
+         - `slot`: the slot to be made available."""
+        while slot >= self.capacity:
+            self.kernels = [
+                concatenate([kernel, zeros_like_rows(kernel, self.capacity)])
+                for kernel in self.kernels
+            ]
+            self.biases = [
+                concatenate([bias, zeros_like_rows(bias, self.capacity)])
+                for bias in self.biases
+            ]
+            self.capacity *= 2
+
+    def load(self, slot: "int", weights: "List[NDArray[float32]]") -> "None":
+        """Copies a network's weights into a slot.
+
+        Positional arguments:  
+         - `slot`: the network's slot.
+         - `weights`: the network's weights, as returned by a Keras model's \
+        `get_weights`, alternating kernels and biases."""
+        self.reserve(slot)
+        for layer, (kernel, bias) in enumerate(zip(weights[0::2], weights[1::2])):
+            self.kernels[layer][slot] = kernel
+            self.biases[layer][slot] = bias
+
+    def get(self, slot: "int") -> "List[NDArray[float32]]":
+        """Copies a network's weights out of a slot.
+
+        Positional arguments:  
+         - `slot`: the network's slot.
+
+        Return:  
+        A `List` containing the network's weights, in the same format accepted by `load`."""
+        return [
+            weights[slot].copy()
+            for kernel, bias in zip(self.kernels, self.biases)
+            for weights in (kernel, bias)
+        ]
+
+    def forward(self, slots: "NDArray[int64]",
+                inputs: "NDArray[floating]") -> "NDArray[float32]":
+        """Evaluates a batch of networks, each on its own input row.
+
+        Positional arguments:  
+         - `slots`: an array of shape `(N,)` containing the slot of the network \
+        evaluating each row. Slots may be repeated.
+         - `inputs`: an array of shape `(N, inputs)` containing the input rows.
+
+        Return:  
+        An array of shape `(N, outputs)` containing each network's output."""
+        hidden = inputs.astype(float32)
+        last = len(self.kernels) - 1
+        for layer, (kernel, bias) in enumerate(zip(self.kernels, self.biases)):
+            hidden = matmul(hidden[:, None, :], kernel[slots])[:, 0, :] + bias[slots]
+            if layer != last:
+                hidden = maximum(hidden, 0)
+        return hidden
+
+
+class PopulationInference:
+    """Implementation of the inference engine evaluating the learning lobes of a whole
+    population in a single batched pass per lobe, instead of one model call per agent.
+
+    Attention Q-values are computed on each brain's upcoming state, while Reason
+    Q-values are computed for every possible focus, so that brains can keep consuming
+    them in their own update order. All states are assembled in place into buffers
+    shared by the whole population. The lobes' training steps are batched as well, by
+    one trainer per lobe kind, which makes the stacked weights authoritative."""
+    def __init__(self) -> "None":
+        """Instantiates the inference engine, with empty network stacks."""
+        self.attention: "StackedNetwork" = StackedNetwork(
+            [ATTENTION_INPUT_DIM] + ATTENTION_HIDDEN_DIMS + [ATTENTION_OUTPUT_DIM]
+        )
+        self.reason: "StackedNetwork" = StackedNetwork(
+            [REASON_INPUT_DIM] + REASON_HIDDEN_DIMS + [REASON_OUTPUT_DIM]
+        )
+        self.attention_trainer: "StackedTrainer" = StackedTrainer(self.attention)
+        self.reason_trainer: "StackedTrainer" = StackedTrainer(self.reason)
+        self.attention_states: "NDArray[float32]" = \
+            zeros((INITIAL_CAPACITY, ATTENTION_INPUT_DIM), dtype=float32)
+        self.reason_states: "NDArray[float32]" = \
+            zeros((INITIAL_CAPACITY, len(FOCUS_TYPES), REASON_INPUT_DIM), dtype=float32)
+
+    def reserve(self, population: "int") -> "None":
+        """Grows the state buffers until they fit a given population.
+
+        Positional arguments:  
+         - `population`: the number of living beings to be evaluated at once."""
+        while population > len(self.attention_states):
+            self.attention_states = concatenate([
+                self.attention_states,
+                zeros_like_rows(self.attention_states, len(self.attention_states))
+            ])
+            self.reason_states = concatenate([
+                self.reason_states,
+                zeros_like_rows(self.reason_states, len(self.reason_states))
+            ])
+
+    def infer(self, state: "LivingState", living_beings: "Iterable[LivingBeing]",
+              elapsed_time: "float") -> "None":
+        """Computes the Q-values all learning brains will use at their next update, and
+        hands each brain its own.
+
+        Positional arguments:  
+         - `state`: the store backing the living beings' state, holding their upcoming \
+        perception and needs.
+         - `living_beings`: the living beings to be evaluated. Those whose next update \
+        is not predictable are skipped, and will query their own networks.
+         - `elapsed_time`: the amount of time elapsed since the last update, in seconds."""
+        brains: "List[Brain]" = []
+        slots: "List[int]" = []
+        encoded_inputs: "List[NDArray[floating]]" = []
+        for living_being in living_beings:
+            encoded_input = living_being.brain.get_inference_input(elapsed_time)
+            if encoded_input is not None:
+                brains.append(living_being.brain)
+                slots.append(living_being.slot)
+                encoded_inputs.append(encoded_input)
+        if len(brains) == 0:
+            return
+        self.reserve(len(brains))
+        slot_array = array(slots, dtype=int64)
+        perceptions = state.perception[1 - state.perception_buffer[slot_array], slot_array]
+        attention_q_values = self.attention.forward(
+            slot_array,
+            assemble_attention_states(
+                self.attention_states[:len(brains)],
+                encoded_inputs,
+                perceptions,
+                state.needs[slot_array]
+            )
+        )
+        reason_q_values = self.reason.forward(
+            slot_array.repeat(len(FOCUS_TYPES)),
+            assemble_reason_states(
+                self.reason_states[:len(brains)],
+                perceptions
+            ).reshape(len(brains) * len(FOCUS_TYPES), -1)
+        ).reshape(len(brains), len(FOCUS_TYPES), -1)
+        for brain, attention_q, reason_q in zip(brains, attention_q_values, reason_q_values):
+            brain.provide_q_values(attention_q, reason_q)
+
+    def train(self) -> "None":
+        """Runs all training steps scheduled by the lobes since the last call, as one
+        batched computation per lobe kind."""
+        self.attention_trainer.train()
+        self.reason_trainer.train()
@@ -0,0 +1,209 @@
+"""Module containing the behavior shared by the learning lobes."""
+from typing import TYPE_CHECKING
+from numpy import array
+from utils.living.learning.commons import BATCH_SIZE
+from utils.living.learning.replay import REPLAY_STORAGE
+from utils.timing import Phase
+
+if TYPE_CHECKING:
+    from typing import Callable, Dict, List, Optional, Tuple
+    from keras import Sequential
+    from tensorflow import Variable
+    from numpy import floating
+    from numpy.typing import NDArray
+    from model.entities.living.brain.inference import StackedNetwork
+    from model.entities.living.brain.training import StackedTrainer
+    from model.entities.living.brain.pool import PooledModels
+    from utils.living.genome import Gene
+    from utils.timing import PhaseTimer
+
+class LearningLobe:
+    """Implementation of the deep Q-learning behavior shared by the learning lobes, to be
+    mixed in before the random-behaving lobe it extends.
+    
+    Each learning lobe only provides its own genes, layer dimensions, model builder and
+    decision step, as class attributes and in its `update_and_learn` method."""
+
+    # pylint: disable=too-many-instance-attributes
+    # Warning disabled since all attributes are part of the lobe's learning state.
+
+    genome: "Dict[Gene, float]"
+    PHASE: "Phase"
+    INPUT_DIM: "int"
+    OUTPUT_DIM: "int"
+    STARTING_EPSILON: "Gene"
+    MIN_EPSILON: "Gene"
+    EPSILON_DECAY: "Gene"
+    LEARNING_RATE: "Gene"
+    GAMMA: "Gene"
+    UPDATE_PERIOD: "Gene"
+    TARGET_UPDATE_PERIOD: "Gene"
+    create_model: "Callable[[], Sequential]"
+
+    def __init__(self, genome: "Dict[Gene, float]",
+                 network: "Optional[StackedNetwork]" = None,
+                 slot: "Optional[int]" = None,
+                 trainer: "Optional[StackedTrainer]" = None,
+                 models: "Optional[PooledModels]" = None,
+                 timer: "Optional[PhaseTimer]" = None) -> "None":
+        """Instantiates the learning lobe.
+        
+        Positional arguments:  
+         - `genome`: the living being's genome.
+         - `network`: the population's stacked networks of the lobe's kind, mirroring the \
+        lobe's model weights for batched inference. If omitted, the lobe always queries \
+        its own model.
+         - `slot`: the living being's slot in `network`.
+         - `trainer`: the population's batched trainer of `network`. If provided, the \
+        lobe's initial weights are drawn straight into its slot and its training steps are \
+        scheduled on the trainer, so that the lobe builds no model of its own.
+         - `models`: a freshly initialized model set taken from the population's pool. \
+        If omitted, the lobe builds its own models, unless `trainer` is provided.
+         - `timer`: the world's phase timer, charged with the lobe's updates and training \
+        steps. If omitted, the lobe is not timed."""
+        # pylint: disable=too-many-arguments,too-many-positional-arguments
+        super().__init__(genome)
+        self.first_frame = True
+        self.model: "Optional[Sequential]" = None
+        self.target_model: "Optional[Sequential]" = None
+        self.optimizer_state: "Optional[Tuple[List[Variable], List[Variable], Variable]]" = \
+            None
+        self.elapsed_time: "float" = 0.0
+        self.elapsed_time_target: "float" = 0.0
+        self.epsilon = self.genome[self.STARTING_EPSILON]
+        self.memory = REPLAY_STORAGE.create(self.INPUT_DIM, self.OUTPUT_DIM)
+        self.network = network
+        self.slot = slot
+        self.next_q_values: "Optional[NDArray[floating]]" = None
+        self.trainer = trainer
+        self.timer = timer
+        if self.trainer is not None and self.slot is not None:
+            self.trainer.initialize(self.slot)
+        elif models is not None:
+            self.model = models.model
+            self.target_model = models.target_model
+            self.optimizer_state = models.optimizer_state
+            self.publish_weights()
+        else:
+            # pylint: disable=import-outside-toplevel
+            from utils.living.learning.training import create_optimizer_state
+            self.model = self.create_model()
+            self.target_model = self.create_model()
+            self.optimizer_state = create_optimizer_state(self.model)
+            self.publish_weights()
+
+    def publish_weights(self) -> "None":
+        """Mirrors the model's current weights into the population's stacked networks,
+        if any."""
+        if self.network is not None and self.slot is not None:
+            self.network.load(self.slot, self.model.get_weights())
+
+    def provide(self, q_values: "NDArray[floating]") -> "None":
+        """Provides the Q-values computed by the population-level inference pass, to be
+        used by the next update instead of a model call.
+        
+        Positional arguments:  
+         - `q_values`: the Q-values of each possible decision."""
+        self.next_q_values = q_values
+
+    def get_q_values(self, state: "NDArray[floating]") -> "NDArray[floating]":
+        """Returns the Q-values of each possible decision in a given state.
+        
+        Positional arguments:  
+         - `state`: the input values for the decision step.
+        
+        Return:  
+        The provided Q-values, if any, otherwise the stacked network's or the model's \
+        output on `state`."""
+        if self.next_q_values is not None:
+            q_values = self.next_q_values.reshape(1, len(self.next_q_values))
+            self.next_q_values = None
+            return q_values
+        if self.network is not None and self.slot is not None:
+            return self.network.forward(array([self.slot]), state.reshape(1, len(state)))
+        return self.model(state.reshape(1, len(state)), training=False).numpy()
+
+    def train(self, state_samples: "NDArray[floating]", reward_samples: "NDArray[floating]",
+              next_state_samples: "NDArray[floating]") -> "None":
+        """Performs a single compiled training step of the lobe's own model.
+        
+        Positional arguments:  
+         - `state_samples`: the sampled states, one per row.
+         - `reward_samples`: the sampled rewards, one per row.
+         - `next_state_samples`: the sampled next states, one per row."""
+        # pylint: disable=import-outside-toplevel
+        from utils.living.learning.training import train_model
+        if self.timer is not None:
+            self.timer.lap(self.PHASE)
+        train_model(
+            self.model,
+            self.target_model,
+            self.optimizer_state,
+            (state_samples, reward_samples, next_state_samples),
+            self.genome[self.LEARNING_RATE],
+            self.genome[self.GAMMA]
+        )
+        self.publish_weights()
+        if self.timer is not None:
+            self.timer.lap(Phase.TRAINING)
+
+    def observe(self, state: "NDArray[floating]", reward: "NDArray[floating]",
+                elapsed_time: "float") -> "NDArray[floating]":
+        """Performs the first half of an update step, recording the last decision's
+        outcome.
+        
+        Positional arguments:  
+         - `state`: the input values for the update step.
+         - `reward`: the reward values for the last decision.
+         - `elapsed_time`: the amount of time since last update step, in seconds.
+        
+        Return:  
+        The Q-values of each possible decision in `state`."""
+        if self.timer is not None:
+            self.timer.lap(Phase.THINKING)
+        if not self.first_frame:
+            self.memory.append(state, reward)
+        else:
+            self.memory.append(state)
+            self.first_frame = False
+
+        self.elapsed_time += elapsed_time
+        self.elapsed_time_target += elapsed_time
+
+        return self.get_q_values(state)
+
+    def learn(self) -> "None":
+        """Performs the second half of an update step, once the decision is taken, decaying
+        the exploration rate and training the lobe when due."""
+        self.epsilon = max(
+            self.genome[self.MIN_EPSILON],
+            self.epsilon * self.genome[self.EPSILON_DECAY]
+        )
+
+        if self.elapsed_time > self.genome[self.UPDATE_PERIOD] \
+                and len(self.memory) > BATCH_SIZE:
+            self.elapsed_time = 0.0
+            state_samples, reward_samples, next_state_samples = self.memory.sample(BATCH_SIZE)
+
+            if self.trainer is not None and self.slot is not None:
+                self.trainer.schedule(
+                    self.slot,
+                    state_samples,
+                    reward_samples,
+                    next_state_samples,
+                    self.genome[self.LEARNING_RATE],
+                    self.genome[self.GAMMA]
+                )
+            else:
+                self.train(state_samples, reward_samples, next_state_samples)
+
+        if self.elapsed_time_target > self.genome[self.TARGET_UPDATE_PERIOD]:
+            self.elapsed_time_target = 0.0
+            if self.trainer is not None and self.slot is not None:
+                self.trainer.schedule_sync(self.slot)
+            else:
+                # pylint: disable=import-outside-toplevel
+                from utils.living.learning.training import sync_target_model
+                sync_target_model(self.model, self.target_model)
+        if self.timer is not None:
+            self.timer.lap(self.PHASE)
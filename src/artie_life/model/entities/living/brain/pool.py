@@ -0,0 +1,190 @@
+"""Module containing the pool of pre-built models for the learning lobes."""
+from typing import TYPE_CHECKING
+from atexit import register as register_exit
+from collections import deque
+from random import getrandbits
+from threading import Condition, Thread
+from numpy.random import default_rng
+from utils.living.learning.attention import create_attention_model
+from utils.living.learning.reason import create_reason_model
+
+if TYPE_CHECKING:
+    from typing import Callable, Deque, List, Optional, Tuple
+    from numpy.random import Generator
+    from keras import Sequential
+    from tensorflow import Variable
+
+POOL_SPARE_MODELS: "int" = 4
+BUILD_SEED: "int" = 0
+
+class PooledModels:
+    """Implementation of the set of models backing a single learning lobe: its model,
+    its target model and its optimizer state."""
+
+    # pylint: disable=too-few-public-methods
+    # Warning disabled since the set only holds the models, reset as a whole.
+
+    def __init__(self, create_model: "Callable[[Optional[int]], Sequential]") -> "None":
+        """Builds a new set of models, to be re-initialized before use.
+
+        Positional arguments:  
+         - `create_model`: the function building the lobe's model from a seed."""
+        # pylint: disable=import-outside-toplevel
+        from utils.living.learning.training import create_optimizer_state
+        self.model: "Sequential" = create_model(BUILD_SEED)
+        self.target_model: "Sequential" = create_model(BUILD_SEED)
+        self.optimizer_state: "Tuple[List[Variable], List[Variable], Variable]" = \
+            create_optimizer_state(self.model)
+
+    def reset(self, generator: "Generator") -> "None":
+        """Re-initializes all models in place, as if freshly built.
+
+        Positional arguments:  
+         - `generator`: the random generator drawing the new weights."""
+        # pylint: disable=import-outside-toplevel
+        from utils.living.learning.training import reset_model, reset_optimizer_state
+        reset_model(self.model, generator)
+        reset_model(self.target_model, generator)
+        reset_optimizer_state(self.optimizer_state)
+
+
+class ModelPool:
+    """Implementation of a pool of model sets for a single lobe kind.
+
+    Dead living beings return their model sets to the pool, and new ones take them back
+    instead of building new models mid-frame. A background thread re-initializes the
+    returned sets, building new ones only when none was returned, and keeps a few spare
+    ones ready, so that taking a set from the pool costs almost nothing. The weights of
+    the n-th set taken are drawn from a generator seeded with the pool's seed and n
+    alone, so that seeded runs stay reproducible and checkpoints can resume the
+    sequence."""
+
+    # pylint: disable=too-many-instance-attributes
+    # Warning disabled since the attributes are shared with the background thread.
+
+    def __init__(self, create_model: "Callable[[Optional[int]], Sequential]",
+                 spare: "int" = POOL_SPARE_MODELS) -> "None":
+        """Instantiates an empty pool.
+
+        Positional arguments:  
+         - `create_model`: the function building the lobe's model from a seed.
+
+        Keyword arguments:  
+         - `spare`: the number of model sets kept ready beyond the ones in use."""
+        self.create_model = create_model
+        self.spare: "int" = spare
+        self.requests: "int" = 0
+        self.seed: "int" = getrandbits(64)
+        self.prepared: "int" = 0
+        self.acquired: "int" = 0
+        self.ready: "Deque[PooledModels]" = deque()
+        self.returned: "List[PooledModels]" = []
+        self.condition: "Condition" = Condition()
+        self.closed: "bool" = False
+        self.error: "Optional[Exception]" = None
+        self.worker: "Thread" = Thread(target=self.refill, daemon=True)
+        self.started: "bool" = False
+
+    def acquire(self) -> "PooledModels":
+        """Takes a re-initialized model set from the pool, waiting for the background
+        thread if none is ready yet. The thread is started by the first request, once the
+        pool's sequence may have been restored.
+
+        Return:  
+        The model set, owned by the caller until released."""
+        with self.condition:
+            self.check()
+            if not self.started:
+                self.started = True
+                self.worker.start()
+                register_exit(self.close)
+            self.requests += 1
+            self.condition.notify_all()
+            while len(self.ready) == 0:
+                self.check()
+                self.condition.wait()
+            self.requests -= 1
+            self.acquired += 1
+            return self.ready.popleft()
+
+    def check(self) -> "None":
+        """Checks that the background thread can still prepare model sets. To be invoked
+        while holding the pool's condition."""
+        if self.error is not None:
+            raise RuntimeError("the model pool's background thread failed") from self.error
+        if self.closed:
+            raise RuntimeError("the model pool was closed")
+
+    def release(self, models: "PooledModels") -> "None":
+        """Returns a model set to the pool, to be re-initialized in the background.
+
+        Positional arguments:  
+         - `models`: the model set, no longer used by the caller."""
+        with self.condition:
+            self.returned.append(models)
+            self.condition.notify_all()
+
+    def refill(self) -> "None":
+        """Main method of the background thread, re-initializing returned model sets, or
+        building new ones, until enough spare sets are ready for all pending requests."""
+        while True:
+            with self.condition:
+                while not self.closed and len(self.ready) >= self.spare + self.requests:
+                    self.condition.wait()
+                if self.closed:
+                    return
+                models = self.returned.pop() if len(self.returned) > 0 else None
+                index = self.prepared
+                self.prepared += 1
+            try:
+                if models is None:
+                    models = PooledModels(self.create_model)
+                models.reset(default_rng([self.seed, index]))
+            except Exception as error: # pylint: disable=broad-exception-caught
+                # Building models fails once the interpreter starts shutting down, which
+                # is of no concern if the pool was closed meanwhile.
+                with self.condition:
+                    if not self.closed:
+                        self.error = error
+                        self.condition.notify_all()
+                return
+            with self.condition:
+                self.ready.append(models)
+                self.condition.notify_all()
+
+    def restore(self, seed: "int", acquired: "int") -> "None":
+        """Resumes the sequence of model sets recorded by a checkpoint. To be invoked
+        before the first set is taken from the pool.
+
+        Positional arguments:  
+         - `seed`: the seed of the recorded pool.
+         - `acquired`: the number of sets taken from the recorded pool."""
+        with self.condition:
+            self.seed = seed
+            self.prepared = acquired
+            self.acquired = acquired
+
+    def close(self) -> "None":
+        """Stops the background thread, waiting for its current job to complete. Called at
+        interpreter exit, since the thread must not be killed while building models."""
+        with self.condition:
+            self.closed = True
+            self.condition.notify_all()
+        if self.worker.is_alive():
+            self.worker.join()
+
+
+class BrainPool:
+    """Implementation of the model pools of both learning lobes, shared by all living
+    beings of one or more worlds."""
+
+    # pylint: disable=too-few-public-methods
+    # Warning disabled since the pools are accessed directly.
+
+    def __init__(self, spare: "int" = POOL_SPARE_MODELS) -> "None":
+        """Instantiates the pools, which start filling up at the first request.
+
+        Keyword arguments:  
+         - `spare`: the number of model sets kept ready for each lobe."""
+        self.attention: "ModelPool" = ModelPool(create_attention_model, spare)
+        self.reason: "ModelPool" = ModelPool(create_reason_model, spare)
@@ -0,0 +1,232 @@
+"""Module containing the population-wide batched trainer for the learning lobes."""
+from typing import TYPE_CHECKING
+from random import getrandbits
+from numpy import array, where, sqrt, power, float32, float64, int64, zeros, concatenate, \
+    maximum, matmul, sign
+from numpy.random import default_rng
+from model.state import zeros_like_rows
+from utils.living.learning.commons import ADAM_BETA_1, ADAM_BETA_2, ADAM_EPSILON, \
+    draw_dense_weights
+
+if TYPE_CHECKING:
+    from typing import List, Tuple
+    from numpy import floating
+    from numpy.random import Generator
+    from numpy.typing import NDArray
+    from model.entities.living.brain.inference import StackedNetwork
+
+HUBER_DELTA: "float" = 1.0
+
+def draw_weights(network: "StackedNetwork", generator: "Generator") -> "List[NDArray[float32]]":
+    """Draws the initial weights of a network of a stack, as a freshly built Keras model's.
+
+    Positional arguments:  
+     - `network`: the stack the network belongs to.
+     - `generator`: the random generator drawing the kernels.
+
+    Return:  
+    A `List` containing the network's weights, alternating kernels and biases."""
+    return draw_dense_weights([kernel.shape[1:] for kernel in network.kernels], generator)
+
+class StackedTrainer:
+    """Implementation of the batched DQN trainer of a stack of networks.
+
+    Lobes due to train schedule their replay sample, learning rate and discount factor
+    instead of running their own training step. All scheduled steps then run together as
+    a single batched computation over the stacked weights, target weights and Adam
+    state, with the same Huber loss and Adam update of the lobes' Keras training step.
+
+    New lobes draw their initial weights straight into their slot, without building any
+    Keras model. The weights of the n-th lobe are drawn from a generator seeded with the
+    trainer's seed and n alone, so that seeded runs stay reproducible and checkpoints can
+    resume the sequence."""
+
+    # pylint: disable=too-many-instance-attributes
+    # Warning disabled since the trainer holds a stack for each piece of training state.
+
+    def __init__(self, network: "StackedNetwork") -> "None":
+        """Instantiates the trainer.
+
+        Positional arguments:  
+         - `network`: the stacked online networks to be trained."""
+        self.network: "StackedNetwork" = network
+        self.target: "StackedNetwork" = network.create_empty()
+        self.momentums: "StackedNetwork" = network.create_empty()
+        self.velocities: "StackedNetwork" = network.create_empty()
+        self.iterations: "NDArray[int64]" = zeros(network.capacity, dtype=int64)
+        self.slots: "List[int]" = []
+        self.states: "List[NDArray[floating]]" = []
+        self.rewards: "List[NDArray[floating]]" = []
+        self.next_states: "List[NDArray[floating]]" = []
+        self.learning_rates: "List[float]" = []
+        self.gammas: "List[float]" = []
+        self.syncs: "List[int]" = []
+        self.seed: "int" = getrandbits(64)
+        self.initialized: "int" = 0
+
+    def reserve(self, slot: "int") -> "None":
+        """Grows all stacks until a given slot is available.
+
+        Positional arguments:  
+         - `slot`: the slot to be made available."""
+        self.network.reserve(slot)
+        for stack in [self.target, self.momentums, self.velocities]:
+            stack.reserve(slot)
+        while slot >= len(self.iterations):
+            self.iterations = concatenate([
+                self.iterations,
+                zeros_like_rows(self.iterations, len(self.iterations))
+            ])
+
+    def register(self, slot: "int", weights: "List[NDArray[float32]]",
+                 target_weights: "List[NDArray[float32]]") -> "None":
+        """Sets up the training state of a new lobe, resetting its optimizer.
+
+        Positional arguments:  
+         - `slot`: the lobe's slot.
+         - `weights`: the lobe's initial online weights, alternating kernels and biases.
+         - `target_weights`: the lobe's initial target weights, in the same format."""
+        self.reserve(slot)
+        self.network.load(slot, weights)
+        self.target.load(slot, target_weights)
+        for stack in [self.momentums, self.velocities]:
+            for kernel, bias in zip(stack.kernels, stack.biases):
+                kernel[slot] = 0
+                bias[slot] = 0
+        self.iterations[slot] = 0
+
+    def initialize(self, slot: "int") -> "None":
+        """Sets up the training state of a new lobe, drawing its initial weights.
+
+        Positional arguments:  
+         - `slot`: the lobe's slot."""
+        generator = default_rng([self.seed, self.initialized])
+        self.initialized += 1
+        weights = draw_weights(self.network, generator)
+        self.register(slot, weights, draw_weights(self.network, generator))
+
+    def restore(self, seed: "int", initialized: "int") -> "None":
+        """Resumes the sequence of initial weights recorded by a checkpoint. To be invoked
+        before the first lobe is set up.
+
+        Positional arguments:  
+         - `seed`: the seed of the recorded trainer.
+         - `initialized`: the number of lobes set up by the recorded trainer."""
+        self.seed = seed
+        self.initialized = initialized
+
+    def schedule(self, slot: "int", states: "NDArray[floating]", rewards: "NDArray[floating]",
+                 next_states: "NDArray[floating]", learning_rate: "float",
+                 gamma: "float") -> "None":
+        """Schedules a training step for a lobe, to be run at the next `train` call.
+
+        Positional arguments:  
+         - `slot`: the lobe's slot. At most one step per slot may be scheduled.
+         - `states`: the sampled states, one per row.
+         - `rewards`: the sampled rewards, one per row.
+         - `next_states`: the sampled next states, one per row.
+         - `learning_rate`: the lobe's learning rate.
+         - `gamma`: the lobe's discount factor."""
+        self.slots.append(slot)
+        self.states.append(states)
+        self.rewards.append(rewards)
+        self.next_states.append(next_states)
+        self.learning_rates.append(learning_rate)
+        self.gammas.append(gamma)
+
+    def schedule_sync(self, slot: "int") -> "None":
+        """Schedules copying a lobe's online weights into its target weights, to be run at
+        the next `train` call after all training steps.
+
+        Positional arguments:  
+         - `slot`: the lobe's slot."""
+        self.syncs.append(slot)
+
+    def compute_gradients(self, slots: "NDArray[int64]", states: "NDArray[float32]",
+                          targets: "NDArray[float32]") \
+            -> "Tuple[List[NDArray[float32]], List[NDArray[float32]]]":
+        """Computes the gradients of each network's Huber loss, summed over its batch.
+
+        Positional arguments:  
+         - `slots`: an array of shape `(K,)` containing the trained slots.
+         - `states`: an array of shape `(K, B, inputs)` containing each network's batch.
+         - `targets`: an array of shape `(K, B, outputs)` containing the target Q-values.
+
+        Return:  
+        A `Tuple` containing the gradients of each layer's kernels and biases, stacked \
+        along the first dimension."""
+        kernels = [kernel[slots] for kernel in self.network.kernels]
+        biases = [bias[slots] for bias in self.network.biases]
+        activations: "List[NDArray[float32]]" = [states]
+        pre_activations: "List[NDArray[float32]]" = []
+        for layer, (kernel, bias) in enumerate(zip(kernels, biases)):
+            pre_activation = matmul(activations[-1], kernel) + bias[:, None, :]
+            pre_activations.append(pre_activation)
+            if layer != len(kernels) - 1:
+                activations.append(maximum(pre_activation, 0))
+        error = pre_activations[-1] - targets
+        delta = where(abs(error) <= HUBER_DELTA, error, HUBER_DELTA * sign(error)) \
+            / float32(error.shape[-1])
+        kernel_grads: "List[NDArray[float32]]" = [delta] * len(kernels)
+        bias_grads: "List[NDArray[float32]]" = [delta] * len(kernels)
+        for layer in range(len(kernels) - 1, -1, -1):
+            kernel_grads[layer] = matmul(activations[layer].transpose(0, 2, 1), delta)
+            bias_grads[layer] = delta.sum(axis=1)
+            if layer > 0:
+                delta = matmul(delta, kernels[layer].transpose(0, 2, 1)) \
+                    * (pre_activations[layer - 1] > 0)
+        return (kernel_grads, bias_grads)
+
+    def train(self) -> "None":
+        """Runs all scheduled training steps as a single batched computation, then all
+        scheduled target synchronizations."""
+        if len(self.slots) > 0:
+            slots = array(self.slots, dtype=int64)
+            next_states = array(self.next_states).astype(float32)
+            next_q_values = self.target.forward(
+                slots.repeat(next_states.shape[1]),
+                next_states.reshape(-1, next_states.shape[2])
+            ).reshape(next_states.shape[0], next_states.shape[1], -1)
+            targets = (
+                array(self.rewards, dtype=float64)
+                + array(self.gammas, dtype=float64)[:, None, None] * next_q_values
+            ).astype(float32)
+            kernel_grads, bias_grads = self.compute_gradients(
+                slots,
+                array(self.states).astype(float32),
+                targets
+            )
+            steps = (self.iterations[slots] + 1).astype(float32)
+            alphas = array(self.learning_rates, dtype=float32) \
+                * sqrt(1 - power(float32(ADAM_BETA_2), steps)) \
+                / (1 - power(float32(ADAM_BETA_1), steps))
+            for layer, (kernel_grad, bias_grad) in enumerate(zip(kernel_grads, bias_grads)):
+                for weights, momentums, velocities, gradient, alpha in [
+                    (self.network.kernels, self.momentums.kernels, self.velocities.kernels,
+                     kernel_grad, alphas[:, None, None]),
+                    (self.network.biases, self.momentums.biases, self.velocities.biases,
+                     bias_grad, alphas[:, None])
+                ]:
+                    momentum = momentums[layer][slots]
+                    momentum += (gradient - momentum) * float32(1 - ADAM_BETA_1)
+                    velocity = velocities[layer][slots]
+                    velocity += (gradient * gradient - velocity) * float32(1 - ADAM_BETA_2)
+                    momentums[layer][slots] = momentum
+                    velocities[layer][slots] = velocity
+                    weights[layer][slots] -= \
+                        (momentum * alpha) / (sqrt(velocity) + float32(ADAM_EPSILON))
+            self.iterations[slots] += 1
+        for slot in self.syncs:
+            for target, online in [
+                (self.target.kernels, self.network.kernels),
+                (self.target.biases, self.network.biases)
+            ]:
+                for layer, weights in enumerate(online):
+                    target[layer][slot] = weights[slot]
+        self.slots.clear()
+        self.states.clear()
+        self.rewards.clear()
+        self.next_states.clear()
+        self.learning_rates.clear()
+        self.gammas.clear()
+        self.syncs.clear()
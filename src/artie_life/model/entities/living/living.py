@@ -7,15 +7,23 @@ from utils.living.actions import Action, InteractionType
 from utils.living.genome import Gene
 
 if TYPE_CHECKING:
-    from typing import Dict
+    from typing import Dict, Optional
     from pygame.rect import Rect
     from controller.game_controller import GameController
+    from model.state import LivingState
+    from model.services import PopulationServices
 
 class LivingBeing(Entity):
     """Implementation of the game's living beings."""
+
+    # pylint: disable=too-many-instance-attributes
+    # Warning disabled since the living being also keeps a view over its state slot.
+
     def __init__(self, hitbox: "Rect", genome: "Dict[Gene, float]",
                  game_controller: "GameController", living_id: "int",
-                 learning_enable: "bool") -> "None":
+                 learning_enable: "bool",
+                 services: "Optional[PopulationServices]" = None,
+                 slot: "Optional[int]" = None) -> "None":
         """Instantiates a living being.
         
         Positional arguments:  
@@ -24,18 +32,38 @@ class LivingBeing(Entity):
          - `game_controller`: the game world controller.
          - `living_id`: the in-game living being identifier.
          - `learning_enable`: a `bool` representing if the living being should learn or \
-        act randomly."""
-        super().__init__(hitbox)
+        act randomly.
+         - `services`: the services shared by the living being's population. If \
+        omitted, a private state store is created.
+         - `slot`: the living being's slot in the services' state store."""
+        # pylint: disable=too-many-arguments,too-many-positional-arguments
+        # Warnings disabled since the living being's identity and position are set along
+        # with the services it is backed by.
         self.controller = ActionsController(game_controller)
         self.genome = genome
         self.brain: "Brain" = Brain(
             DistanceController(game_controller),
             self.genome,
-            learning_enable
+            learning_enable,
+            services,
+            slot
         )
+        self.state: "LivingState" = self.brain.needs_tracker.state
+        self.slot: "int" = self.brain.needs_tracker.slot
+        super().__init__(hitbox)
         self.selected: "bool" = False
         self.game_id = living_id
 
+    @property
+    def hitbox(self) -> "Rect":
+        """The living being's current hitbox, mirrored in its state slot."""
+        return self.current_hitbox
+
+    @hitbox.setter
+    def hitbox(self, hitbox: "Rect") -> "None":
+        self.current_hitbox = hitbox
+        self.state.boxes[self.slot] = (hitbox.left, hitbox.top, hitbox.width, hitbox.height)
+
     def compute_movement(self, movement: "float", elapsed_time: "float") -> "float":
         """Computes the living being direction along one axis, given a movement and
         the living being's speed multiplier.
@@ -50,14 +78,11 @@ class LivingBeing(Entity):
         dictates the direction of the movement."""
         return self.genome[Gene.SPEED] * elapsed_time * movement
 
-    def update(self, elapsed_time: "float") -> "bool":
-        """Performs a single update step for the living being, actuating its eventual action.
+    def act(self, elapsed_time: "float") -> "None":
+        """Actuates the living being's current action, moving or interacting.
         
         Positional arguments:  
-         - `elapsed_time`: the amount of time elapsed since last update, in seconds.
-        
-        Return:  
-        `True` if the living being is still alive after the update step, `False` otherwise."""
+         - `elapsed_time`: the amount of time elapsed since last update, in seconds."""
         action: "Action" = self.brain.reason.action
 
         if action != Action.INTERACT:
@@ -71,4 +96,24 @@ class LivingBeing(Entity):
         else:
             interaction: "InteractionType" = self.controller.interact(self.hitbox, id(self))
             self.brain.actuate(interaction)
+
+    def think(self, elapsed_time: "float") -> "bool":
+        """Updates the living being's brain, deciding its next action.
+        
+        Positional arguments:  
+         - `elapsed_time`: the amount of time elapsed since last update, in seconds.
+        
+        Return:  
+        `True` if the living being is still alive after the update step, `False` otherwise."""
         return self.brain.update(elapsed_time, self.hitbox)
+
+    def update(self, elapsed_time: "float") -> "bool":
+        """Performs a single update step for the living being, actuating its eventual action.
+        
+        Positional arguments:  
+         - `elapsed_time`: the amount of time elapsed since last update, in seconds.
+        
+        Return:  
+        `True` if the living being is still alive after the update step, `False` otherwise."""
+        self.act(elapsed_time)
+        return self.think(elapsed_time)
@@ -1,32 +1,175 @@
 """Module containing the needs tracker's implementation."""
 from typing import TYPE_CHECKING
-from controller.genetics import compute_fitness
-from utils.living.needs import Need
-from utils.living.actions import EntityType
+from collections.abc import MutableMapping
+from numpy import array, minimum, where
+from controller.genetics import compute_fitness, compute_population_fitness
+from model.state import LivingState
+from utils.living.needs import Need, TRACKED_NEEDS, NEED_COLUMNS
+from utils.living.actions import EntityType, PERCEIVED_TYPES, PERCEIVED_COLUMNS
 
 if TYPE_CHECKING:
-    from typing import Dict, Tuple
+    from typing import Dict, Iterator, Optional, Tuple
+    from numpy import bool_, floating, int64
+    from numpy.typing import NDArray
     from pygame.rect import Rect
     from controller.world.world_controllers import DistanceController
     from utils.living.genome import Gene
 
+NEED_THRESHOLDS = array([need.get_threshold() for need in TRACKED_NEEDS])
+
+def decay_population(state: "LivingState", slots: "NDArray[int64]",
+                     elapsed_time: "float") -> "NDArray[bool_]":
+    """Actuates a single decay step in all needs of a whole population at once, with the
+    same semantics of `NeedsTracker.decay`.
+    
+    Positional arguments:  
+     - `state`: the store backing the population's state.
+     - `slots`: the slots of the living beings to be decayed.
+     - `elapsed_time`: the amount of time elapsed since last step, in seconds.
+    
+    Return:  
+    A boolean mask telling, for each slot, if the living being is still alive after the \
+    decay step."""
+    life = NEED_COLUMNS[Need.LIFE]
+    values = state.needs[slots]
+    decayed = minimum(values + state.decay[slots] * elapsed_time, NEED_THRESHOLDS)
+    decayed[:, life] = where(
+        (values[:, NEED_COLUMNS[Need.HUNGER]] >= Need.HUNGER.get_threshold())
+        | (values[:, NEED_COLUMNS[Need.TIREDNESS]] >= Need.TIREDNESS.get_threshold()),
+        decayed[:, life],
+        values[:, life]
+    )
+    observations = state.observations[slots]
+    needs_avg = (state.needs_avg[slots] * observations[:, None] + values) \
+        / (observations[:, None] + 1)
+    state.needs[slots] = decayed
+    state.needs_avg[slots] = needs_avg
+    state.observations[slots] = observations + 1
+    state.lifetime[slots] += elapsed_time
+    state.fitness[slots] = compute_population_fitness(needs_avg)
+    return decayed[:, life] < Need.LIFE.get_threshold()
+
+class NeedsView(MutableMapping):
+    """`Dict`-like view associating to each tracked `Need` its value in a living being's
+    slot of a `LivingState` column."""
+    def __init__(self, state: "LivingState", field: "str", slot: "int") -> "None":
+        """Instantiates the view.
+        
+        Positional arguments:  
+         - `state`: the store holding the values.
+         - `field`: the name of the store's column.
+         - `slot`: the living being's slot."""
+        self.state = state
+        self.field = field
+        self.slot = slot
+
+    def __getitem__(self, need: "Need") -> "float":
+        return float(getattr(self.state, self.field)[self.slot, NEED_COLUMNS[need]])
+
+    def __setitem__(self, need: "Need", value: "float") -> "None":
+        getattr(self.state, self.field)[self.slot, NEED_COLUMNS[need]] = value
+
+    def __delitem__(self, need: "Need") -> "None":
+        raise TypeError("tracked needs cannot be removed")
+
+    def __iter__(self) -> "Iterator[Need]":
+        return iter(TRACKED_NEEDS)
+
+    def __len__(self) -> "int":
+        return len(TRACKED_NEEDS)
+
+    def as_array(self) -> "NDArray[floating]":
+        """Returns the viewed values as an array.
+        
+        Return:  
+        A view of the store's row, with one value per `Need` in `TRACKED_NEEDS` order."""
+        return getattr(self.state, self.field)[self.slot]
+
+
+class PerceptionView(MutableMapping):
+    """`Dict`-like view associating to each perceived `EntityType` its bidimensional
+    distance, as stored in a living being's slot of a `LivingState` column."""
+    def __init__(self, state: "LivingState", field: "str", index: "Tuple[int, ...]") -> "None":
+        """Instantiates the view.
+        
+        Positional arguments:  
+         - `state`: the store holding the values.
+         - `field`: the name of the store's column.
+         - `index`: the leading indices selecting the living being's row in the column."""
+        self.state = state
+        self.field = field
+        self.index = index
+
+    def __getitem__(self, entity_type: "EntityType") -> "Tuple[float, float]":
+        values = getattr(self.state, self.field)[self.index + (PERCEIVED_COLUMNS[entity_type],)]
+        return (float(values[0]), float(values[1]))
+
+    def __setitem__(self, entity_type: "EntityType", value: "Tuple[float, float]") -> "None":
+        getattr(self.state, self.field)[self.index + (PERCEIVED_COLUMNS[entity_type],)] = value
+
+    def __delitem__(self, entity_type: "EntityType") -> "None":
+        raise TypeError("perceived entity types cannot be removed")
+
+    def __iter__(self) -> "Iterator[EntityType]":
+        return iter(PERCEIVED_TYPES)
+
+    def __len__(self) -> "int":
+        return len(PERCEIVED_TYPES)
+
+    def as_array(self) -> "NDArray[floating]":
+        """Returns the viewed values as an array.
+        
+        Return:  
+        A view of the store's row, with one distance per `EntityType` in \
+        `PERCEIVED_TYPES` order."""
+        return getattr(self.state, self.field)[self.index]
+
+
 class NeedsTracker:
-    """Implementation for the needs tracker of each living being."""
-    def __init__(self, genome: "Dict[Gene, float]") -> "None":
+    """Implementation for the needs tracker of each living being, acting as a view over
+    the living being's slot of a `LivingState`."""
+    def __init__(self, genome: "Dict[Gene, float]", state: "Optional[LivingState]" = None,
+                 slot: "Optional[int]" = None) -> "None":
         """Instantiates a needs tracker.
         
         Arguments:  
-        `genome`: the living being's genome."""
-        self.needs: "Dict[Need, float]" = { }
-        self.needs_avg: "Dict[Need, float]" = { }
-        for need in Need:
-            if need != Need.NONE:
-                self.needs[need] = need.get_base_value()
-                self.needs_avg[need] = 0
-        self.observations: "int" = 0
-        self.lifetime: "float" = 0
-        self.fitness: "float" = 0
+        `genome`: the living being's genome.  
+        `state`: the store backing the living being's state. If omitted, a private store \
+        is created.  
+        `slot`: the living being's slot in `state`. If omitted, a new slot is allocated."""
+        self.state: "LivingState" = state if state is not None else LivingState(1)
+        self.slot: "int" = slot if slot is not None else self.state.allocate(genome)
+        self.needs: "NeedsView" = NeedsView(self.state, "needs", self.slot)
+        self.needs_avg: "NeedsView" = NeedsView(self.state, "needs_avg", self.slot)
         self.genome = genome
+        self.next_alive: "Optional[bool]" = None
+
+    @property
+    def observations(self) -> "int":
+        """The number of recorded decay steps."""
+        return int(self.state.observations[self.slot])
+
+    @observations.setter
+    def observations(self, value: "int") -> "None":
+        self.state.observations[self.slot] = value
+
+    @property
+    def lifetime(self) -> "float":
+        """The living being's lifetime, in seconds."""
+        return float(self.state.lifetime[self.slot])
+
+    @lifetime.setter
+    def lifetime(self, value: "float") -> "None":
+        self.state.lifetime[self.slot] = value
+
+    @property
+    def fitness(self) -> "float":
+        """The living being's current fitness."""
+        return float(self.state.fitness[self.slot])
+
+    @fitness.setter
+    def fitness(self, value: "float") -> "None":
+        self.state.fitness[self.slot] = value
 
     def decay(self, elapsed_time: "float") -> "bool":
         """Actuates a single decay step in all needs.
@@ -35,7 +178,13 @@ class NeedsTracker:
          - `elapsed_time`: the amount of time elapsed since last step, in seconds.
         
         Return:  
-        `True` if the living being is still alive after the decay step, `False` otherwise."""
+        `True` if the living being is still alive after the decay step, `False` otherwise.  
+        If the step was already actuated by the world-level decay pass, its outcome is \
+        returned without decaying again."""
+        if self.next_alive is not None:
+            alive = self.next_alive
+            self.next_alive = None
+            return alive
         for need, value in self.needs.items():
             if (
                 need != Need.LIFE
@@ -54,6 +203,14 @@ class NeedsTracker:
         self.fitness = compute_fitness(self.needs_avg)
         return self.needs[Need.LIFE] < Need.LIFE.get_threshold()
 
+    def provide(self, alive: "bool") -> "None":
+        """Provides the outcome of the world-level decay pass, which already actuated the
+        next decay step on the living being's slot.
+        
+        Positional arguments:  
+         - `alive`: `True` if the living being survived the decay step."""
+        self.next_alive = alive
+
     def actuate(self, need: "Need") -> "None":
         """Actuates a given action on the living being's needs.
         
@@ -74,32 +231,75 @@ class NeedsTracker:
 
 
 class PerceptionTracker:
-    """Implementation for the living being's perception tracker."""
-    def __init__(self, controller: "DistanceController") -> "None":
+    """Implementation for the living being's perception tracker, acting as a view over
+    the living being's slot of a `LivingState`."""
+    def __init__(self, controller: "DistanceController", state: "Optional[LivingState]" = None,
+                 slot: "Optional[int]" = None) -> "None":
         """Instantiates a perception tracker.
         
         Arguments:  
          - `controller`: the distance controller, responsible of calculating the \
-        living being's perceived values."""
-        self.perception: "Dict[EntityType, Tuple[float, float]]"
-        self.perception_avg: "Dict[EntityType, Tuple[float, float]]" = { }
-        for entity_type in EntityType:
-            if entity_type != EntityType.PLAYGROUND:
-                self.perception_avg[entity_type] = (0, 0)
-        self.observations: "int" = 0
+        living being's perceived values.
+         - `state`: the store backing the living being's state. If omitted, a private \
+        store is created.
+         - `slot`: the living being's slot in `state`. Must be provided along with `state`."""
+        self.state: "LivingState" = state if state is not None else LivingState(1)
+        self.slot: "int" = slot if slot is not None else 0
+        self.perception: "PerceptionView"
+        self.perception_avg: "PerceptionView" = \
+            PerceptionView(self.state, "perception_avg", (self.slot,))
         self.controller: "DistanceController" = controller
+        self.next_perception: "Optional[Dict[EntityType, Tuple[float, float]]]" = None
+
+    @property
+    def observations(self) -> "int":
+        """The number of recorded observations."""
+        return int(self.state.perception_observations[self.slot])
+
+    def provide(self, perception: "Dict[EntityType, Tuple[float, float]]") -> "None":
+        """Provides the perception computed by the world-level perception pass, to be
+        used by the next recorded observation instead of a live query.
+        
+        The perception is written right away to the other half of the slot's double \
+        buffer, so that population-wide passes can read it from the store.
+        
+        Positional arguments:  
+         - `perception`: the precomputed perception of the environment."""
+        next_perception = PerceptionView(
+            self.state,
+            "perception",
+            (self.get_next_buffer(), self.slot)
+        )
+        for entity_type, values in perception.items():
+            next_perception[entity_type] = values
+        self.next_perception = perception
+
+    def get_next_buffer(self) -> "int":
+        """Returns the half of the slot's double buffer the next observation is written to.
+        
+        Return:  
+        The index of the buffer's next half."""
+        return 1 - int(self.state.perception_buffer[self.slot])
 
     def record(self, hitbox: "Rect") -> "None":
         """Records an observation of the environment.
+
+        The current perception is written to the other half of the slot's double buffer,
+        so that the previous perception view stays valid for the current frame.
         
         Positional arguments:  
          - `hitbox`: the living being's current hitbox."""
-        self.perception = self.controller.get_distance_by_type(hitbox)
-        for entity_type, values in self.perception.items():
-            self.perception_avg[entity_type] = (
-                (self.perception_avg[entity_type][0] * self.observations + values[0])
-                    / (self.observations + 1),
-                (self.perception_avg[entity_type][1] * self.observations + values[1])
-                    / (self.observations + 1)
-            )
-        self.observations += 1
+        buffer = self.get_next_buffer()
+        self.state.perception_buffer[self.slot] = buffer
+        self.perception = PerceptionView(self.state, "perception", (buffer, self.slot))
+        if self.next_perception is not None:
+            self.next_perception = None
+        else:
+            for entity_type, values in self.controller.get_distance_by_type(hitbox).items():
+                self.perception[entity_type] = values
+        observations = self.observations
+        self.state.perception_avg[self.slot] = (
+            self.state.perception_avg[self.slot] * observations
+            + self.state.perception[buffer, self.slot]
+        ) / (observations + 1)
+        self.state.perception_observations[self.slot] = observations + 1
@@ -0,0 +1,165 @@
+"""Module containing the game world's entity registry and collections."""
+from typing import TYPE_CHECKING, Generic, TypeVar
+from types import MappingProxyType
+from utils.living.actions import EntityType
+
+if TYPE_CHECKING:
+    from typing import Dict, Iterator, List, Mapping, Sequence, Tuple
+    from model.entities.non_living import Entity, Playground, InteractiveSpot
+    from model.entities.living.living import LivingBeing
+
+T = TypeVar("T")
+
+class SlotMap(Generic[T]):
+    """Implementation of a dense collection addressed by stable keys.
+
+    Items are stored contiguously, so that iteration and positional access are cheap,
+    while removals swap the last item into the freed position, costing constant time.
+    As a consequence, removals do not preserve the items' order."""
+    def __init__(self) -> "None":
+        """Instantiates an empty slot map."""
+        self.items: "List[T]" = []
+        self.keys: "List[int]" = []
+        self.positions: "Dict[int, int]" = { }
+
+    def insert(self, key: "int", item: "T") -> "None":
+        """Appends an item to the collection.
+
+        Positional arguments:  
+         - `key`: the item's stable key. Must not be already in use.
+         - `item`: the item to be stored."""
+        self.positions[key] = len(self.items)
+        self.items.append(item)
+        self.keys.append(key)
+
+    def remove(self, key: "int") -> "T":
+        """Removes an item from the collection in constant time.
+
+        Positional arguments:  
+         - `key`: the stable key of the item to be removed.
+
+        Return:  
+        The removed item."""
+        position = self.positions.pop(key)
+        item = self.items[position]
+        last_item = self.items.pop()
+        last_key = self.keys.pop()
+        if position < len(self.items):
+            self.items[position] = last_item
+            self.keys[position] = last_key
+            self.positions[last_key] = position
+        return item
+
+    def get(self, key: "int") -> "T":
+        """Retrieves an item by its stable key.
+
+        Positional arguments:  
+         - `key`: the item's stable key.
+
+        Return:  
+        The desired item."""
+        return self.items[self.positions[key]]
+
+    def __contains__(self, key: "int") -> "bool":
+        return key in self.positions
+
+    def __getitem__(self, position: "int") -> "T":
+        return self.items[position]
+
+    def __iter__(self) -> "Iterator[T]":
+        return iter(self.items)
+
+    def __len__(self) -> "int":
+        return len(self.items)
+
+
+class EntityRegistry:
+    """Implementation of the entity registry, keeping stable read-only views over all
+    game entities so that hot paths can iterate over them without allocating.
+
+    Views over living beings are rebuilt lazily, at most once per population change."""
+    def __init__(self, playground: "Playground",
+                 interactive_spots: "Dict[EntityType, List[InteractiveSpot]]") -> "None":
+        """Instantiates the entity registry.
+
+        Positional arguments:  
+         - `playground`: the world's playground.
+         - `interactive_spots`: the world's interactive spots, grouped by type."""
+        static: "List[Tuple[EntityType, Entity]]" = [(EntityType.PLAYGROUND, playground)]
+        for entity_type, spots in interactive_spots.items():
+            for spot in spots:
+                static.append((entity_type, spot))
+        self.static_entities: "Tuple[Tuple[EntityType, Entity], ...]" = tuple(static)
+        self.static_by_type: "Mapping[EntityType, Tuple[Entity, ...]]" = MappingProxyType({
+            entity_type: tuple(entity for cur_type, entity in static if cur_type == entity_type)
+            for entity_type in EntityType if entity_type != EntityType.LIVING
+        })
+        self.living_beings: "Dict[int, LivingBeing]" = { }
+        self.changed: "bool" = True
+        self.living_view: "Tuple[LivingBeing, ...]" = ()
+        self.all_view: "Tuple[Tuple[EntityType, Entity], ...]" = ()
+        self.blocking_view: "Tuple[Entity, ...]" = ()
+
+    def add_living(self, living_being: "LivingBeing") -> "None":
+        """Registers a newly spawned living being.
+
+        Positional arguments:  
+         - `living_being`: the living being to be registered."""
+        self.living_beings[id(living_being)] = living_being
+        self.changed = True
+
+    def remove_living(self, living_being: "LivingBeing") -> "None":
+        """Unregisters a dead living being.
+
+        Positional arguments:  
+         - `living_being`: the living being to be unregistered."""
+        self.living_beings.pop(id(living_being), None)
+        self.changed = True
+
+    def refresh(self) -> "None":
+        """Rebuilds the views over living beings, if the population changed."""
+        if self.changed:
+            self.changed = False
+            self.living_view = tuple(self.living_beings.values())
+            self.all_view = self.static_entities + tuple(
+                (EntityType.LIVING, living_being) for living_being in self.living_view
+            )
+            self.blocking_view = tuple(
+                entity for entity_type, entity in self.all_view if not entity_type.walkable()
+            )
+
+    def get_all(self) -> "Sequence[Tuple[EntityType, Entity]]":
+        """Returns all registered entities with their type, static entities first.
+
+        Return:  
+        A read-only `Sequence` of `Tuple` containing the `EntityType` and the `Entity`."""
+        self.refresh()
+        return self.all_view
+
+    def get_living(self) -> "Sequence[LivingBeing]":
+        """Returns all registered living beings, in spawn order.
+
+        Return:  
+        A read-only `Sequence` of `LivingBeing`."""
+        self.refresh()
+        return self.living_view
+
+    def get_blocking(self) -> "Sequence[Entity]":
+        """Returns all entities that living beings cannot walk on.
+
+        Return:  
+        A read-only `Sequence` of `Entity`."""
+        self.refresh()
+        return self.blocking_view
+
+    def get_by_type(self, entity_type: "EntityType") -> "Sequence[Entity]":
+        """Returns all registered entities of a given type.
+
+        Positional arguments:  
+         - `entity_type`: the desired `EntityType`.
+
+        Return:  
+        A read-only `Sequence` of `Entity`."""
+        if entity_type == EntityType.LIVING:
+            return self.get_living()
+        return self.static_by_type[entity_type]
@@ -0,0 +1,37 @@
+"""Module containing the services shared by a population of living beings."""
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from typing import Optional
+    from model.state import LivingState
+    from model.entities.living.brain.inference import PopulationInference
+    from model.entities.living.brain.pool import BrainPool
+    from utils.timing import PhaseTimer
+
+class PopulationServices:
+    """Implementation of the services a world provides to each of its living beings, so
+    that they are handed over as a whole rather than one by one."""
+
+    # pylint: disable=too-few-public-methods
+    # Warning disabled since the services are only accessed as attributes.
+
+    def __init__(self, state: "Optional[LivingState]" = None,
+                 inference: "Optional[PopulationInference]" = None,
+                 pool: "Optional[BrainPool]" = None,
+                 timer: "Optional[PhaseTimer]" = None) -> "None":
+        """Instantiates the services.
+        
+        Keyword arguments:  
+         - `state`: the store backing the living beings' state. If omitted, each living \
+        being creates a private store.
+         - `inference`: the population's inference engine, sharing the slots of `state`. \
+        If omitted, learning lobes always query and train their own models.
+         - `pool`: the pool providing the learning lobes' models. Ignored along with \
+        `inference`, whose trainers draw the lobes' weights. If omitted, learning lobes \
+        build their own models.
+         - `timer`: the world's phase timer, charged by the learning lobes with their own \
+        share of each update. If omitted, the lobes are not timed."""
+        self.state = state
+        self.inference = inference
+        self.pool = pool
+        self.timer = timer
@@ -0,0 +1,113 @@
+"""Module containing the struct-of-arrays store backing living beings' state."""
+from typing import TYPE_CHECKING
+from numpy import zeros, concatenate, flatnonzero, int8, int32, int64
+from utils.living.genome import Gene
+from utils.living.needs import TRACKED_NEEDS
+from utils.living.actions import PERCEIVED_TYPES
+
+if TYPE_CHECKING:
+    from typing import Dict, List
+    from numpy import floating, bool_
+    from numpy.typing import NDArray
+
+INITIAL_CAPACITY: "int" = 32
+
+def zeros_like_rows(column: "NDArray", rows: "int") -> "NDArray":
+    """Creates a block of zeroed rows compatible with a given store column.
+
+    Positional arguments:  
+     - `column`: the store column to be extended.
+     - `rows`: the number of rows to be created.
+
+    Return:  
+    A zeroed array with `rows` rows and the same trailing shape and type as `column`."""
+    return zeros((rows,) + column.shape[1:], dtype=column.dtype)
+
+class LivingState:
+    """Implementation of the struct-of-arrays store for living beings' state.
+
+    Every living being owns a slot, indexing the first dimension of all arrays, so that
+    per-frame systems can run as whole-population array kernels. Living beings and
+    their trackers act as thin views over their own slot."""
+
+    # pylint: disable=too-many-instance-attributes
+    # Warning disabled since each attribute is one of the store's columns.
+
+    def __init__(self, capacity: "int" = INITIAL_CAPACITY) -> "None":
+        """Instantiates an empty store.
+
+        Positional arguments:  
+         - `capacity`: the number of slots initially allocated. The store grows \
+        automatically when full."""
+        self.capacity: "int" = capacity
+        self.boxes: "NDArray[int32]" = zeros((capacity, 4), dtype=int32)
+        self.speed: "NDArray[floating]" = zeros(capacity)
+        self.decay: "NDArray[floating]" = zeros((capacity, len(TRACKED_NEEDS)))
+        self.needs: "NDArray[floating]" = zeros((capacity, len(TRACKED_NEEDS)))
+        self.needs_avg: "NDArray[floating]" = zeros((capacity, len(TRACKED_NEEDS)))
+        self.observations: "NDArray[int64]" = zeros(capacity, dtype=int64)
+        self.lifetime: "NDArray[floating]" = zeros(capacity)
+        self.fitness: "NDArray[floating]" = zeros(capacity)
+        self.perception: "NDArray[floating]" = zeros((2, capacity, len(PERCEIVED_TYPES), 2))
+        self.perception_buffer: "NDArray[int8]" = zeros(capacity, dtype=int8)
+        self.perception_avg: "NDArray[floating]" = zeros((capacity, len(PERCEIVED_TYPES), 2))
+        self.perception_observations: "NDArray[int64]" = zeros(capacity, dtype=int64)
+        self.used: "NDArray[bool_]" = zeros(capacity, dtype=bool)
+        self.free: "List[int]" = list(range(capacity - 1, -1, -1))
+
+    def grow(self) -> "None":
+        """Doubles the store's capacity, preserving all occupied slots."""
+        extra = self.capacity
+        for field in ["boxes", "speed", "decay", "needs", "needs_avg", "observations",
+                      "lifetime", "fitness", "perception_buffer", "perception_avg",
+                      "perception_observations", "used"]:
+            column = getattr(self, field)
+            setattr(self, field, concatenate([column, zeros_like_rows(column, extra)]))
+        self.perception = concatenate(
+            [self.perception, zeros((2, extra) + self.perception.shape[2:])],
+            axis=1
+        )
+        self.free = list(range(self.capacity + extra - 1, self.capacity - 1, -1)) + self.free
+        self.capacity += extra
+
+    def allocate(self, genome: "Dict[Gene, float]") -> "int":
+        """Reserves a slot for a new living being, initializing its genes and needs.
+
+        Positional arguments:  
+         - `genome`: the living being's genome.
+
+        Return:  
+        The index of the reserved slot."""
+        if len(self.free) == 0:
+            self.grow()
+        slot = self.free.pop()
+        self.used[slot] = True
+        self.speed[slot] = genome[Gene.SPEED]
+        for col, need in enumerate(TRACKED_NEEDS):
+            self.decay[slot, col] = genome[need.get_corresponding_gene()]
+            self.needs[slot, col] = need.get_base_value()
+        self.needs_avg[slot] = 0
+        self.observations[slot] = 0
+        self.lifetime[slot] = 0
+        self.fitness[slot] = 0
+        self.perception[:, slot] = 0
+        self.perception_buffer[slot] = 0
+        self.perception_avg[slot] = 0
+        self.perception_observations[slot] = 0
+        return slot
+
+    def release(self, slot: "int") -> "None":
+        """Frees a slot previously reserved for a living being.
+
+        Positional arguments:  
+         - `slot`: the slot to be freed."""
+        if self.used[slot]:
+            self.used[slot] = False
+            self.free.append(slot)
+
+    def get_used_slots(self) -> "NDArray[int64]":
+        """Returns the indices of all occupied slots.
+
+        Return:  
+        An array containing the occupied slots, in increasing order."""
+        return flatnonzero(self.used)
@@ -1,66 +1,152 @@
 """Module containing the game world's implementation."""
 from typing import TYPE_CHECKING
-from pygame.rect import Rect
+from numpy import array, int64
 from model.entities.non_living import Playground, InteractiveSpot
 from model.entities.living.living import LivingBeing
+from model.registry import EntityRegistry, SlotMap
+from model.state import LivingState
+from model.services import PopulationServices
+from model.entities.living.needs import decay_population
+from model.entities.living.brain.inference import PopulationInference
+from model.entities.living.brain.pool import BrainPool
+from controller.world.spatial_index import SpatialIndex
+from controller.world.distance_field import StaticDistanceField
+from controller.world.world_controllers import DistanceController
+from controller.world.spawn_placer import SpawnPlacer
+from controller.genetics import compute_fitness
 from utils.living.actions import EntityType
 from utils.map.generation import init_playground, init_interactive_spots
-from utils.map.constants import LIVING_WIDTH, LIVING_HEIGHT
 from utils.living.genome import Gene
 from utils.logs import start_world_log, log_living_being_stats, \
-    start_performance_log, log_frame_performance
+    start_performance_log, finish_performance_log, flush_logs, \
+    start_phases_log, log_phases
+from utils.timing import Phase, PhaseTimer
 
 if TYPE_CHECKING:
-    from typing import Dict, List
+    from typing import Dict, List, Optional, Union
+    from numpy import bool_
+    from numpy.typing import NDArray
+    from pygame.rect import Rect
     from controller.game_controller import GameController
 
 class World:
     """Implementation for the game world."""
-    def __init__(self, controller: "GameController", world_id: "int") -> "None":
+
+    # pylint: disable=too-many-instance-attributes
+    # Warning disabled since the world owns the systems shared by its population.
+
+    def __init__(self, controller: "GameController", world_id: "int",
+                 array_state: "bool" = True,
+                 services: "Optional[PopulationServices]" = None,
+                 distance_field: "Optional[StaticDistanceField]" = None,
+                 resume: "bool" = False) -> "None":
         """Instantiates the game world.
         
         Positional arguments:  
          - `controller`: the world's controller.  
-         - `world_id`: the world's in-game ID."""
+         - `world_id`: the world's in-game ID.
+        
+        Keyword arguments:  
+         - `array_state`: if `True`, all living beings' state is backed by a single \
+        shared `LivingState`, enabling whole-population array kernels. Otherwise, each \
+        living being keeps its own private store.
+         - `services`: existing services shared with other worlds stepped in lockstep. \
+        Their state store implies `array_state`. If their inference engine is omitted, \
+        one is created along with an array-backed state, unless the controller requests \
+        the `keras` inference backend. If their model pool is omitted, one is created \
+        when the controller enables learning without an inference engine, whose trainers \
+        draw the lobes' weights otherwise. Their timer is ignored, since each world \
+        times its own updates.
+         - `distance_field`: an existing distance field over the same interactive spots, \
+        possibly shared with other worlds. If omitted, it is precomputed.
+         - `resume`: if `True`, the world is about to be restored from a checkpoint, and \
+        its existing logs are extended rather than overwritten."""
+        # pylint: disable=too-many-arguments,too-many-positional-arguments
+        # Warnings disabled since all optional arguments are passed by keyword.
+        shared = services if services is not None else PopulationServices()
         self.controller: "GameController" = controller
         self.playground: "Playground" = init_playground()
         self.interactive_spots: "Dict[EntityType, List[InteractiveSpot]]" = \
                 init_interactive_spots()
-        self.living: "List[LivingBeing]" = []
+        self.distance_field: "StaticDistanceField" = distance_field \
+                if distance_field is not None else StaticDistanceField(self.interactive_spots)
+        self.living: "SlotMap[LivingBeing]" = SlotMap()
+        self.state: "Optional[LivingState]" = shared.state if shared.state is not None \
+                else LivingState() if array_state else None
+        self.inference: "Optional[PopulationInference]" = shared.inference \
+                if shared.inference is not None \
+                else PopulationInference() \
+                if self.state is not None and controller.inference_backend == "numpy" else None
+        self.pool: "Optional[BrainPool]" = shared.pool if shared.pool is not None \
+                else BrainPool() \
+                if controller.learning_enable and self.inference is None else None
+        self.timer: "Optional[PhaseTimer]" = PhaseTimer() if controller.phase_timing else None
+        self.services: "PopulationServices" = \
+                PopulationServices(self.state, self.inference, self.pool, self.timer)
+        self.registry: "EntityRegistry" = EntityRegistry(self.playground, self.interactive_spots)
+        self.distance_controller: "DistanceController" = DistanceController(controller)
+        self.spatial_index: "SpatialIndex" = SpatialIndex()
+        self.spatial_index.insert(EntityType.PLAYGROUND, self.playground)
+        for entity_type, spots in self.interactive_spots.items():
+            for spot in spots:
+                self.spatial_index.insert(entity_type, spot)
+        self.spawn_placer: "SpawnPlacer" = SpawnPlacer(self.playground)
         self.population_size: "int" = 0
+        self.deaths: "int" = 0
         self.world_id = world_id
         self.next_id: "int" = 0
-        start_world_log(self.world_id)
-        start_performance_log(self.world_id)
+        start_world_log(self.world_id, resume)
+        start_performance_log(
+            self.world_id,
+            resume,
+            histograms=controller.performance_log == "histograms"
+        )
+        if self.timer is not None:
+            start_phases_log(self.world_id, resume)
 
     def spawn_living(self, controller: "GameController",
+                     genome: "Dict[Gene, float]", learning_enable: "bool") -> "bool":
+        """Spawns a living being inside the playground, on a random free position.
+        
+        Positional arguments:  
+         - `controller`: the game's world controller.
+         - `genome`: the living being's desired genome.
+         - `learning_enable`: a `bool` representing if the living being should learn or \
+        act randomly.
+        
+        Return:  
+        `True` if the living being was spawned, `False` if the playground has no free \
+        space left, in which case no living being is spawned."""
+        rect = self.spawn_placer.place(self.registry.get_blocking())
+        if rect is None:
+            return False
+        self.place_living(controller, rect, genome, learning_enable)
+        return True
+
+    def place_living(self, controller: "GameController", hitbox: "Rect",
                      genome: "Dict[Gene, float]", learning_enable: "bool") -> "None":
-        """Spawns a living being inside the playground.
+        """Places a new living being at a given position, without checking for obstruction.
         
         Positional arguments:  
          - `controller`: the game's world controller.
+         - `hitbox`: the living being's initial hitbox.
          - `genome`: the living being's desired genome.
          - `learning_enable`: a `bool` representing if the living being should learn or \
         act randomly."""
-        colliding: "bool" = True
-        rect: "Rect"
-        while colliding:
-            colliding = False
-            pos = self.playground.get_random_inner_spot()
-            rect = Rect(pos[0], pos[1], LIVING_WIDTH, LIVING_HEIGHT)
-            for living in self.living:
-                if living.is_colliding(rect):
-                    colliding = True
         self.next_id += 1
-        self.living.append(
-            LivingBeing(
-                rect,
-                genome,
-                controller,
-                self.next_id,
-                learning_enable
-            )
+        living_being = LivingBeing(
+            hitbox,
+            genome,
+            controller,
+            self.next_id,
+            learning_enable,
+            self.services,
+            self.state.allocate(genome) if self.state is not None else None
         )
+        self.living.insert(living_being.game_id, living_being)
+        self.spawn_placer.occupy(hitbox)
+        self.registry.add_living(living_being)
+        self.spatial_index.insert(EntityType.LIVING, living_being)
         if len(self.living) > self.population_size:
             self.population_size += 1
 
@@ -69,14 +155,126 @@ class World:
         
         Positional arguments:  
          - `elapsed_time`: the amount of time elapsed since the last model update, in seconds."""
-        log_frame_performance(self.world_id, elapsed_time)
+        self.advance(elapsed_time)
+        self.perceive()
+        self.decay(elapsed_time)
+        self.infer(elapsed_time)
+        self.settle(elapsed_time)
+        self.train()
+
+    def advance(self, elapsed_time: "float") -> "None":
+        """Performs the first phase of a world update, making all living beings act.
+        
+        Positional arguments:  
+         - `elapsed_time`: the amount of time elapsed since the last model update, in seconds."""
+        if self.timer is not None and self.timer.start_frame():
+            log_phases(self.world_id, self.timer)
+        if self.timer is not None:
+            self.timer.lap(Phase.LOGGING)
+        self.spawn_placer.invalidate()
+        for living_being in self.living:
+            living_being.act(elapsed_time)
+            self.spatial_index.update(living_being)
+        if self.timer is not None:
+            self.timer.lap(Phase.MOVEMENT)
+
+    def settle(self, elapsed_time: "float") -> "None":
+        """Performs the last phase of a world update, once perception and needs decay have
+        been computed, making all living beings think and replacing the dead ones.
+        
+        Positional arguments:  
+         - `elapsed_time`: the amount of time elapsed since the last model update, in seconds."""
+        if self.timer is not None:
+            self.timer.restart()
+        dead: "List[LivingBeing]" = []
         for living_being in self.living:
-            alive = living_being.update(elapsed_time)
+            alive = living_being.think(elapsed_time)
             if not alive:
-                self.living.remove(living_being)
-                log_living_being_stats(self.world_id, living_being)
-                if len(self.living) < self.population_size:
-                    self.controller.spawn_living()
+                dead.append(living_being)
+        if self.timer is not None:
+            self.timer.lap(Phase.THINKING)
+        for living_being in dead:
+            self.remove_living(living_being)
+        while len(self.living) < self.population_size:
+            if not self.controller.spawn_living():
+                break
+        if self.timer is not None:
+            self.timer.lap(Phase.SPAWNING)
+
+    def remove_living(self, living_being: "LivingBeing") -> "None":
+        """Removes a dead living being from the world, logging its stats.
+        
+        Positional arguments:  
+         - `living_being`: the dead living being."""
+        self.living.remove(living_being.game_id)
+        self.deaths += 1
+        self.registry.remove_living(living_being)
+        self.spatial_index.remove(living_being)
+        log_living_being_stats(self.world_id, living_being)
+        living_being.brain.release()
+        if self.state is not None:
+            self.state.release(living_being.slot)
+
+    def perceive(self) -> "None":
+        """Computes the perception of all living beings in a single batched pass, handing
+        each brain its own slice."""
+        perceptions = self.distance_controller.get_population_distances(
+            [living_being.hitbox for living_being in self.living],
+            self.state.boxes[[living_being.slot for living_being in self.living]]
+                if self.state is not None else None
+        )
+        for living_being, perception in zip(self.living, perceptions):
+            living_being.brain.perceive(perception)
+        if self.timer is not None:
+            self.timer.lap(Phase.PERCEPTION)
+
+    def decay(self, elapsed_time: "float") -> "None":
+        """Decays the needs of all living beings in a single batched pass, handing each
+        brain its outcome. Only available when the world's state is array-backed.
+        
+        Positional arguments:  
+         - `elapsed_time`: the amount of time elapsed since the last model update, in seconds."""
+        if self.state is not None and len(self.living) > 0:
+            self.decayed(decay_population(self.state, self.get_slots(), elapsed_time))
+        if self.timer is not None:
+            self.timer.lap(Phase.DECAY)
+
+    def infer(self, elapsed_time: "float") -> "None":
+        """Computes the Q-values of all learning living beings in a single batched pass
+        per lobe, handing each brain its own. Only available when the world's state is
+        array-backed.
+        
+        Positional arguments:  
+         - `elapsed_time`: the amount of time elapsed since the last model update, in seconds."""
+        if self.inference is not None:
+            self.inference.infer(self.state, self.living, elapsed_time)
+        if self.timer is not None:
+            self.timer.lap(Phase.INFERENCE)
+
+    def train(self) -> "None":
+        """Runs the training steps scheduled by all learning living beings during the
+        last update, as a single batched computation per lobe. Only available when the
+        world's state is array-backed."""
+        if self.inference is not None:
+            self.inference.train()
+        if self.timer is not None:
+            self.timer.lap(Phase.TRAINING)
+
+    def get_slots(self) -> "NDArray[int64]":
+        """Returns the state store slots of all living beings, in iteration order.
+        
+        Return:  
+        An array containing each living being's slot."""
+        return array([living_being.slot for living_being in self.living], dtype=int64)
+
+    def decayed(self, alive: "NDArray[bool_]") -> "None":
+        """Hands each living being's brain the outcome of a batched needs decay pass.
+        
+        Positional arguments:  
+         - `alive`: a boolean array telling, for each living being in iteration order, \
+        if it survived the decay step."""
+        for living_being, is_alive in zip(self.living, alive.tolist()):
+            living_being.brain.decayed(is_alive)
 
     def deselect(self) -> "None":
         """Deselects the selected creature."""
@@ -109,7 +307,27 @@ class World:
             if living_being.selected:
                 living_being.brain.apply_user_reward(reward)
 
+    def get_summary(self) -> "Dict[str, Union[int, float]]":
+        """Summarizes the world's current state, to be included in the run report.
+        
+        Return:  
+        A `Dict` associating to each summary field its value."""
+        fitness = [
+            compute_fitness(living_being.brain.needs_tracker.needs_avg)
+            for living_being in self.living
+        ]
+        return {
+            "world_id": self.world_id,
+            "population": len(self.living),
+            "deaths": self.deaths,
+            "mean_fitness": sum(fitness) / len(fitness) if len(fitness) > 0 else 0.0
+        }
+
     def dump_current_state(self) -> "None":
         """Dumps the current state of the world."""
         for living_being in self.living:
             log_living_being_stats(self.world_id, living_being)
+        finish_performance_log(self.world_id)
+        if self.timer is not None:
+            log_phases(self.world_id, self.timer)
+        flush_logs()
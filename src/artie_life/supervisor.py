@@ -0,0 +1,140 @@
+"""Module containing the supervisor of the world engines' processes."""
+from typing import TYPE_CHECKING
+from multiprocessing import Event, Queue
+from queue import Empty
+from signal import signal, getsignal, SIGINT, SIGTERM
+from time import sleep, perf_counter
+from utils.logs import log_run_report
+
+if TYPE_CHECKING:
+    from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+    from world_engine import WorldEngine
+
+SUPERVISOR_POLL_PERIOD: "float" = 0.2
+SHUTDOWN_GRACE_PERIOD: "float" = 30.0
+
+class WorldSupervisor:
+    """Implementation of the supervisor running world engines on a bounded pool of
+    processes.
+
+    It relays stop signals to all engines, so that every world dumps its state before
+    exiting, restarts failed engines up to a given number of times, and gathers the
+    final summary of every world into a single run report."""
+    def __init__(self, engine_factory: "Callable[[List[int]], WorldEngine]",
+                 world_groups: "List[List[int]]", max_workers: "int",
+                 max_restarts: "int" = 0) -> "None":
+        """Instantiates the supervisor.
+
+        Positional arguments:  
+         - `engine_factory`: a function creating the engine hosting a given group of \
+        worlds, given their in-game IDs.
+         - `world_groups`: the in-game IDs of the worlds hosted by each engine.
+         - `max_workers`: the maximum number of engines running at the same time.
+         - `max_restarts`: the maximum number of times a failed engine is restarted, \
+        before its worlds are reported as failed."""
+        self.engine_factory = engine_factory
+        self.pending: "List[List[int]]" = list(world_groups)
+        self.max_workers: "int" = max(max_workers, 1)
+        self.max_restarts: "int" = max_restarts
+        self.restarts: "Dict[int, int]" = {
+            world_id: 0 for group in world_groups for world_id in group
+        }
+        self.running: "List[Tuple[WorldEngine, List[int]]]" = []
+        self.summaries: "Dict[int, Dict[str, Union[int, float, str]]]" = { }
+        self.stop_event = Event()
+        self.results: "Queue" = Queue()
+        self.stop_time: "Optional[float]" = None
+
+    def request_stop(self, _signum: "int", _frame: "Any") -> "None":
+        """Requests all engines to stop gracefully, and prevents pending ones from
+        starting. Installed as the supervisor's signal handler."""
+        if self.stop_time is None:
+            self.stop_time = perf_counter()
+            self.stop_event.set()
+
+    def launch(self, world_ids: "List[int]") -> "None":
+        """Starts the engine hosting a given group of worlds.
+
+        Positional arguments:  
+         - `world_ids`: the in-game IDs of the hosted worlds."""
+        engine = self.engine_factory(world_ids)
+        engine.supervise(self.stop_event, self.results)
+        engine.start()
+        self.running.append((engine, world_ids))
+
+    def collect(self) -> "None":
+        """Gathers all summaries sent by the engines so far."""
+        while True:
+            try:
+                summary = self.results.get_nowait()
+            except Empty:
+                return
+            self.summaries[int(summary["world_id"])] = summary
+
+    def check(self) -> "None":
+        """Reaps all exited engines, restarting or reporting the failed ones."""
+        for engine, world_ids in list(self.running):
+            if not engine.is_alive():
+                engine.join()
+                self.collect()
+                self.running.remove((engine, world_ids))
+                if engine.exitcode != 0:
+                    self.handle_failure(world_ids, engine.exitcode)
+
+    def handle_failure(self, world_ids: "List[int]", exit_code: "Optional[int]") -> "None":
+        """Handles an engine which exited with an error, restarting it if allowed.
+
+        Positional arguments:  
+         - `world_ids`: the in-game IDs of the worlds hosted by the failed engine.
+         - `exit_code`: the failed engine's process exit code."""
+        if self.stop_time is None and self.restarts[world_ids[0]] < self.max_restarts:
+            for world_id in world_ids:
+                self.restarts[world_id] += 1
+            self.pending.append(world_ids)
+            return
+        for world_id in world_ids:
+            summary = self.summaries.get(world_id, {"world_id": world_id})
+            summary["status"] = "failed"
+            summary["exit_code"] = "" if exit_code is None else exit_code
+            self.summaries[world_id] = summary
+
+    def enforce_grace_period(self) -> "None":
+        """Kills all engines still running after the shutdown grace period expired."""
+        if self.stop_time is not None \
+                and perf_counter() - self.stop_time > SHUTDOWN_GRACE_PERIOD:
+            for engine, _ in self.running:
+                if engine.is_alive():
+                    engine.kill()
+
+    def run(self) -> "List[Dict[str, Union[int, float, str]]]":
+        """Runs all engines to completion, then logs the run report.
+
+        Return:  
+        A `List` containing the final summary of each world, sorted by in-game ID."""
+        previous_handlers = (getsignal(SIGINT), getsignal(SIGTERM))
+        signal(SIGINT, self.request_stop)
+        signal(SIGTERM, self.request_stop)
+        try:
+            while len(self.running) > 0 or (len(self.pending) > 0 and self.stop_time is None):
+                while len(self.pending) > 0 and len(self.running) < self.max_workers \
+                        and self.stop_time is None:
+                    self.launch(self.pending.pop(0))
+                self.collect()
+                self.check()
+                self.enforce_grace_period()
+                sleep(SUPERVISOR_POLL_PERIOD)
+        finally:
+            signal(SIGINT, previous_handlers[0])
+            signal(SIGTERM, previous_handlers[1])
+        self.collect()
+        report: "List[Dict[str, Union[int, float, str]]]" = [
+            {
+                "world_id": world_id,
+                "status": "skipped",
+                "exit_code": 0,
+                **self.summaries.get(world_id, { }),
+                "restarts": restarts
+            } for world_id, restarts in sorted(self.restarts.items())
+        ]
+        log_run_report(report)
+        return report
@@ -0,0 +1 @@
+"""Package containing the tests checking the batched code paths against their references."""
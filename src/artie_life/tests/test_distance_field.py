@@ -0,0 +1,67 @@
+"""Module checking the precomputed distance field against a brute-force scan of the spots."""
+from typing import TYPE_CHECKING
+from numpy import array, int32, array_equal
+from pygame.math import Vector2
+from pygame.rect import Rect
+from controller.world.distance_field import StaticDistanceField
+from utils.map.constants import MAP_WIDTH, MAP_HEIGHT, LIVING_WIDTH, LIVING_HEIGHT
+from utils.map.generation import init_interactive_spots
+
+if TYPE_CHECKING:
+    from typing import List, Tuple
+    from model.entities.non_living import InteractiveSpot
+
+def scan_closest(hitbox: "Rect", spots: "List[InteractiveSpot]") -> "Tuple[float, float]":
+    """Computes the offset from the closest spot as a live query does, one spot at a time.
+    
+    Positional arguments:  
+     - `hitbox`: the living being's hitbox.
+     - `spots`: the spots of a single `EntityType`.
+    
+    Return:  
+    A `Tuple` indicating the two dimensions' distance from the closest spot."""
+    min_dist = Vector2(MAP_WIDTH, MAP_HEIGHT).length()
+    min_x: "float" = MAP_WIDTH
+    min_y: "float" = MAP_HEIGHT
+    for spot in spots:
+        if spot.hitbox.colliderect(hitbox):
+            return (0, 0)
+        dist = Vector2(spot.hitbox.center).distance_to(hitbox.center)
+        if dist < min_dist:
+            min_x = spot.hitbox.centerx - hitbox.centerx
+            min_y = spot.hitbox.centery - hitbox.centery
+            min_dist = dist
+    return (min_x, min_y)
+
+def test_lookup_all_matches_scan() -> "None":
+    """Every admissible position is looked up at once and compared with a scan."""
+    spots = init_interactive_spots()
+    field = StaticDistanceField(spots)
+    boxes = array([
+        (left, top, LIVING_WIDTH, LIVING_HEIGHT)
+        for top in range(field.rows) for left in range(field.columns)
+    ], dtype=int32)
+    offsets, covered = field.lookup_all(boxes)
+    assert covered.all()
+    expected = array([
+        [scan_closest(Rect(*box), spots[entity_type]) for box in boxes.tolist()]
+        for entity_type in field.types
+    ])
+    assert array_equal(offsets, expected)
+
+def test_lookup_all_flags_uncovered() -> "None":
+    """Hitboxes out of the map or of a different size are not covered by the field."""
+    field = StaticDistanceField(init_interactive_spots())
+    boxes = array([
+        (0, 0, LIVING_WIDTH, LIVING_HEIGHT),
+        (-1, 0, LIVING_WIDTH, LIVING_HEIGHT),
+        (0, -1, LIVING_WIDTH, LIVING_HEIGHT),
+        (field.columns, 0, LIVING_WIDTH, LIVING_HEIGHT),
+        (0, field.rows, LIVING_WIDTH, LIVING_HEIGHT),
+        (field.columns - 1, field.rows - 1, LIVING_WIDTH, LIVING_HEIGHT),
+        (0, 0, LIVING_WIDTH + 1, LIVING_HEIGHT),
+        (0, 0, LIVING_WIDTH, LIVING_HEIGHT - 1)
+    ], dtype=int32)
+    assert field.lookup_all(boxes)[1].tolist() == [
+        True, False, False, False, False, True, False, False
+    ]
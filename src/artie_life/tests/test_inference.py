@@ -0,0 +1,51 @@
+"""Module checking the stacked networks against the Keras models they replace."""
+from typing import TYPE_CHECKING
+from numpy import array, float32, int64
+from numpy.random import default_rng
+from numpy.testing import assert_allclose
+from pytest import importorskip
+from model.entities.living.brain.inference import StackedNetwork
+from utils.living.learning import attention, reason
+
+if TYPE_CHECKING:
+    from typing import Callable, List, Optional
+    from keras import Sequential
+
+SLOTS: "int" = 4
+ROWS: "int" = 64
+
+def check_forward(layer_dims: "List[int]",
+                  create_model: "Callable[[Optional[int]], Sequential]") -> "None":
+    """Loads a different Keras model in each slot of a stack and compares their outputs.
+    Outputs may only differ by float32 rounding, since Keras may sum the products of each
+    matrix product in another order.
+    
+    Positional arguments:  
+     - `layer_dims`: the size of each layer, input and output included.
+     - `create_model`: the function building one of the lobe's Keras models."""
+    importorskip("keras")
+    network = StackedNetwork(layer_dims, SLOTS)
+    models = [create_model(seed) for seed in range(SLOTS)]
+    for slot, model in enumerate(models):
+        network.load(slot, model.get_weights())
+    generator = default_rng(0)
+    slots = generator.choice(SLOTS, ROWS).astype(int64)
+    inputs = generator.normal(scale=50.0, size=(ROWS, layer_dims[0])).astype(float32)
+    expected = array([
+        models[slot](inputs[None, row]).numpy()[0] for row, slot in enumerate(slots)
+    ])
+    assert_allclose(network.forward(slots, inputs), expected, rtol=1e-5, atol=1e-4)
+
+def test_attention_forward_matches_keras() -> "None":
+    """Stacked Attention networks reproduce their Keras models' outputs."""
+    check_forward(
+        [attention.INPUT_LAYER_DIM] + attention.HIDDEN_LAYER_DIMS + [attention.OUTPUT_LAYER_DIM],
+        attention.create_attention_model
+    )
+
+def test_reason_forward_matches_keras() -> "None":
+    """Stacked Reason networks reproduce their Keras models' outputs."""
+    check_forward(
+        [reason.INPUT_LAYER_DIM] + reason.HIDDEN_LAYER_DIMS + [reason.OUTPUT_LAYER_DIM],
+        reason.create_reason_model
+    )
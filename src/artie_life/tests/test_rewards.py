@@ -0,0 +1,100 @@
+"""Module checking the batched reward computations against row-by-row references."""
+from typing import TYPE_CHECKING
+from numpy import array, array_equal
+from numpy.linalg import norm
+from numpy.random import default_rng
+from utils.living.actions import Action, EntityType, PERCEIVED_COLUMNS
+from utils.living.learning.commons import POSITIVE_MOVEMENT_REWARD, NEGATIVE_MOVEMENT_REWARD, \
+    PRIMARY_REWARD_MULTIPLIER, SECONDARY_REWARD_MULTIPLIER, POSITIVE_NEEDS_REWARD
+from utils.living.learning import attention, reason
+
+if TYPE_CHECKING:
+    from typing import List
+    from numpy import floating
+    from numpy.typing import NDArray
+
+POPULATION: "int" = 500
+
+def draw_perceptions(seed: "int") -> "NDArray[floating]":
+    """Draws small integer perceptions, so that ties and collisions are frequent.
+    
+    Positional arguments:  
+     - `seed`: the seed of the random generator.
+    
+    Return:  
+    An array of shape `(POPULATION, len(PERCEIVED_COLUMNS), 2)`."""
+    return default_rng(seed).integers(-2, 3, (POPULATION, len(PERCEIVED_COLUMNS), 2)) \
+        .astype(float)
+
+def attention_reference(user_reward: "float", needs_reward: "float",
+                        last_perception: "NDArray[floating]",
+                        cur_perception: "NDArray[floating]") -> "List[float]":
+    """Computes the Attention rewards of a single living being, one focus at a time."""
+    rewards: "List[float]" = []
+    for entity_type in attention.FOCUS_TYPES:
+        column = PERCEIVED_COLUMNS[entity_type]
+        single_reward: "float" = 0.0
+        if norm(last_perception[column]) < norm(cur_perception[column]):
+            single_reward += NEGATIVE_MOVEMENT_REWARD * SECONDARY_REWARD_MULTIPLIER
+        else:
+            single_reward += POSITIVE_MOVEMENT_REWARD * SECONDARY_REWARD_MULTIPLIER
+        single_reward += needs_reward * SECONDARY_REWARD_MULTIPLIER
+        single_reward += user_reward * PRIMARY_REWARD_MULTIPLIER
+        rewards.append(single_reward)
+    return rewards
+
+def reason_reference(user_reward: "float", needs_reward: "float",
+                     last_perception: "NDArray[floating]",
+                     last_focus: "EntityType") -> "List[float]":
+    """Computes the Reason rewards of a single living being, one action at a time."""
+    focused = last_perception[PERCEIVED_COLUMNS[last_focus]]
+    return [
+        SECONDARY_REWARD_MULTIPLIER * user_reward
+        + PRIMARY_REWARD_MULTIPLIER * (
+            POSITIVE_NEEDS_REWARD
+            if norm(focused) == 0 and action == Action.INTERACT
+            else needs_reward
+        ) + PRIMARY_REWARD_MULTIPLIER * (
+            POSITIVE_MOVEMENT_REWARD
+            if focused[0] * action.get_direction()[0] > 0
+            else (0 if action == Action.INTERACT else NEGATIVE_MOVEMENT_REWARD)
+        ) for action in Action
+    ]
+
+def test_attention_rewards_match_reference() -> "None":
+    """Batched Attention rewards equal the per-row ones on random perceptions."""
+    generator = default_rng(1)
+    user_rewards = generator.choice([-1.0, 0.0, 1.0], POPULATION)
+    needs_rewards = generator.normal(size=POPULATION)
+    last_perceptions = draw_perceptions(2)
+    cur_perceptions = draw_perceptions(3)
+    expected = array([
+        attention_reference(*row)
+        for row in zip(user_rewards, needs_rewards, last_perceptions, cur_perceptions)
+    ])
+    assert array_equal(
+        attention.compute_rewards(user_rewards, needs_rewards, last_perceptions, cur_perceptions),
+        expected
+    )
+
+def test_reason_rewards_match_reference() -> "None":
+    """Batched Reason rewards equal the per-row ones on random perceptions and foci."""
+    generator = default_rng(4)
+    user_rewards = generator.choice([-1.0, 0.0, 1.0], POPULATION)
+    needs_rewards = generator.normal(size=POPULATION)
+    last_perceptions = draw_perceptions(5)
+    last_foci = generator.choice(len(attention.FOCUS_TYPES), POPULATION)
+    expected = array([
+        reason_reference(user_reward, needs_reward, perception, attention.FOCUS_TYPES[focus])
+        for user_reward, needs_reward, perception, focus
+        in zip(user_rewards, needs_rewards, last_perceptions, last_foci)
+    ])
+    assert array_equal(
+        reason.compute_rewards(
+            user_rewards,
+            needs_rewards,
+            last_perceptions,
+            array([attention.FOCUS_COLUMNS[focus] for focus in last_foci])
+        ),
+        expected
+    )
@@ -4,7 +4,7 @@ from enum import Enum
 from utils.living.needs import Need
 
 if TYPE_CHECKING:
-    from typing import Tuple
+    from typing import Dict, List, Tuple
 
 class Action(Enum):
     """Enumerative class listing all possible actions."""
@@ -70,3 +70,11 @@ class EntityType(Enum):
             if self.value == interaction_type.value:
                 return interaction_type
         return InteractionType.NONE
+
+
+PERCEIVED_TYPES: "List[EntityType]" = [
+    entity_type for entity_type in EntityType if entity_type != EntityType.PLAYGROUND
+]
+PERCEIVED_COLUMNS: "Dict[EntityType, int]" = {
+    entity_type: idx for idx, entity_type in enumerate(PERCEIVED_TYPES)
+}
@@ -1,76 +1,137 @@
 """Module containing attention lobe utilities."""
 from typing import TYPE_CHECKING
-from keras import Sequential
-from keras import layers
-from numpy import array, append
+from numpy import array, zeros, hypot, where, float32
 from numpy.linalg import norm
 from utils.living.learning.commons import POSITIVE_MOVEMENT_REWARD, NEGATIVE_MOVEMENT_REWARD, \
-    PRIMARY_REWARD_MULTIPLIER, SECONDARY_REWARD_MULTIPLIER, BATCH_SIZE
-from utils.living.actions import EntityType
+    PRIMARY_REWARD_MULTIPLIER, SECONDARY_REWARD_MULTIPLIER, BATCH_SIZE, create_dense_model
+from utils.living.actions import EntityType, PERCEIVED_COLUMNS
 from utils.living.needs import Need
 
 if TYPE_CHECKING:
-    from typing import Dict, Tuple, List, Any
+    from typing import List, Any, Optional
     from numpy.typing import NDArray
+    from keras import Sequential
     from numpy import floating
 
 MAX_INPUT_LENGTH: "int" = 8
 INPUT_LAYER_DIM: "int" = MAX_INPUT_LENGTH + len(EntityType) - 2 + len(Need) - 1
 OUTPUT_LAYER_DIM: "int" = len(EntityType) - 2
+HIDDEN_LAYER_DIMS: "List[int]" = [16, 8, 4]
+FOCUS_TYPES: "List[EntityType]" = [
+    entity_type for entity_type in EntityType
+    if entity_type not in [EntityType.PLAYGROUND, EntityType.LIVING]
+]
+FOCUS_COLUMNS: "List[int]" = [PERCEIVED_COLUMNS[entity_type] for entity_type in FOCUS_TYPES]
+
+def compute_rewards(user_rewards: "NDArray[floating]", needs_rewards: "NDArray[floating]",
+                    last_perceptions: "NDArray[floating]",
+                    cur_perceptions: "NDArray[floating]") -> "NDArray[floating]":
+    """Computes the actual reward values for each possible focus choice of a whole
+    population at once.
+    
+    Positional arguments:  
+     - `user_rewards`: the user-defined reward of each living being.  
+     - `needs_rewards`: the self-determined reward of each living being, derived from its \
+    vital needs.  
+     - `last_perceptions`: the last frame's bidimensional distance of each living being \
+    from the closest instance of each perceived `EntityType`, with shape \
+    `(N, len(PERCEIVED_TYPES), 2)`.  
+     - `cur_perceptions`: the current perception of each living being, represented in the \
+    same way as `last_perceptions`.
+    
+    Return:  
+    A `NDArray` of shape `(N, OUTPUT_LAYER_DIM)` containing the reward values for each \
+    `EntityType` on which each living being may direct its focus."""
+    return where(
+        norm(last_perceptions[:, FOCUS_COLUMNS], axis=2)
+            < norm(cur_perceptions[:, FOCUS_COLUMNS], axis=2),
+        NEGATIVE_MOVEMENT_REWARD * SECONDARY_REWARD_MULTIPLIER,
+        POSITIVE_MOVEMENT_REWARD * SECONDARY_REWARD_MULTIPLIER
+    ) + (needs_rewards * SECONDARY_REWARD_MULTIPLIER)[:, None] \
+        + (user_rewards * PRIMARY_REWARD_MULTIPLIER)[:, None]
 
 def compute_reward(user_reward: "float", needs_reward: "float",
-                   last_perception: "Dict[EntityType, Tuple[float, float]]",
-                   cur_perception: "Dict[EntityType, Tuple[float, float]]") -> "NDArray[floating]":
+                   last_perception: "NDArray[floating]",
+                   cur_perception: "NDArray[floating]") -> "NDArray[floating]":
     """Computes the actual reward values for each possible focus choice.
     
     Positional arguments:  
      - `user_reward`: the user-defined reward.  
      - `needs_reward`: a self-determined reward derived from the living being's vital needs.  
-     - `last_perception`: a `Dict` associating to each `EntityType` a `Tuple` representing \
-    the bidimensional distance between the living being and the closest instance of \
-    said `EntityType`.  
+     - `last_perception`: the last frame's bidimensional distance between the living being \
+    and the closest instance of each perceived `EntityType`.  
      - `cur_perception`: the current living being's perception value, represented in the same \
     way as `last_perception`.
     
     Return:  
     A `NDArray` of `floating` values representing the reward values for each possible \
     `EntityType` on wich the living being directs its focus."""
-    rewards: "List[float]" = []
-    for entity_type, last_distance in last_perception.items():
-        if entity_type not in [EntityType.PLAYGROUND, EntityType.LIVING]:
-            single_reward: "float" = 0.0
-            if norm(last_distance) < norm(cur_perception[entity_type]):
-                single_reward += NEGATIVE_MOVEMENT_REWARD * SECONDARY_REWARD_MULTIPLIER
-            else:
-                single_reward += POSITIVE_MOVEMENT_REWARD * SECONDARY_REWARD_MULTIPLIER
-            single_reward += needs_reward * SECONDARY_REWARD_MULTIPLIER
-            single_reward += user_reward * PRIMARY_REWARD_MULTIPLIER
-            rewards.append(single_reward)
-    return array(rewards)
+    return compute_rewards(
+        array([user_reward]),
+        array([needs_reward]),
+        last_perception[None],
+        cur_perception[None]
+    )[0]
+
+def encode_input(input_text: "str") -> "NDArray[float32]":
+    """Encodes a user-defined text input as the leading part of a state vector.
+    
+    Positional arguments:  
+     - `input_text`: the user-defined text input, at most `MAX_INPUT_LENGTH` characters long.
+    
+    Return:  
+    A `NDArray` containing the input's ASCII codes, padded with zeros."""
+    encoded: "NDArray[float32]" = zeros(MAX_INPUT_LENGTH, dtype=float32)
+    codes = list(input_text.encode("ASCII"))
+    encoded[:len(codes)] = codes
+    return encoded
 
-def assemble_state(input_text: "str", perception: "Dict[EntityType, Tuple[float, float]]",
-                   needs: "Dict[Need, float]") -> "NDArray[floating]":
-    """Assemble a single state vector, used for model prediction.
+def assemble_states(out: "NDArray[float32]", encoded_inputs: "NDArray[floating]",
+                    perceptions: "NDArray[floating]",
+                    needs: "NDArray[floating]") -> "NDArray[float32]":
+    """Assembles the state vectors of a whole population in place, used for model prediction.
     
     Positional arguments:  
-     - `input_text`: the user-defined text input.  
-     - `perception`: the current living being perception of the game world.  
-     - `needs`: the current values of the living being's vital parameters."""
-    state: "NDArray[floating]" = array(list(input_text.encode("ASCII")))
-    if len(state) < MAX_INPUT_LENGTH:
-        state = append(state, [0.0 for _ in range(MAX_INPUT_LENGTH - len(state))])
-    for entity_type, distance in perception.items():
-        if entity_type not in [EntityType.PLAYGROUND, EntityType.LIVING]:
-            state = append(state, norm(distance))
-    state = append(state, [value for _, value in needs.items()])
-    return state
+     - `out`: the buffer of shape `(N, INPUT_LAYER_DIM)` receiving one state per row.  
+     - `encoded_inputs`: the encoded user-defined text inputs, as returned by \
+    `encode_input`, one per row.  
+     - `perceptions`: the bidimensional distances of each perceived `EntityType`, with \
+    shape `(N, len(PERCEIVED_TYPES), 2)`.  
+     - `needs`: the current values of each tracked `Need`, one living being per row.
+    
+    Return:  
+    The `out` buffer."""
+    focus_end = MAX_INPUT_LENGTH + len(FOCUS_TYPES)
+    out[:, :MAX_INPUT_LENGTH] = encoded_inputs
+    hypot(
+        perceptions[:, FOCUS_COLUMNS, 0],
+        perceptions[:, FOCUS_COLUMNS, 1],
+        out=out[:, MAX_INPUT_LENGTH:focus_end]
+    )
+    out[:, focus_end:] = needs
+    return out
+
+def assemble_state(out: "NDArray[float32]", encoded_input: "NDArray[floating]",
+                   perception: "NDArray[floating]", needs: "NDArray[floating]") \
+        -> "NDArray[float32]":
+    """Assembles a single state vector in place, used for model prediction.
+    
+    Positional arguments:  
+     - `out`: the buffer of length `INPUT_LAYER_DIM` receiving the state.  
+     - `encoded_input`: the encoded user-defined text input, as returned by `encode_input`.  
+     - `perception`: the bidimensional distance of each perceived `EntityType`.  
+     - `needs`: the current values of the living being's vital parameters.
+    
+    Return:  
+    The `out` buffer."""
+    assemble_states(out[None], encoded_input[None], perception[None], needs[None])
+    return out
+
+def create_attention_model(seed: "Optional[int]" = None) -> "Sequential":
+    """Instantiates the model underlying the Attention lobe. Keras is only imported by the
+    first call, so that non-learning runs never load it.
 
-def create_attention_model() -> "Sequential":
-    """Instantiates the model underlying the Attention lobe."""
-    return Sequential([
-        layers.Input(shape=(INPUT_LAYER_DIM,)),
-        layers.Dense(16, activation="relu"),
-        layers.Dense(8, activation="relu"),
-        layers.Dense(4, activation="relu"),
-        layers.Dense(OUTPUT_LAYER_DIM)
-    ])
+    Keyword arguments:  
+     - `seed`: the seed of the kernels' initializers. If omitted, seeds are drawn from \
+    Python's global random generator."""
+    return create_dense_model(INPUT_LAYER_DIM, HIDDEN_LAYER_DIMS, OUTPUT_LAYER_DIM, seed)
@@ -1,10 +1,22 @@
 """Module containing common utilities for the learning process."""
+from typing import TYPE_CHECKING
+from numpy import sqrt, zeros, float32
+
+if TYPE_CHECKING:
+    from typing import List, Optional, Sequence, Tuple
+    from numpy.random import Generator
+    from numpy.typing import NDArray
+    from keras import Sequential
 
 BATCH_SIZE: "int" = 32
 REPLAY_BUFFER_SIZE: "int" = 1000
 PRIMARY_REWARD_MULTIPLIER: "float" = 1.2
 SECONDARY_REWARD_MULTIPLIER: "float" = 0.75
 
+ADAM_BETA_1: "float" = 0.9
+ADAM_BETA_2: "float" = 0.999
+ADAM_EPSILON: "float" = 1e-7
+
 USER_INTERACTION_PERIOD: "float" = 2.0
 
 POSITIVE_USER_REWARD: "float" = 1.0
@@ -13,3 +25,60 @@ POSITIVE_MOVEMENT_REWARD: "float" = 1.5
 NEGATIVE_MOVEMENT_REWARD: "float" = -0.5
 POSITIVE_NEEDS_REWARD: "float" = 1.5
 NEGATIVE_NEEDS_REWARD: "float" = -0.5
+
+def draw_dense_weights(kernel_shapes: "Sequence[Tuple[int, int]]", generator: "Generator") \
+        -> "List[NDArray[float32]]":
+    """Draws the initial weights of a dense model, as a freshly built model's: kernels are
+    drawn from a Glorot uniform distribution and biases are zeroed. Shared by both
+    inference backends, so that their models start from the very same weights.
+    
+    Positional arguments:  
+     - `kernel_shapes`: the shape of each layer's kernel, as inputs by outputs.
+     - `generator`: the random generator drawing the kernels.
+    
+    Return:  
+    A `List` containing the model's weights, alternating kernels and biases."""
+    weights: "List[NDArray[float32]]" = []
+    for inputs, outputs in kernel_shapes:
+        limit = sqrt(6 / (inputs + outputs))
+        weights.append(generator.uniform(-limit, limit, (inputs, outputs)).astype(float32))
+        weights.append(zeros(outputs, dtype=float32))
+    return weights
+
+def create_dense_model(input_dim: "int", hidden_dims: "List[int]", output_dim: "int",
+                       seed: "Optional[int]" = None) -> "Sequential":
+    """Instantiates a dense model with ReLU hidden layers and a linear output layer, as
+    underlying the learning lobes. Keras is only imported by the first call, so that runs
+    not building any model never load it.
+    
+    Positional arguments:  
+     - `input_dim`: the size of the input layer.
+     - `hidden_dims`: the size of each hidden layer.
+     - `output_dim`: the size of the output layer.
+    
+    Keyword arguments:  
+     - `seed`: the seed of the kernels' initializers, offset by each layer's index. If \
+    omitted, seeds are drawn from Python's global random generator.
+    
+    Return:  
+    The model, with freshly initialized weights."""
+    # pylint: disable=import-outside-toplevel
+    from keras import Sequential, layers, initializers
+    return Sequential([
+        layers.Input(shape=(input_dim,)),
+        *[
+            layers.Dense(
+                units,
+                activation="relu",
+                kernel_initializer=initializers.GlorotUniform(
+                    seed + layer if seed is not None else None
+                )
+            ) for layer, units in enumerate(hidden_dims)
+        ],
+        layers.Dense(
+            output_dim,
+            kernel_initializer=initializers.GlorotUniform(
+                seed + len(hidden_dims) if seed is not None else None
+            )
+        )
+    ])
@@ -1,23 +1,62 @@
 """Module containing utilities for the Reason lobe."""
 from typing import TYPE_CHECKING
-from numpy import array
+from numpy import array, arange, eye, where, float32
 from numpy.linalg import norm
-from keras import Sequential
-from keras import layers
-from utils.living.actions import Action, EntityType
+from utils.living.actions import Action, EntityType, PERCEIVED_COLUMNS
 from utils.living.learning.commons import POSITIVE_MOVEMENT_REWARD, NEGATIVE_MOVEMENT_REWARD, \
-    PRIMARY_REWARD_MULTIPLIER, SECONDARY_REWARD_MULTIPLIER, POSITIVE_NEEDS_REWARD
+    PRIMARY_REWARD_MULTIPLIER, SECONDARY_REWARD_MULTIPLIER, POSITIVE_NEEDS_REWARD, \
+    create_dense_model
+from utils.living.learning.attention import FOCUS_TYPES, FOCUS_COLUMNS
 
 if TYPE_CHECKING:
-    from typing import Dict, Tuple, List
-    from numpy import floating
+    from typing import List, Optional
+    from numpy import floating, bool_, int64
     from numpy.typing import NDArray
+    from keras import Sequential
 
 INPUT_LAYER_DIM: "int" = len(EntityType) - 2 + ((len(EntityType) - 2) * 2)
 OUTPUT_LAYER_DIM: "int" = len(Action)
+HIDDEN_LAYER_DIMS: "List[int]" = [8]
+FOCUS_ENCODINGS: "NDArray[float32]" = eye(len(FOCUS_TYPES), dtype=float32)
+ACTION_DIRECTIONS: "NDArray[floating]" = array([action.get_direction() for action in Action])
+INTERACT_MASK: "NDArray[bool_]" = array([action == Action.INTERACT for action in Action])
+
+def compute_rewards(user_rewards: "NDArray[floating]", needs_rewards: "NDArray[floating]",
+                    last_perceptions: "NDArray[floating]",
+                    last_focus_columns: "NDArray[int64]") -> "NDArray[floating]":
+    """Computes the reward values for each decision step of the Reason lobe of a whole
+    population at once.
+    
+    Positional arguments:  
+     - `user_rewards`: the user-defined reward of each living being.  
+     - `needs_rewards`: the self-derived reward of each living being, depending on its \
+    vital parameters.  
+     - `last_perceptions`: the last frame's bidimensional distance of each living being \
+    from the closest instance of each perceived `EntityType`, with shape \
+    `(N, len(PERCEIVED_TYPES), 2)`.  
+     - `last_focus_columns`: the column of each living being's last focus object in \
+    `last_perceptions`.
+    
+    Return:  
+    A `NDArray` of shape `(N, OUTPUT_LAYER_DIM)` containing the reward values for each \
+    possible action of each living being's Reason lobe."""
+    focused = last_perceptions[arange(len(last_perceptions)), last_focus_columns]
+    needs_terms = where(
+        (norm(focused, axis=1) == 0)[:, None] & INTERACT_MASK,
+        POSITIVE_NEEDS_REWARD,
+        needs_rewards[:, None]
+    )
+    movement_terms = where(
+        focused[:, None, 0] * ACTION_DIRECTIONS[:, 0] > 0,
+        POSITIVE_MOVEMENT_REWARD,
+        where(INTERACT_MASK, 0, NEGATIVE_MOVEMENT_REWARD)
+    )
+    return (SECONDARY_REWARD_MULTIPLIER * user_rewards)[:, None] \
+        + PRIMARY_REWARD_MULTIPLIER * needs_terms \
+        + PRIMARY_REWARD_MULTIPLIER * movement_terms
 
 def compute_reward(user_reward: "float", needs_reward: "float",
-                   last_perception: "Dict[EntityType, Tuple[float, float]]",
+                   last_perception: "NDArray[floating]",
                    last_focus: "EntityType") -> "NDArray[floating]":
     """Computes the reward values for each decision step of the Reason lobe.
     
@@ -26,52 +65,55 @@ def compute_reward(user_reward: "float", needs_reward: "float",
      - `needs_reward`: the self-derived reward depending on the living being's vital \
     parameters.  
      - `last_perception`: the last frame's bidimensional distance from the closest \
-        instance of each type of entity, grouped by `EntityType`.  
+        instance of each perceived `EntityType`.  
      - `last_focus`: the last focus object of the living being.
     
     Return:  
     A `NDArray` of `floating` values representing the reward values for each possible action \
     of the Reason lobe."""
-    reward: "List[float]" = []
-    for action in Action:
-        single_reward = SECONDARY_REWARD_MULTIPLIER * user_reward \
-            + PRIMARY_REWARD_MULTIPLIER * (
-                POSITIVE_NEEDS_REWARD
-                if norm(last_perception[last_focus]) == 0 and action == Action.INTERACT
-                else needs_reward
-        ) + PRIMARY_REWARD_MULTIPLIER * (
-                POSITIVE_MOVEMENT_REWARD
-                if last_perception[last_focus][0] * action.get_direction()[0] > 0
-                or last_perception[last_focus][0] * action.get_direction()[0] > 0
-                else (0 if action == Action.INTERACT else NEGATIVE_MOVEMENT_REWARD)
-        )
-        reward.append(single_reward)
-    return array(reward)
+    return compute_rewards(
+        array([user_reward]),
+        array([needs_reward]),
+        last_perception[None],
+        array([PERCEIVED_COLUMNS[last_focus]])
+    )[0]
 
-def assemble_state(focus: "EntityType",
-                   perception: "Dict[EntityType, Tuple[float, float]]") -> "NDArray":
-    """Assembles a state vector for the Reason lobe predictor.
+def assemble_states(out: "NDArray[float32]",
+                    perceptions: "NDArray[floating]") -> "NDArray[float32]":
+    """Assembles in place the state vectors of a whole population for every possible focus
+    choice, used for model prediction.
     
     Positional arguments:  
+     - `out`: the buffer of shape `(N, len(FOCUS_TYPES), INPUT_LAYER_DIM)` receiving, for \
+    each living being, one state per focus choice.  
+     - `perceptions`: the bidimensional distances of each perceived `EntityType`, with \
+    shape `(N, len(PERCEIVED_TYPES), 2)`.
+    
+    Return:  
+    The `out` buffer."""
+    out[:, :, :len(FOCUS_TYPES)] = FOCUS_ENCODINGS
+    out[:, :, len(FOCUS_TYPES):] = perceptions[:, FOCUS_COLUMNS].reshape(len(perceptions), 1, -1)
+    return out
+
+def assemble_state(out: "NDArray[float32]", focus: "EntityType",
+                   perception: "NDArray[floating]") -> "NDArray[float32]":
+    """Assembles a state vector in place for the Reason lobe predictor.
+    
+    Positional arguments:  
+     - `out`: the buffer of length `INPUT_LAYER_DIM` receiving the state.  
      - `focus`: the type of the entity on which the living being has posed its attention.  
-     - `perception`: the distance from the closest instance of each type of entity, \
-    grouped by `EntityType` and represented as a bidimensional `Tuple`.
+     - `perception`: the bidimensional distance of each perceived `EntityType`.
     
     Return:  
-    A `NDArray` of `floating` values suitable for the Reason lobe predictor."""
-    state: "List[float]" = []
-    for entity_type in EntityType:
-        if entity_type not in [EntityType.PLAYGROUND, EntityType.LIVING]:
-            state.append(1.0 if entity_type == focus else 0.0)
-    for entity_type, coordinates in perception.items():
-        if entity_type not in [EntityType.PLAYGROUND, EntityType.LIVING]:
-            state += [coordinates[0], coordinates[1]]
-    return array(state)
+    The `out` buffer."""
+    out[:len(FOCUS_TYPES)] = FOCUS_ENCODINGS[FOCUS_TYPES.index(focus)]
+    out[len(FOCUS_TYPES):] = perception[FOCUS_COLUMNS].reshape(-1)
+    return out
+
+def create_reason_model(seed: "Optional[int]" = None) -> "Sequential":
+    """Instantiates the model underlying the Reason lobe, importing Keras on first use.
 
-def create_reason_model() -> "Sequential":
-    """Instantiates the model underlying the Reason lobe."""
-    return Sequential([
-        layers.Input(shape=(INPUT_LAYER_DIM,)),
-        layers.Dense(8, activation="relu"),
-        layers.Dense(OUTPUT_LAYER_DIM)
-    ])
+    Keyword arguments:  
+     - `seed`: the seed of the kernels' initializers. If omitted, seeds are drawn from \
+    Python's global random generator."""
+    return create_dense_model(INPUT_LAYER_DIM, HIDDEN_LAYER_DIMS, OUTPUT_LAYER_DIM, seed)
@@ -0,0 +1,148 @@
+"""Module containing the replay memory of the learning lobes."""
+from typing import TYPE_CHECKING
+from atexit import register as register_exit
+from os import close, unlink
+from pathlib import Path
+from shutil import rmtree
+from tempfile import mkdtemp, mkstemp
+from numpy import zeros, memmap, float32
+from numpy.random import choice as np_choice
+from utils.living.learning.commons import REPLAY_BUFFER_SIZE
+
+if TYPE_CHECKING:
+    from typing import Optional, Tuple
+    from numpy import floating
+    from numpy.typing import NDArray
+
+class ReplayBuffer:
+    """Implementation of a fixed-size circular replay memory.
+    
+    Each row holds an observed state, along with the reward received when reaching it
+    from the previous row's state, so that every state is stored once and serves both as
+    a transition's next state and as the following transition's state. Once full, new
+    rows overwrite the oldest ones."""
+    def __init__(self, capacity: "int", state_dim: "int", reward_dim: "int",
+                 path: "Optional[str]" = None) -> "None":
+        """Instantiates an empty replay memory.
+        
+        Positional arguments:  
+         - `capacity`: the maximum number of stored states.
+         - `state_dim`: the size of each state.
+         - `reward_dim`: the size of each reward.
+        
+        Keyword arguments:  
+         - `path`: the file backing the memory. If provided, rows are stored in a \
+        memory-mapped file rather than on the heap, and any previous content is \
+        discarded."""
+        self.capacity = capacity
+        self.state_dim = state_dim
+        self.path = path
+        self.rows: "NDArray[float32]" = memmap(
+            path,
+            dtype=float32,
+            mode="w+",
+            shape=(capacity, state_dim + reward_dim)
+        ) if path is not None else zeros((capacity, state_dim + reward_dim), dtype=float32)
+        self.cursor: "int" = 0
+        self.size: "int" = 0
+
+    def __len__(self) -> "int":
+        """Returns the number of stored transitions."""
+        return max(self.size - 1, 0)
+
+    def append(self, state: "NDArray[floating]",
+               reward: "Optional[NDArray[floating]]" = None) -> "None":
+        """Stores a newly observed state.
+        
+        Positional arguments:  
+         - `state`: the observed state.
+        
+        Keyword arguments:  
+         - `reward`: the reward received when reaching `state` from the last stored \
+        state. If omitted, the memory is cleared and `state` starts a new sequence."""
+        if reward is None:
+            self.size = 0
+        else:
+            self.rows[self.cursor, self.state_dim:] = reward
+        self.rows[self.cursor, :self.state_dim] = state
+        self.cursor = (self.cursor + 1) % self.capacity
+        self.size = min(self.size + 1, self.capacity)
+
+    def sample(self, batch_size: "int") \
+            -> "Tuple[NDArray[float32], NDArray[float32], NDArray[float32]]":
+        """Samples stored transitions uniformly, with replacement.
+        
+        Positional arguments:  
+         - `batch_size`: the number of sampled transitions.
+        
+        Return:  
+        A `Tuple` containing the sampled states, rewards and next states, one per row."""
+        oldest = (self.cursor - self.size) % self.capacity
+        next_rows = (oldest + 1 + np_choice(len(self), batch_size)) % self.capacity
+        states = self.rows[(next_rows - 1) % self.capacity, :self.state_dim]
+        transitions = self.rows[next_rows]
+        return (states, transitions[:, self.state_dim:], transitions[:, :self.state_dim])
+
+    def release(self) -> "None":
+        """Deletes the file backing the memory, if any. The memory must not be used
+        afterwards."""
+        if self.path is not None:
+            # The mapping is dropped first, since open files can't be deleted on Windows.
+            self.rows = zeros((0, self.rows.shape[1]), dtype=float32)
+            unlink(self.path)
+            self.path = None
+
+
+class ReplayStorage:
+    """Implementation of the settings shared by all replay memories of a process."""
+    def __init__(self) -> "None":
+        """Instantiates the default settings, keeping replay memories on the heap."""
+        self.capacity: "int" = REPLAY_BUFFER_SIZE
+        self.parent: "Optional[Path]" = None
+        self.folder: "Optional[Path]" = None
+
+    def create(self, state_dim: "int", reward_dim: "int") -> "ReplayBuffer":
+        """Creates an empty replay memory. If a folder was chosen, the memory is backed by
+        its own file, in a subfolder private to the process.
+        
+        Positional arguments:  
+         - `state_dim`: the size of each state.
+         - `reward_dim`: the size of each reward.
+        
+        Return:  
+        The new replay memory."""
+        if self.parent is None:
+            return ReplayBuffer(self.capacity, state_dim, reward_dim)
+        if self.folder is None:
+            self.parent.mkdir(parents=True, exist_ok=True)
+            self.folder = Path(mkdtemp(prefix="replay-", dir=self.parent))
+        descriptor, path = mkstemp(suffix=".bin", dir=self.folder)
+        close(descriptor)
+        return ReplayBuffer(self.capacity, state_dim, reward_dim, path)
+
+    def clear(self) -> "None":
+        """Deletes the process's subfolder, along with the files of all replay memories
+        still in use. The memories must not be used afterwards."""
+        if self.folder is not None:
+            rmtree(self.folder, ignore_errors=True)
+            self.folder = None
+
+
+REPLAY_STORAGE = ReplayStorage()
+register_exit(REPLAY_STORAGE.clear)
+
+def use_replay_storage(folder: "Optional[str]", capacity: "int") -> "None":
+    """Sets how the learning lobes' replay memories are stored. To be invoked in each world
+    process, before any living being is created.
+    
+    Positional arguments:  
+     - `folder`: the folder of the files backing the replay memories, or `None` to keep \
+    them on the heap.
+     - `capacity`: the maximum number of states stored by each replay memory."""
+    REPLAY_STORAGE.capacity = capacity
+    REPLAY_STORAGE.parent = Path(folder) if folder is not None else None
+
+def clear_replay_storage() -> "None":
+    """Deletes the files backing the replay memories still in use. Invoked at interpreter
+    exit, but world engines must invoke it on their own before their process ends."""
+    REPLAY_STORAGE.clear()
@@ -0,0 +1,151 @@
+"""Module containing the compiled training step shared by all learning lobes' models."""
+from typing import TYPE_CHECKING
+from tensorflow import GradientTape, Variable, function, constant, cast, matmul, sqrt, \
+    square, zeros_like, float32, int64
+from tensorflow.nn import relu
+from keras.api.losses import huber
+from utils.living.learning.commons import ADAM_BETA_1, ADAM_BETA_2, ADAM_EPSILON, \
+    draw_dense_weights
+
+if TYPE_CHECKING:
+    from typing import List, Sequence, Tuple
+    from numpy import floating
+    from numpy.random import Generator
+    from numpy.typing import NDArray
+    from keras import Sequential
+    from tensorflow import Tensor
+
+def get_variables(model: "Sequential") -> "List[Variable]":
+    """Returns the backend variables of a model, alternating kernels and biases.
+
+    Positional arguments:  
+     - `model`: the model, made of dense layers only.
+
+    Return:  
+    A `List` containing the model's TensorFlow variables, in layer order."""
+    return [weight.value for weight in model.weights]
+
+def create_optimizer_state(model: "Sequential") \
+        -> "Tuple[List[Variable], List[Variable], Variable]":
+    """Instantiates the Adam optimizer state of a model, with no steps performed.
+
+    Positional arguments:  
+     - `model`: the model to be optimized.
+
+    Return:  
+    A `Tuple` containing the first and second moment estimates of each model variable \
+    and the number of steps performed."""
+    variables = get_variables(model)
+    return (
+        [Variable(zeros_like(variable), trainable=False) for variable in variables],
+        [Variable(zeros_like(variable), trainable=False) for variable in variables],
+        Variable(constant(0, dtype=int64), trainable=False)
+    )
+
+def forward(variables: "Sequence[Variable]", inputs: "Tensor") -> "Tensor":
+    """Evaluates a dense network on a batch of inputs, with ReLU hidden layers and a
+    linear output layer, as in the lobes' models.
+
+    Positional arguments:  
+     - `variables`: the network's variables, alternating kernels and biases.
+     - `inputs`: the input rows.
+
+    Return:  
+    The network's output for each row."""
+    hidden = inputs
+    for layer in range(0, len(variables), 2):
+        hidden = matmul(hidden, variables[layer]) + variables[layer + 1]
+        if layer != len(variables) - 2:
+            hidden = relu(hidden)
+    return hidden
+
+@function
+def compiled_train_step(variables: "List[Variable]", target_variables: "List[Variable]",
+                        momentums: "List[Variable]", velocities: "List[Variable]",
+                        iterations: "Variable", states: "Tensor", rewards: "Tensor",
+                        next_states: "Tensor", learning_rate: "Tensor",
+                        gamma: "Tensor") -> "None":
+    """Performs a DQN training step with Huber loss and Adam update, traced once per
+    network shape and shared by all lobes with that shape.
+
+    Positional arguments:  
+     - `variables`: the online network's variables, updated in place.
+     - `target_variables`: the target network's variables.
+     - `momentums`: the first moment estimates of each online variable.
+     - `velocities`: the second moment estimates of each online variable.
+     - `iterations`: the number of steps already performed.
+     - `states`: the sampled states, one per row.
+     - `rewards`: the sampled rewards, one per row.
+     - `next_states`: the sampled next states, one per row.
+     - `learning_rate`: the optimizer's learning rate.
+     - `gamma`: the discount factor."""
+    targets = rewards + gamma * forward(target_variables, next_states)
+    with GradientTape() as tape:
+        loss_values = huber(targets, forward(variables, states))
+    gradients = tape.gradient(loss_values, variables)
+    iterations.assign_add(1)
+    step = cast(iterations, float32)
+    alpha = learning_rate * sqrt(1 - ADAM_BETA_2 ** step) / (1 - ADAM_BETA_1 ** step)
+    for variable, momentum, velocity, gradient in zip(
+        variables, momentums, velocities, gradients
+    ):
+        momentum.assign_add((gradient - momentum) * (1 - ADAM_BETA_1))
+        velocity.assign_add((square(gradient) - velocity) * (1 - ADAM_BETA_2))
+        variable.assign_sub((momentum * alpha) / (sqrt(velocity) + ADAM_EPSILON))
+
+def train_model(model: "Sequential", target_model: "Sequential",
+                optimizer_state: "Tuple[List[Variable], List[Variable], Variable]",
+                samples: "Tuple[NDArray[floating], NDArray[floating], NDArray[floating]]",
+                learning_rate: "float", gamma: "float") -> "None":
+    """Performs a single compiled DQN training step of a model.
+
+    Positional arguments:  
+     - `model`: the online model, updated in place.
+     - `target_model`: the target model, providing the next states' Q-values.
+     - `optimizer_state`: the model's Adam state, as returned by \
+    `create_optimizer_state`.
+     - `samples`: the sampled states, rewards and next states, one per row.
+     - `learning_rate`: the optimizer's learning rate.
+     - `gamma`: the discount factor."""
+    states, rewards, next_states = samples
+    compiled_train_step(
+        get_variables(model),
+        get_variables(target_model),
+        *optimizer_state,
+        constant(states, dtype=float32),
+        constant(rewards, dtype=float32),
+        constant(next_states, dtype=float32),
+        constant(learning_rate, dtype=float32),
+        constant(gamma, dtype=float32)
+    )
+
+def sync_target_model(model: "Sequential", target_model: "Sequential") -> "None":
+    """Copies a model's weights into its target model, in place.
+
+    Positional arguments:  
+     - `model`: the online model.
+     - `target_model`: the target model."""
+    for target_variable, variable in zip(get_variables(target_model), get_variables(model)):
+        target_variable.assign(variable)
+
+def reset_model(model: "Sequential", generator: "Generator") -> "None":
+    """Re-initializes a model's weights in place, as a freshly built model.
+
+    Positional arguments:  
+     - `model`: the model, made of dense layers only.
+     - `generator`: the random generator drawing the kernels."""
+    variables = get_variables(model)
+    weights = draw_dense_weights([tuple(kernel.shape) for kernel in variables[0::2]], generator)
+    for variable, weight in zip(variables, weights):
+        variable.assign(weight)
+
+def reset_optimizer_state(optimizer_state: "Tuple[List[Variable], List[Variable], Variable]") \
+        -> "None":
+    """Resets a model's Adam state in place, as if no steps were performed.
+
+    Positional arguments:  
+     - `optimizer_state`: the state, as returned by `create_optimizer_state`."""
+    momentums, velocities, iterations = optimizer_state
+    for variable in momentums + velocities:
+        variable.assign(zeros_like(variable))
+    iterations.assign(0)
@@ -5,7 +5,7 @@ from numpy import inf
 from utils.living.genome import Gene
 
 if TYPE_CHECKING:
-    from typing import Dict
+    from typing import Dict, List
 
 BASE_HUNGER: "float" = 0
 BASE_LIFE: "float" = 0
@@ -90,3 +90,7 @@ class Need(Enum):
                 return MAX_TIREDNESS
             case _:
                 return 0
+
+
+TRACKED_NEEDS: "List[Need]" = [need for need in Need if need != Need.NONE]
+NEED_COLUMNS: "Dict[Need, int]" = {need: idx for idx, need in enumerate(TRACKED_NEEDS)}
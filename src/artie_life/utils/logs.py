@@ -1,16 +1,34 @@
 from typing import TYPE_CHECKING
+from atexit import register as register_exit
+from bisect import bisect_right
 from pathlib import Path
 from shutil import rmtree
 from os.path import join as join_path
+from time import monotonic
 from utils.living.genome import Gene
 from utils.living.needs import Need, compute_expected_lifetime
+from utils.timing import Phase, PHASE_PERCENTILES
 from controller.genetics import compute_fitness, compute_whole_fitness
 
 if TYPE_CHECKING:
+    from typing import Dict, List, Optional, Tuple, Union
     from model.entities.living.living import LivingBeing
+    from utils.results import ResultsStore
+    from utils.timing import PhaseTimer
 
 LOGS_FOLDER: "Path" = Path("logs")
 GAME_SETTINGS_LOG: "Path" = Path(join_path(LOGS_FOLDER, "game.csv"))
+RUN_REPORT_LOG: "Path" = Path(join_path(LOGS_FOLDER, "report.csv"))
+RUN_REPORT_FIELDS: "List[str]" = [
+    "world_id", "status", "exit_code", "restarts", "startup_time", "simulated_time",
+    "wall_time", "population", "deaths", "mean_fitness"
+]
+LOG_BUFFER_ROWS: "int" = 1000
+LOG_FLUSH_PERIOD: "float" = 5.0
+HISTOGRAM_WINDOW_FRAMES: "int" = 1000
+HISTOGRAM_PERCENTILES: "List[float]" = [0.5, 0.95, 0.99]
+HISTOGRAM_EDGES: "List[float]" = [1e-4 * 2 ** (i / 8) for i in range(8 * 17 + 1)]
+
 def WORLD_LOG(world_id: "int") -> "Path":
     """Returns the desired single-world log path, given an in-game world ID.
     
@@ -30,6 +48,146 @@ def WORLD_PERFORMANCE_LOG(world_id: "int") -> "Path":
     A `Path object pointing to the desired file."""
     return Path(join_path(LOGS_FOLDER, str(world_id), "performance.csv"))
 
+def WORLD_THROUGHPUT_LOG(world_id: "int") -> "Path":
+    """Returns the desired world throughput log, to track headless simulation speed.
+    
+    Positional arguments:  
+     - `world_id`: the world's in-game ID.
+    
+    Return:  
+    A `Path` object pointing to the desired file."""
+    return Path(join_path(LOGS_FOLDER, str(world_id), "throughput.csv"))
+
+def WORLD_PHASES_LOG(world_id: "int") -> "Path":
+    """Returns the desired world phases log, to track the duration of each update phase.
+    
+    Positional arguments:  
+     - `world_id`: the world's in-game ID.
+    
+    Return:  
+    A `Path` object pointing to the desired file."""
+    return Path(join_path(LOGS_FOLDER, str(world_id), "phases.csv"))
+
+class LogBuffer:
+    """Implementation of the buffer holding the rows of all log files in memory.
+
+    Rows are appended to their files in bulk, once enough of them are buffered or enough
+    time has passed since the last flush, instead of opening and closing a file for each
+    row. The living beings' records are inserted in the results database along with
+    them, if any."""
+    def __init__(self) -> "None":
+        """Instantiates an empty buffer."""
+        self.rows: "Dict[Path, List[str]]" = { }
+        self.records: "List[Tuple[Union[int, float], ...]]" = []
+        self.results: "Optional[ResultsStore]" = None
+        self.size: "int" = 0
+        self.last_flush: "float" = monotonic()
+
+    def write(self, log: "Path", row: "str") -> "None":
+        """Buffers a row, flushing all buffered rows if needed.
+
+        Positional arguments:  
+         - `log`: the log file the row belongs to.
+         - `row`: the row, terminated by a newline."""
+        self.rows.setdefault(log, []).append(row)
+        self.size += 1
+        self.check()
+
+    def record(self, values: "Tuple[Union[int, float], ...]") -> "None":
+        """Buffers a living being's record for the results database, if any.
+
+        Positional arguments:  
+         - `values`: the record's values, as accepted by `ResultsStore.insert`."""
+        if self.results is not None:
+            self.records.append(values)
+            self.size += 1
+
+    def check(self) -> "None":
+        """Flushes all buffered rows, if enough of them are buffered or enough time has
+        passed since the last flush."""
+        if self.size >= LOG_BUFFER_ROWS or monotonic() - self.last_flush >= LOG_FLUSH_PERIOD:
+            self.flush()
+
+    def flush(self) -> "None":
+        """Appends all buffered rows to their log files, and inserts all buffered records
+        in the results database."""
+        for log, rows in self.rows.items():
+            with open(log, "a") as file:
+                file.writelines(rows)
+        self.rows.clear()
+        if self.results is not None and len(self.records) > 0:
+            self.results.insert(self.records)
+        self.records = []
+        self.size = 0
+        self.last_flush = monotonic()
+
+    def discard(self, log: "Path") -> "None":
+        """Drops the buffered rows of a log file, about to be overwritten.
+
+        Positional arguments:  
+         - `log`: the log file."""
+        self.size -= len(self.rows.pop(log, []))
+
+
+class FrameTimeHistogram:
+    """Implementation of a streaming histogram of frame durations.
+
+    Durations are counted in logarithmic bins, eight per octave from 0.1 ms up to about
+    13 s, so that percentiles are known within about 9% without storing any duration."""
+    def __init__(self) -> "None":
+        """Instantiates an empty histogram."""
+        self.counts: "List[int]" = [0] * (len(HISTOGRAM_EDGES) + 1)
+        self.frames: "int" = 0
+        self.longest: "float" = 0.0
+
+    def record(self, duration: "float") -> "None":
+        """Counts a frame's duration.
+
+        Positional arguments:  
+         - `duration`: the frame's duration, in seconds."""
+        self.counts[bisect_right(HISTOGRAM_EDGES, duration)] += 1
+        self.frames += 1
+        self.longest = max(self.longest, duration)
+
+    def pop_row(self) -> "str":
+        """Summarizes the recorded frames and empties the histogram.
+
+        Return:  
+        A row containing the number of recorded frames, the upper bound of the bin \
+        holding each of the `HISTOGRAM_PERCENTILES` and the longest duration."""
+        quantiles: "List[float]" = []
+        seen = 0
+        percentiles = iter(HISTOGRAM_PERCENTILES)
+        percentile = next(percentiles, None)
+        for edge, count in zip(HISTOGRAM_EDGES + [self.longest], self.counts):
+            seen += count
+            while percentile is not None and seen >= percentile * self.frames:
+                quantiles.append(min(edge, self.longest))
+                percentile = next(percentiles, None)
+        row = ",".join(str(value) for value in [self.frames, *quantiles, self.longest]) + "\n"
+        self.counts = [0] * len(self.counts)
+        self.frames = 0
+        self.longest = 0.0
+        return row
+
+
+LOG_BUFFER: "LogBuffer" = LogBuffer()
+FRAME_HISTOGRAMS: "Dict[int, FrameTimeHistogram]" = { }
+register_exit(LOG_BUFFER.flush)
+
+def flush_logs() -> "None":
+    """Appends all buffered rows to their log files. Invoked at interpreter exit, but
+    world engines must invoke it on their own before their process ends."""
+    LOG_BUFFER.flush()
+
+def use_results_store(results: "Optional[ResultsStore]") -> "None":
+    """Makes the living beings' stats be recorded in a results database, along with the
+    world logs. To be invoked in each world process, before any living being is logged.
+    
+    Positional arguments:  
+     - `results`: the handle to the run's results, or `None` to record none."""
+    LOG_BUFFER.results = results
+
 def reset_logs_folder() -> "None":
     """Cleans up previous logs. Necessary at startup to avoid conflicts."""
     rmtree(LOGS_FOLDER, ignore_errors=True)
@@ -48,13 +206,19 @@ def log_game_settings(learning: "str", genetics: "str") -> "None":
         file.write("learning_enable,genetic_algorithm\n")
         file.write(learning + "," + genetics + "\n")
 
-def start_world_log(world_id: "int") -> "None":
+def start_world_log(world_id: "int", resume: "bool" = False) -> "None":
     """Starts a world's log, recording the log's header.
     
     Positional arguments:  
-     - `world_id`: the in-game world ID."""
+     - `world_id`: the in-game world ID.
+    
+    Keyword arguments:  
+     - `resume`: if `True`, an existing log is extended rather than overwritten."""
     log = WORLD_LOG(world_id)
     log.parent.mkdir(parents=True, exist_ok=True)
+    if resume and log.exists():
+        return
+    LOG_BUFFER.discard(log)
     with open(log, "w") as file:
         file.write("id,")
         for gene in Gene:
@@ -62,34 +226,82 @@ def start_world_log(world_id: "int") -> "None":
         file.write("fitness,whole_fitness,")
         file.write("expected_lifetime,lifetime,alive\n")
 
+def get_world_log_size(world_id: "int") -> "int":
+    """Returns the size a world's log will have once all buffered rows are flushed.
+    
+    Positional arguments:  
+     - `world_id`: the world's in-game ID.
+    
+    Return:  
+    The log's size, in bytes."""
+    log = WORLD_LOG(world_id)
+    return (log.stat().st_size if log.exists() else 0) \
+        + sum(len(row.encode()) for row in LOG_BUFFER.rows.get(log, []))
+
+def rewind_world_log(world_id: "int", size: "int", last_id: "int") -> "None":
+    """Drops all living beings logged by a world after a checkpoint was recorded, as the
+    ones still alive when the checkpointed run ended, so that a resumed world logs each
+    living being once. To be invoked when the world is restored.
+    
+    Positional arguments:  
+     - `world_id`: the world's in-game ID.  
+     - `size`: the log's size when the checkpoint was recorded, as returned by \
+    `get_world_log_size`.  
+     - `last_id`: the last in-game ID assigned when the checkpoint was recorded. The \
+    records of later living beings are dropped from the results database, if any."""
+    log = WORLD_LOG(world_id)
+    LOG_BUFFER.discard(log)
+    if log.exists() and log.stat().st_size > size:
+        with open(log, "r+") as file:
+            file.truncate(size)
+    if LOG_BUFFER.results is not None:
+        LOG_BUFFER.results.discard(world_id, last_id)
+
 def log_living_being_stats(world_id: "int", living_being: "LivingBeing") -> "None":
     """Logs all relevant data about a given living being.
     
     Positional arguments:  
      - `world_id`: the world's in-game ID.  
      - `living_being`: the living being whose information has to be logged."""
-    log = WORLD_LOG(world_id)
-    with open(log, "a") as file:
-        file.write(str(living_being.game_id) + ",")
-        for gene in Gene:
-            file.write(str(living_being.genome[gene]) + ",")
-        file.write(str(compute_fitness(living_being.brain.needs_tracker.needs_avg)) + ",")
-        file.write(str(compute_whole_fitness(living_being.brain)) + ",")
-        file.write(str(compute_expected_lifetime(living_being.genome)) + ",")
-        file.write(str(living_being.brain.needs_tracker.lifetime) + ",")
-        file.write(str(
-            living_being.brain.needs_tracker.needs[Need.LIFE] < Need.LIFE.get_threshold()
-        ))
-        file.write("\n")
+    values = (
+        living_being.game_id,
+        *(living_being.genome[gene] for gene in Gene),
+        compute_fitness(living_being.brain.needs_tracker.needs_avg),
+        compute_whole_fitness(living_being.brain),
+        compute_expected_lifetime(living_being.genome),
+        living_being.brain.needs_tracker.lifetime,
+        living_being.brain.needs_tracker.needs[Need.LIFE] < Need.LIFE.get_threshold()
+    )
+    LOG_BUFFER.record((world_id, *values))
+    LOG_BUFFER.write(WORLD_LOG(world_id), ",".join(str(value) for value in values) + "\n")
 
-def start_performance_log(world_id: "int") -> "None":
+def start_performance_log(world_id: "int", resume: "bool" = False,
+                          histograms: "bool" = False) -> "None":
     """Creates and adds the proper header to the world's performance log.
     
     Positional arguments:  
-     - `world_id`: the world's in-game ID."""
+     - `world_id`: the world's in-game ID.
+    
+    Keyword arguments:  
+     - `resume`: if `True`, an existing log is extended rather than overwritten.
+     - `histograms`: if `True`, the log records the frame duration percentiles of each \
+    `HISTOGRAM_WINDOW_FRAMES` frames, rather than the duration of every frame."""
     log = WORLD_PERFORMANCE_LOG(world_id)
+    if histograms:
+        FRAME_HISTOGRAMS[world_id] = FrameTimeHistogram()
+    else:
+        FRAME_HISTOGRAMS.pop(world_id, None)
+    if resume and log.exists():
+        return
+    LOG_BUFFER.discard(log)
     with open(log, "w") as file:
-        file.write("frame_duration,framerate\n")
+        if histograms:
+            file.write("frames,")
+            for percentile in HISTOGRAM_PERCENTILES:
+                file.write(f"p{percentile * 100:g}_frame_duration,")
+            file.write("max_frame_duration\n")
+        else:
+            file.write("frame_duration,framerate\n")
 
 def log_frame_performance(world_id: "int", elapsed_time: "float") -> "None":
     """Logs a single frame performance.
@@ -99,7 +311,95 @@ def log_frame_performance(world_id: "int", elapsed_time: "float") -> "None":
      - `elapsed_time`: the frame's duration, in seconds.
     """
     if elapsed_time != 0:
-        log = WORLD_PERFORMANCE_LOG(world_id)
+        histogram = FRAME_HISTOGRAMS.get(world_id)
+        if histogram is None:
+            LOG_BUFFER.write(
+                WORLD_PERFORMANCE_LOG(world_id),
+                str(elapsed_time) + "," + str(1 / elapsed_time) + "\n"
+            )
+            return
+        histogram.record(elapsed_time)
+        if histogram.frames >= HISTOGRAM_WINDOW_FRAMES:
+            LOG_BUFFER.write(WORLD_PERFORMANCE_LOG(world_id), histogram.pop_row())
+        else:
+            LOG_BUFFER.check()
+
+def finish_performance_log(world_id: "int") -> "None":
+    """Records the frame duration percentiles of the last frames, if the world's
+    performance log records histograms and any frame is left.
+    
+    Positional arguments:  
+     - `world_id`: the world's in-game ID."""
+    histogram = FRAME_HISTOGRAMS.get(world_id)
+    if histogram is not None and histogram.frames > 0:
+        LOG_BUFFER.write(WORLD_PERFORMANCE_LOG(world_id), histogram.pop_row())
+
+def start_phases_log(world_id: "int", resume: "bool" = False) -> "None":
+    """Creates and adds the proper header to the world's phases log.
+    
+    Positional arguments:  
+     - `world_id`: the world's in-game ID.
+    
+    Keyword arguments:  
+     - `resume`: if `True`, an existing log is extended rather than overwritten."""
+    log = WORLD_PHASES_LOG(world_id)
+    if resume and log.exists():
+        return
+    LOG_BUFFER.discard(log)
+    with open(log, "w") as file:
+        file.write("frames")
+        for percentile in PHASE_PERCENTILES:
+            for phase in Phase:
+                file.write(f",{phase.name.lower()}_p{percentile:g}")
+        file.write("\n")
+
+def log_phases(world_id: "int", timer: "PhaseTimer") -> "None":
+    """Logs the rolling percentiles of the duration of each update phase.
+    
+    Positional arguments:  
+     - `world_id`: the world's in-game ID.  
+     - `timer`: the world's phase timer."""
+    if timer.frames > 0:
+        LOG_BUFFER.write(WORLD_PHASES_LOG(world_id), ",".join(
+            [str(timer.frames)] + [str(value) for value in timer.summarize().flatten().tolist()]
+        ) + "\n")
+
+def start_throughput_log(world_id: "int", resume: "bool" = False) -> "None":
+    """Creates and adds the proper header to the world's throughput log.
+    
+    Positional arguments:  
+     - `world_id`: the world's in-game ID.
+    
+    Keyword arguments:  
+     - `resume`: if `True`, an existing log is extended rather than overwritten."""
+    log = WORLD_THROUGHPUT_LOG(world_id)
+    if resume and log.exists():
+        return
+    with open(log, "w") as file:
+        file.write("simulated_time,wall_time,simulated_per_wall_second\n")
+
+def log_throughput(world_id: "int", simulated_time: "float", wall_time: "float") -> "None":
+    """Logs the simulation's throughput since the engine started.
+    
+    Positional arguments:  
+     - `world_id`: the world's in-game ID.  
+     - `simulated_time`: the amount of simulated time, in seconds.  
+     - `wall_time`: the amount of wall-clock time, in seconds."""
+    if wall_time != 0:
+        log = WORLD_THROUGHPUT_LOG(world_id)
         with open(log, "a") as file:
-            file.write(str(elapsed_time) + ",")
-            file.write(str(1 / elapsed_time) + "\n")
+            file.write(str(simulated_time) + ",")
+            file.write(str(wall_time) + ",")
+            file.write(str(simulated_time / wall_time) + "\n")
+
+def log_run_report(summaries: "List[Dict[str, Union[int, float, str]]]") -> "None":
+    """Logs the run report, gathering the final summary of every world. To be invoked
+    just once, when all worlds are over.
+    
+    Positional arguments:  
+     - `summaries`: the summary of each world. Missing fields are left empty."""
+    with open(RUN_REPORT_LOG, "w") as file:
+        file.write(",".join(RUN_REPORT_FIELDS) + "\n")
+        for summary in summaries:
+            file.write(",".join(str(summary.get(field, "")) for field in RUN_REPORT_FIELDS))
+            file.write("\n")
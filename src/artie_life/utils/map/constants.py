@@ -17,3 +17,7 @@ SPOT_TO_SIDE_OFFSET: "float" = 30.0
 # Living being dimension and movement constants
 LIVING_WIDTH: "float" = 12.0
 LIVING_HEIGHT: "float" = 20.0
+
+# Spatial index grid constants
+GRID_CELL_WIDTH: "float" = SPOT_WIDTH
+GRID_CELL_HEIGHT: "float" = SPOT_HEIGHT
@@ -0,0 +1,159 @@
+"""Module containing the SQLite store gathering the results of all runs."""
+from typing import TYPE_CHECKING
+from datetime import datetime
+from pathlib import Path
+from sqlite3 import connect
+from utils.living.genome import Gene
+
+if TYPE_CHECKING:
+    from typing import Dict, List, Optional, Tuple, Union
+    from sqlite3 import Connection
+
+RESULTS_DATABASE: "Path" = Path("results.db")
+RESULTS_TIMEOUT: "float" = 60.0
+RUN_FIELDS: "List[str]" = [
+    "learning_enable", "genetic_algorithm", "inference", "population", "timestep",
+    "duration", "worlds"
+]
+LIVING_FIELDS: "List[str]" = [gene.name.lower() for gene in Gene] + [
+    "fitness", "whole_fitness", "expected_lifetime", "lifetime", "alive"
+]
+SCHEMA: "List[str]" = [
+    "CREATE TABLE IF NOT EXISTS runs (run_id INTEGER PRIMARY KEY, started TEXT, "
+        + ", ".join(RUN_FIELDS) + ")",
+    "CREATE TABLE IF NOT EXISTS living (run_id INTEGER, world_id INTEGER, "
+        + "living_id INTEGER, " + ", ".join(field + " REAL" for field in LIVING_FIELDS)
+        + ", PRIMARY KEY (run_id, world_id, living_id)) WITHOUT ROWID",
+    "CREATE VIEW IF NOT EXISTS run_fitness AS SELECT runs.*, COUNT(living.living_id) AS "
+        + "living, AVG(fitness) AS mean_fitness, MAX(fitness) AS max_fitness, "
+        + "AVG(whole_fitness) AS mean_whole_fitness, AVG(lifetime) AS mean_lifetime "
+        + "FROM runs LEFT JOIN living USING (run_id) GROUP BY runs.run_id"
+]
+
+def open_results(database: "Path") -> "Connection":
+    """Connects to a results database, creating its tables if missing. The database is
+    switched to write-ahead logging, so that the world processes of a run can write to it
+    while it is being queried.
+
+    Positional arguments:  
+     - `database`: the database's path.
+
+    Return:  
+    The connection to the database."""
+    connection = connect(database, timeout=RESULTS_TIMEOUT)
+    connection.execute("PRAGMA journal_mode=WAL")
+    connection.execute("PRAGMA synchronous=NORMAL")
+    with connection:
+        for statement in SCHEMA:
+            connection.execute(statement)
+    return connection
+
+def start_run(database: "Path",
+              settings: "Dict[str, Union[int, float, str, None]]") -> "int":
+    """Records a new run. To be invoked just once, at the system startup.
+
+    Positional arguments:  
+     - `database`: the database's path.
+     - `settings`: the run's configuration, by field in `RUN_FIELDS`. Missing fields \
+    are left empty.
+
+    Return:  
+    The run's ID."""
+    connection = open_results(database)
+    with connection:
+        connection.execute(
+            "INSERT INTO runs (started, " + ", ".join(RUN_FIELDS) + ") VALUES (?"
+                + ", ?" * len(RUN_FIELDS) + ")",
+            [datetime.now().isoformat(), *(settings.get(field) for field in RUN_FIELDS)]
+        )
+        (run_id,) = connection.execute("SELECT last_insert_rowid()").fetchone()
+    connection.close()
+    return run_id
+
+def update_run(database: "Path", run_id: "int",
+               settings: "Dict[str, Union[int, float, str, None]]") -> "None":
+    """Overwrites a recorded run's configuration, as when it is resumed with new settings.
+
+    Positional arguments:  
+     - `database`: the database's path.
+     - `run_id`: the run's ID.
+     - `settings`: the run's configuration, by field in `RUN_FIELDS`. Missing fields \
+    are left empty."""
+    connection = open_results(database)
+    with connection:
+        connection.execute(
+            "UPDATE runs SET " + ", ".join(field + " = ?" for field in RUN_FIELDS)
+                + " WHERE run_id = ?",
+            [*(settings.get(field) for field in RUN_FIELDS), run_id]
+        )
+    connection.close()
+
+def get_last_run(database: "Path") -> "Optional[int]":
+    """Finds the last recorded run, to be extended when resuming it.
+
+    Positional arguments:  
+     - `database`: the database's path.
+
+    Return:  
+    The run's ID, or `None` if no run was recorded."""
+    if not database.exists():
+        return None
+    connection = open_results(database)
+    (run_id,) = connection.execute("SELECT MAX(run_id) FROM runs").fetchone()
+    connection.close()
+    return run_id
+
+
+class ResultsStore:
+    """Implementation of a run's handle to the results database, handed to the world
+    engines.
+
+    Each process opens its own connection at its first write, and inserts the living
+    beings' records in bulk, one transaction per batch. A living being recorded twice,
+    as when a stopped run is resumed, keeps its last record."""
+    def __init__(self, database: "Path", run_id: "int") -> "None":
+        """Instantiates the handle, without connecting yet.
+
+        Positional arguments:  
+         - `database`: the database's path.
+         - `run_id`: the ID of the run the records belong to."""
+        self.database = database
+        self.run_id = run_id
+        self.connection: "Optional[Connection]" = None
+
+    def insert(self, records: "List[Tuple[Union[int, float], ...]]") -> "None":
+        """Records a batch of living beings.
+
+        Positional arguments:  
+         - `records`: each living being's world ID, in-game ID and values of the \
+        `LIVING_FIELDS`."""
+        if self.connection is None:
+            self.connection = open_results(self.database)
+        with self.connection:
+            self.connection.executemany(
+                "INSERT OR REPLACE INTO living VALUES (?, ?, ?"
+                    + ", ?" * len(LIVING_FIELDS) + ")",
+                [(self.run_id, *record) for record in records]
+            )
+
+    def discard(self, world_id: "int", last_id: "int") -> "None":
+        """Drops the records of a world's living beings born after a given one.
+
+        Positional arguments:  
+         - `world_id`: the world's in-game ID.
+         - `last_id`: the in-game ID of the last living being to be kept."""
+        if self.connection is None:
+            self.connection = open_results(self.database)
+        with self.connection:
+            self.connection.execute(
+                "DELETE FROM living WHERE run_id = ? AND world_id = ? AND living_id > ?",
+                (self.run_id, world_id, last_id)
+            )
+
+    def __getstate__(self) -> "Dict[str, Union[Path, int, None]]":
+        """Drops the connection when the handle is sent to another process, which
+        opens its own.
+
+        Return:  
+        The handle's attributes, without the connection."""
+        return {"database": self.database, "run_id": self.run_id, "connection": None}
@@ -0,0 +1,112 @@
+"""Module containing the per-phase timing of world updates."""
+from typing import TYPE_CHECKING
+from enum import Enum, auto
+from time import perf_counter
+from numpy import zeros, percentile, float64
+
+if TYPE_CHECKING:
+    from typing import List
+    from numpy.typing import NDArray
+
+PHASE_WINDOW_FRAMES: "int" = 1000
+PHASE_PERCENTILES: "List[float]" = [50, 95, 99]
+
+class Phase(Enum):
+    """Enumerative class listing the timed phases of a world update."""
+    LOGGING = auto()
+    MOVEMENT = auto()
+    PERCEPTION = auto()
+    DECAY = auto()
+    INFERENCE = auto()
+    THINKING = auto()
+    ATTENTION = auto()
+    REASON = auto()
+    TRAINING = auto()
+    SPAWNING = auto()
+    RENDERING = auto()
+
+
+class PhaseTimer:
+    """Implementation of a world's phase timer.
+
+    The time elapsed since the timer's last mark is charged to a phase at each lap, and
+    the totals of each frame are kept for the last `PHASE_WINDOW_FRAMES` frames, from
+    which rolling percentiles are computed. Timed code checks whether a timer exists
+    before each lap, so that disabled timing costs nothing but that check."""
+    def __init__(self, window: "int" = PHASE_WINDOW_FRAMES) -> "None":
+        """Instantiates a timer with no recorded frame.
+
+        Keyword arguments:  
+         - `window`: the number of frames summarized by the rolling percentiles."""
+        self.history: "NDArray[float64]" = zeros((window, len(Phase)), dtype=float64)
+        self.current: "List[float]" = [0.0] * len(Phase)
+        self.frames: "int" = 0
+        self.mark: "float" = perf_counter()
+
+    def start_frame(self) -> "bool":
+        """Closes the current frame, if any phase was timed, and starts a new one.
+
+        Return:  
+        `True` if the closed frame completes a window of `PHASE_WINDOW_FRAMES` frames, \
+        `False` otherwise."""
+        completed = False
+        if any(duration != 0.0 for duration in self.current):
+            self.history[self.frames % len(self.history)] = self.current
+            self.frames += 1
+            self.current = [0.0] * len(Phase)
+            completed = self.frames % len(self.history) == 0
+        self.mark = perf_counter()
+        return completed
+
+    def restart(self) -> "None":
+        """Moves the timer's mark to the current time, leaving the time elapsed since the
+        last mark uncharged."""
+        self.mark = perf_counter()
+
+    def lap(self, phase: "Phase") -> "None":
+        """Charges the time elapsed since the timer's last mark to a phase, and moves the
+        mark to the current time.
+
+        Positional arguments:  
+         - `phase`: the phase that was running since the last mark."""
+        now = perf_counter()
+        self.current[phase.value - 1] += now - self.mark
+        self.mark = now
+
+    def add(self, phase: "Phase", duration: "float") -> "None":
+        """Charges a duration measured elsewhere to a phase, as for phases shared by
+        several worlds.
+
+        Positional arguments:  
+         - `phase`: the timed phase.
+         - `duration`: the phase's duration, in seconds."""
+        self.current[phase.value - 1] += duration
+
+    def summarize(self) -> "NDArray[float64]":
+        """Computes the rolling percentiles of each phase's duration per frame.
+
+        Return:  
+        An array of shape `(len(PHASE_PERCENTILES), len(Phase))` containing each \
+        percentile of each phase's duration over the last frames, in seconds, or zeros \
+        if no frame was recorded."""
+        if self.frames == 0:
+            return zeros((len(PHASE_PERCENTILES), len(Phase)), dtype=float64)
+        return percentile(self.history[:min(self.frames, len(self.history))],
+                          PHASE_PERCENTILES, axis=0)
+
+
+def lap_all(timers: "List[PhaseTimer]", phase: "Phase", start: "float") -> "float":
+    """Charges the time elapsed since a given instant to a phase on several timers, as
+    for phases shared by several worlds.
+
+    Positional arguments:  
+     - `timers`: the timers.
+     - `phase`: the phase that was running since `start`.
+     - `start`: the phase's start, as returned by `perf_counter`.
+
+    Return:  
+    The current time, as returned by `perf_counter`, to start the next phase."""
+    now = perf_counter()
+    for timer in timers:
+        timer.add(phase, now - start)
+    return now
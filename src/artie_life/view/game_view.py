@@ -8,15 +8,22 @@ from view.bottom_view import BottomBar
 from utils.map.constants import MAP_WIDTH, MAP_HEIGHT, MAP_WTH_RATIO
 from utils.view import BACKGROUND_COLOR, BUTTON_TEXT_COLOR, BG_TO_SCREEN_HEIGHT_RATIO, \
         TOP_BLANK_TO_SCREEN_RATIO
+from utils.timing import Phase
 
 if TYPE_CHECKING:
-    from typing import List, Tuple, Dict
+    from typing import List, Tuple, Dict, Optional
     from utils.living.actions import EntityType
+    from utils.timing import PhaseTimer
 
 class GameView:
     """Implementation of the main Game View class"""
-    def __init__(self) -> "None":
-        """Instantiates the game view."""
+    def __init__(self, timer: "Optional[PhaseTimer]" = None) -> "None":
+        """Instantiates the game view.
+        
+        Keyword arguments:  
+         - `timer`: the rendered world's phase timer, charged with rendering. If omitted, \
+        rendering is not timed."""
+        self.timer = timer
         self.screen: "Surface"
         self.map: "Rect" = Rect(0, 0, 0, 0)
         self.spawn_button: "Rect"
@@ -48,6 +55,8 @@ class GameView:
         Positional arguments:  
          - `sprites`: a `List` of `Tuple` objects associating to each sprite type \
         its position in game coordinates."""
+        if self.timer is not None:
+            self.timer.restart()
         self.screen.fill(BACKGROUND_COLOR)
         screen_height: "int" = self.screen.get_height()
         screen_width: "int" = self.screen.get_width()
@@ -80,6 +89,8 @@ class GameView:
                 ),
                 (sprite_rect.left, sprite_rect.top)
             )
+        if self.timer is not None:
+            self.timer.lap(Phase.RENDERING)
 
     def render_bottom_bar(self, params: "Dict[str, float]", attention: "str") -> "None":
         """Renders the bottom part of the screen, to show a living being's
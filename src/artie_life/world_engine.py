@@ -1,102 +1,534 @@
 """Module containing the single world's execution engine."""
+from typing import TYPE_CHECKING
 from multiprocessing import Process
+from signal import signal, SIGINT, SIGTERM
+from time import perf_counter, time
 from pygame import init, QUIT, quit as quit_game
 from pygame.event import get as get_events
 from pygame.key import set_repeat as set_key_repeat
 from pygame.time import Clock
 from controller.game_controller import GameController
+from controller.world_group import WorldGroupController
 from controller.input import ClickController, TextController
 from view.game_view import GameView
+from model.checkpoint import CheckpointWriter, load_checkpoint
+from utils.logs import start_throughput_log, log_throughput, log_frame_performance, \
+    flush_logs, use_results_store
+from utils.living.learning.commons import REPLAY_BUFFER_SIZE
+from utils.living.learning.replay import use_replay_storage, clear_replay_storage
 
-class WorldEngine(Process):
-    """Class representing the single world's execution engine."""
+if TYPE_CHECKING:
+    from typing import Any, Dict, List, Optional, Union
+    from multiprocessing import Queue
+    from multiprocessing.synchronize import Event
+    from utils.results import ResultsStore
 
-    def __init__(self, world_id: "int", population: "int", learning_enable: "str",
-                 genetic_algorithm: "str") -> "None":
-        """Constructor for the world's execution engine.
+THROUGHPUT_REPORT_PERIOD: "float" = 10.0
+
+class EngineSettings:
+    """Implementation of the options shared by all world engines of a run, as requested
+    via the command line."""
+
+    # pylint: disable=too-many-instance-attributes,too-few-public-methods
+    # Warnings disabled since each attribute is one of the run's options.
+
+    def __init__(self, population: "int", learning_enable: "str", genetic_algorithm: "str",
+                 timestep: "Optional[float]" = None,
+                 duration: "Optional[float]" = None,
+                 inference_backend: "str" = "numpy",
+                 checkpoint_period: "Optional[float]" = None,
+                 resume: "bool" = False,
+                 performance_log: "str" = "frames",
+                 results_store: "Optional[ResultsStore]" = None,
+                 phase_timing: "bool" = False,
+                 replay_folder: "Optional[str]" = None,
+                 replay_capacity: "int" = REPLAY_BUFFER_SIZE) -> "None":
+        """Instantiates the engines' settings.
         
         Positional arguments:  
-         - `world_id`: the in-game world's ID.
-         - `population`: the initial population size.
+         - `population`: the initial population size of each world.
          - `learning_enable`: true/false flag representing if the agents should be \
         learning or acting randomly.
          - `genetic_algorithm`: the kind of genetic algorithm applied to the \
-        population, or none if all genomes should be randomly generated."""
-        self.world_id = world_id
+        population, or none if all genomes should be randomly generated.
+        
+        Keyword arguments:  
+         - `timestep`: the fixed amount of simulated time per update step of headless \
+        engines, in seconds. If omitted, worlds run in real time.
+         - `duration`: the amount of simulated time after which the engines stop, in \
+        seconds. If omitted, the engines run until stopped.
+         - `inference_backend`: the backend evaluating the learning lobes' decisions, \
+        either `numpy` or `keras`.
+         - `checkpoint_period`: the amount of simulated time between two checkpoints of \
+        the engines' worlds, in seconds. If omitted, no checkpoint is written.
+         - `resume`: if `True`, worlds are restored from their last checkpoint, if any.
+         - `performance_log`: `frames` to log the duration of every frame, or \
+        `histograms` to log frame duration percentiles over windows of frames.
+         - `results_store`: the handle to the run's results database, recording the living \
+        beings' stats along with the world logs. If omitted, no database is used.
+         - `phase_timing`: if `True`, the duration of each update phase is measured, and \
+        its rolling percentiles logged along with the performance log.
+         - `replay_folder`: the folder of the files backing the learning lobes' replay \
+        memories, one per lobe, deleted when its living being dies. If omitted, replay \
+        memories are kept on the heap.
+         - `replay_capacity`: the maximum number of states stored by each replay memory. \
+        Resumed worlds require the capacity of the run they were checkpointed by."""
+        # pylint: disable=too-many-arguments,too-many-positional-arguments
         self.population = population
         self.learning_enable = learning_enable
         self.genetic_algorithm = genetic_algorithm
+        self.timestep = timestep
+        self.duration = duration
+        self.inference_backend = inference_backend
+        self.checkpoint_period = checkpoint_period
+        self.resume = resume
+        self.performance_log = performance_log
+        self.results_store = results_store
+        self.phase_timing = phase_timing
+        self.replay_folder = replay_folder
+        self.replay_capacity = replay_capacity
+
+
+class WorldEngine(Process):
+    """Class representing the single world's execution engine, stepping the world in real
+    time.
+    
+    The engine's lifecycle is shared by all engine kinds, which only provide their own
+    controller, world creation and update step."""
+
+    # pylint: disable=too-many-instance-attributes
+    # Warning disabled since the engine's state is shared by the lifecycle's hooks.
+
+    def __init__(self, world_ids: "List[int]", settings: "EngineSettings") -> "None":
+        """Constructor for the world's execution engine.
+        
+        Positional arguments:  
+         - `world_ids`: the in-game IDs of the hosted worlds. Single world engines only \
+        host the first one.
+         - `settings`: the options shared by all engines of the run."""
+        self.world_ids = world_ids
+        self.settings = settings
+        self.controller: "Union[GameController, WorldGroupController]"
+        self.checkpoints: "Optional[CheckpointWriter]" = None
         self.running = True
+        self.stop_event: "Optional[Event]" = None
+        self.results: "Optional[Queue]" = None
+        self.launch_time: "float" = time()
+        self.startup_time: "Optional[float]" = None
+        self.clock: "Clock"
+        self.dt: "int" = 0
         super().__init__()
 
+    def supervise(self, stop_event: "Event", results: "Queue") -> "None":
+        """Attaches the engine to a supervisor. To be invoked before starting the engine.
+        
+        Positional arguments:  
+         - `stop_event`: the event set by the supervisor to request a graceful stop.
+         - `results`: the queue collecting the summary of each world, once over."""
+        self.stop_event = stop_event
+        self.results = results
+
+    def handle_signals(self) -> "None":
+        """Turns interrupt and termination signals into a graceful stop request, so that
+        the current frame completes and the world's state is dumped. To be invoked in the
+        engine's process, after the game library is initialized."""
+        def request_stop(_signum: "int", _frame: "Any") -> "None":
+            self.running = False
+        signal(SIGINT, request_stop)
+        signal(SIGTERM, request_stop)
+
+    def mark_ready(self) -> "None":
+        """Records the engine's startup time, from its creation until its worlds are ready
+        to be updated. To be invoked in the engine's process, once the worlds are created."""
+        self.startup_time = time() - self.launch_time
+
+    def get_hosted_ids(self) -> "List[int]":
+        """Returns the in-game IDs of the worlds actually hosted by the engine.
+        
+        Return:  
+        A `List` containing the hosted worlds' IDs."""
+        return self.world_ids[:1]
+
+    def log_frame(self, frame_time: "float") -> "None":
+        """Logs a frame's wall-clock duration in each hosted world's performance log.
+        
+        Positional arguments:  
+         - `frame_time`: the frame's duration, in seconds."""
+        for world_id in self.get_hosted_ids():
+            log_frame_performance(world_id, frame_time)
+
+    def create_controller(self) -> "Union[GameController, WorldGroupController]":
+        """Creates the controller of the engine's worlds. To be invoked in the engine's
+        process.
+        
+        Return:  
+        The controller of the engine's world."""
+        return GameController(
+            self.settings.genetic_algorithm,
+            self.settings.learning_enable == "true",
+            self.settings.inference_backend,
+            self.settings.performance_log,
+            self.settings.phase_timing
+        )
+
+    def populate(self) -> "float":
+        """Creates the engine's world, restoring it from its last checkpoint if resuming.
+        To be invoked in the engine's process, once the controller is created.
+        
+        Return:  
+        The amount of simulated time already elapsed in the world, in seconds."""
+        checkpoint = load_checkpoint(self.world_ids[0]) if self.settings.resume else None
+        if checkpoint is None:
+            self.controller.create_world(self.settings.population, self.world_ids[0])
+            return 0.0
+        return self.controller.restore_world(checkpoint)
+
+    def prepare(self, simulated_time: "float") -> "None":
+        """Prepares the update loop, once the worlds are created.
+        
+        Positional arguments:  
+         - `simulated_time`: the amount of simulated time already elapsed, in seconds."""
+        # pylint: disable=unused-argument
+        self.clock = Clock()
+
+    def update(self, elapsed_time: "float") -> "None":
+        """Performs a single update step of all the engine's worlds.
+        
+        Positional arguments:  
+         - `elapsed_time`: the amount of time elapsed since the last update step, in seconds."""
+        self.controller.update_world(elapsed_time)
+
+    def step(self, simulated_time: "float") -> "float":
+        """Performs a single iteration of the update loop, capped at 30 frames per second.
+        
+        Positional arguments:  
+         - `simulated_time`: the amount of simulated time before the iteration, in seconds.
+        
+        Return:  
+        The amount of simulated time elapsed during the iteration, in seconds."""
+        # pylint: disable=unused-argument
+        elapsed_time = self.dt / 1000
+        self.log_frame(elapsed_time)
+        self.update(elapsed_time)
+        self.dt = self.clock.tick(30)
+        return elapsed_time
+
+    def conclude(self, simulated_time: "float", wall_time: "float") -> "None":
+        """Wraps up the update loop, as it ends for any reason.
+        
+        Positional arguments:  
+         - `simulated_time`: the amount of simulated time since the worlds started, in \
+        seconds.
+         - `wall_time`: the amount of wall-clock time spent in the update loop, in \
+        seconds."""
+
+    def start_checkpoints(self, simulated_time: "float") -> "None":
+        """Starts checkpointing the engine's worlds, if requested.
+        
+        Positional arguments:  
+         - `simulated_time`: the amount of simulated time already elapsed, in seconds."""
+        if self.settings.checkpoint_period is not None:
+            self.checkpoints = CheckpointWriter(self.settings.checkpoint_period, simulated_time)
+
+    def save_checkpoint(self, simulated_time: "float") -> "None":
+        """Checkpoints the engine's worlds in the background, if a checkpoint is due, and
+        flushes the logs so that they cover the checkpoint. To be invoked between two update
+        steps.
+        
+        Positional arguments:  
+         - `simulated_time`: the amount of simulated time since the worlds started, in \
+        seconds."""
+        if self.checkpoints is not None and self.checkpoints.is_due(simulated_time):
+            self.checkpoints.write(
+                self.controller.capture_checkpoints(simulated_time),
+                simulated_time
+            )
+            flush_logs()
+
+    def finish_checkpoints(self, simulated_time: "float", status: "str") -> "None":
+        """Checkpoints the engine's worlds one last time, unless the run failed, and waits
+        until all checkpoints are written.
+        
+        Positional arguments:  
+         - `simulated_time`: the amount of simulated time since the worlds started, in \
+        seconds.
+         - `status`: how the run ended, either `completed`, `stopped` or `failed`."""
+        if self.checkpoints is None:
+            return
+        if status != "failed":
+            self.checkpoints.write(
+                self.controller.capture_checkpoints(simulated_time),
+                simulated_time
+            )
+        self.checkpoints.wait()
+
+    def keep_running(self, simulated_time: "float") -> "bool":
+        """Checks if the engine should perform another update step.
+        
+        Positional arguments:  
+         - `simulated_time`: the amount of simulated time since the engine started, in \
+        seconds.
+        
+        Return:  
+        `True` if no stop was requested and the run length was not reached, `False` \
+        otherwise."""
+        return self.running \
+            and not (self.stop_event is not None and self.stop_event.is_set()) \
+            and not self.is_over(simulated_time)
+
+    def report(self, summaries: "List[Dict[str, Union[int, float]]]", status: "str",
+               simulated_time: "float", wall_time: "float") -> "None":
+        """Hands the final summary of each hosted world to the supervisor, if any.
+        
+        Positional arguments:  
+         - `summaries`: the worlds' summaries.
+         - `status`: how the run ended, either `completed`, `stopped` or `failed`.
+         - `simulated_time`: the amount of simulated time since the engine started, in \
+        seconds.
+         - `wall_time`: the amount of wall-clock time since the engine started, in \
+        seconds."""
+        if self.results is not None:
+            for summary in summaries:
+                self.results.put({
+                    **summary,
+                    "status": status,
+                    "simulated_time": simulated_time,
+                    "wall_time": wall_time,
+                    **({"startup_time": self.startup_time}
+                       if self.startup_time is not None else { })
+                })
+
+    def get_status(self, simulated_time: "float") -> "str":
+        """Tells how a run that ended without errors should be reported.
+        
+        Positional arguments:  
+         - `simulated_time`: the amount of simulated time since the engine started, in \
+        seconds.
+        
+        Return:  
+        `completed` if the run length was reached, `stopped` otherwise."""
+        return "completed" if self.is_over(simulated_time) else "stopped"
+
+    def is_over(self, simulated_time: "float") -> "bool":
+        """Checks if the requested run length has been reached.
+        
+        Positional arguments:  
+         - `simulated_time`: the amount of simulated time since the engine started, in \
+        seconds.
+        
+        Return:  
+        `True` if the engine should stop, `False` otherwise."""
+        return self.settings.duration is not None and simulated_time >= self.settings.duration
+
     def run(self) -> "None":
-        """Main method of the world engine."""
+        """Main method of the world engine, shared by all engine kinds."""
+        self.controller = self.create_controller()
+        simulated_time: "float" = 0.0
+        status = "failed"
+        start = perf_counter()
         try:
             init()
-            game_controller = GameController(
-                self.genetic_algorithm,
-                self.learning_enable == "true"
-            )
-            game_controller.create_world(self.population, self.world_id)
-            clock = Clock()
-            dt: "int" = 0
-            while self.running:
-                game_controller.update_world(dt / 1000)
-                dt = clock.tick(30)
+            self.handle_signals()
+            use_results_store(self.settings.results_store)
+            use_replay_storage(self.settings.replay_folder, self.settings.replay_capacity)
+            simulated_time = self.populate()
+            self.start_checkpoints(simulated_time)
+            self.prepare(simulated_time)
+            self.mark_ready()
+            start = perf_counter()
+            while self.keep_running(simulated_time):
+                simulated_time += self.step(simulated_time)
+                self.save_checkpoint(simulated_time)
+            status = self.get_status(simulated_time)
         finally:
-            game_controller.dump_current_state()
+            wall_time = perf_counter() - start
+            self.conclude(simulated_time, wall_time)
+            self.finish_checkpoints(simulated_time, status)
+            self.controller.dump_current_state()
+            self.report(self.controller.get_summaries(), status, simulated_time, wall_time)
+            clear_replay_storage()
             quit_game()
 
 
+class HeadlessWorldEngine(WorldEngine):
+    """World engine implementation stepping the world with a fixed simulated timestep,
+    as fast as the CPU allows, and periodically logging the simulation's throughput, as
+    simulated seconds per wall-clock second."""
+
+    def __init__(self, world_ids: "List[int]", settings: "EngineSettings") -> "None":
+        """Constructor for the headless world engine.
+        
+        Positional arguments:  
+         - `world_ids`: the in-game IDs of the hosted worlds. Single world engines only \
+        host the first one.
+         - `settings`: the options shared by all engines of the run, including the \
+        fixed timestep."""
+        if settings.timestep is None:
+            raise ValueError("headless world engines require a fixed timestep")
+        super().__init__(world_ids, settings)
+        self.timestep: "float" = settings.timestep
+        self.resumed_time: "float" = 0.0
+        self.loop_start: "float" = 0.0
+        self.last_report: "float" = 0.0
+
+    def prepare(self, simulated_time: "float") -> "None":
+        """Starts the throughput log of each hosted world.
+        
+        Positional arguments:  
+         - `simulated_time`: the amount of simulated time already elapsed, in seconds."""
+        for world_id in self.get_hosted_ids():
+            start_throughput_log(world_id, self.settings.resume)
+        self.resumed_time = simulated_time
+        self.loop_start = perf_counter()
+        self.last_report = self.loop_start
+
+    def log_throughput(self, simulated_time: "float", wall_time: "float") -> "None":
+        """Logs the throughput of the current run in each hosted world's throughput log.
+        
+        Positional arguments:  
+         - `simulated_time`: the amount of simulated time since the worlds started, in \
+        seconds.
+         - `wall_time`: the amount of wall-clock time spent in the update loop, in \
+        seconds."""
+        for world_id in self.get_hosted_ids():
+            log_throughput(world_id, simulated_time - self.resumed_time, wall_time)
+
+    def step(self, simulated_time: "float") -> "float":
+        """Performs a single update step with the fixed timestep.
+        
+        Positional arguments:  
+         - `simulated_time`: the amount of simulated time before the iteration, in seconds.
+        
+        Return:  
+        The fixed timestep, in seconds."""
+        start = perf_counter()
+        self.update(self.timestep)
+        now = perf_counter()
+        self.log_frame(now - start)
+        if now - self.last_report >= THROUGHPUT_REPORT_PERIOD:
+            self.last_report = now
+            self.log_throughput(simulated_time + self.timestep, now - self.loop_start)
+        return self.timestep
+
+    def conclude(self, simulated_time: "float", wall_time: "float") -> "None":
+        """Logs the throughput of the whole run.
+        
+        Positional arguments:  
+         - `simulated_time`: the amount of simulated time since the worlds started, in \
+        seconds.
+         - `wall_time`: the amount of wall-clock time spent in the update loop, in \
+        seconds."""
+        self.log_throughput(simulated_time, wall_time)
+
+
+class LockstepWorldEngine(HeadlessWorldEngine):
+    """Headless world engine implementation hosting several worlds in a single process,
+    stepped in lockstep with a fixed simulated timestep."""
+
+    def get_hosted_ids(self) -> "List[int]":
+        """Returns the in-game IDs of the worlds actually hosted by the engine.
+        
+        Return:  
+        A `List` containing the hosted worlds' IDs."""
+        return self.world_ids
+
+    def create_controller(self) -> "Union[GameController, WorldGroupController]":
+        """Creates the controller of the engine's worlds. To be invoked in the engine's
+        process.
+        
+        Return:  
+        The controller of the engine's world group."""
+        return WorldGroupController(
+            self.settings.genetic_algorithm,
+            self.settings.learning_enable == "true",
+            self.settings.inference_backend,
+            self.settings.performance_log,
+            self.settings.phase_timing
+        )
+
+    def populate(self) -> "float":
+        """Creates the engine's worlds, restoring them from their last checkpoints if
+        resuming and all of them have one. To be invoked in the engine's process, once the
+        controller is created.
+        
+        Return:  
+        The amount of simulated time already elapsed in the worlds, in seconds."""
+        checkpoints = [load_checkpoint(world_id) for world_id in self.world_ids] \
+            if self.settings.resume else []
+        if len(checkpoints) == 0 or None in checkpoints:
+            self.controller.create_worlds(self.settings.population, self.world_ids)
+            return 0.0
+        return self.controller.restore_worlds(checkpoints)
+
+    def update(self, elapsed_time: "float") -> "None":
+        """Performs a single update step of all the engine's worlds, in lockstep.
+        
+        Positional arguments:  
+         - `elapsed_time`: the amount of time elapsed since the last update step, in seconds."""
+        self.controller.update_worlds(elapsed_time)
+
+
 class GuiWorldEngine(WorldEngine):
     """World engine implementation with GUI rendering enabled."""
 
-    def run(self) -> "None":
-        """Main method of the GUI world engine."""
-        try:
-            init()
-            set_key_repeat(200, 75)
+    def __init__(self, world_ids: "List[int]", settings: "EngineSettings") -> "None":
+        """Constructor for the GUI world engine.
+        
+        Positional arguments:  
+         - `world_ids`: the in-game IDs of the hosted worlds. Only the first one is \
+        hosted.
+         - `settings`: the options shared by all engines of the run."""
+        super().__init__(world_ids, settings)
+        self.view: "GameView"
+        self.click_controller: "ClickController"
+        self.text_controller: "TextController"
+
+    def prepare(self, simulated_time: "float") -> "None":
+        """Shows the game window and sets up the user input controllers.
+        
+        Positional arguments:  
+         - `simulated_time`: the amount of simulated time already elapsed, in seconds."""
+        super().prepare(simulated_time)
+        set_key_repeat(200, 75)
+        self.view = GameView(self.controller.world.timer)
+        self.click_controller = ClickController(self.controller.world, self.view)
+        self.text_controller = TextController(self.controller.world, self.view)
+        self.view.show_screen()
+
+    def step(self, simulated_time: "float") -> "float":
+        """Performs a single iteration of the update loop, handling user inputs and
+        rendering the world, capped at 30 frames per second.
+        
+        Positional arguments:  
+         - `simulated_time`: the amount of simulated time before the iteration, in seconds.
+        
+        Return:  
+        The amount of simulated time elapsed during the iteration, in seconds."""
+        events = get_events()
+        for event in events:
+            if event.type == QUIT:
+                self.running = False
+
+        if self.click_controller.is_spawn_requested(events):
+            self.controller.spawn_random_living()
 
-            game_controller = GameController(
-                self.genetic_algorithm,
-                self.learning_enable == "true"
+        elapsed_time = self.dt / 1000
+        self.log_frame(elapsed_time)
+        self.update(elapsed_time)
+        self.view.render(self.controller.get_map_elems())
+
+        self.click_controller.handle_living_selection(events)
+        if self.controller.is_living_selected():
+            self.text_controller.update(events)
+            self.view.render_bottom_bar(
+                self.controller.get_selected_info(),
+                self.controller.get_focus_object()
             )
-            game_controller.create_world(self.population, self.world_id)
-
-            view = GameView()
-            click_controller= ClickController(game_controller.world, view)
-            text_controller= TextController(game_controller.world, view)
-
-            view.show_screen()
-
-            clock = Clock()
-            dt: "int" = 0
-            while self.running:
-                events = get_events()
-                for event in events:
-                    if event.type == QUIT:
-                        self.running = False
-
-                if click_controller.is_spawn_requested(events):
-                    game_controller.spawn_random_living()
-
-                game_controller.update_world(dt / 1000)
-                view.render(game_controller.get_map_elems())
-
-                click_controller.handle_living_selection(events)
-                if game_controller.is_living_selected():
-                    text_controller.update(events)
-                    view.render_bottom_bar(
-                        game_controller.get_selected_info(),
-                        game_controller.get_focus_object()
-                    )
-                    click_controller.handle_user_reward(events)
-                else:
-                    text_controller.clear()
-
-                view.show_frame()
-
-                dt = clock.tick(30)
-        finally:
-            game_controller.dump_current_state()
-            quit_game()
+            self.click_controller.handle_user_reward(events)
+        else:
+            self.text_controller.clear()
+
+        self.view.show_frame()
+
+        self.dt = self.clock.tick(30)
+        return elapsed_time